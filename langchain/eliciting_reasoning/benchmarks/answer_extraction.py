@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark incremental answer extraction against rescanning the whole trace.
+
+The reasoning node used to run every answer pattern over the full, growing
+reasoning trace after each step, which is quadratic in the trace length.
+This replays synthetic traces step by step through both approaches and
+reports the total extraction time per trace.
+
+Usage:
+    python benchmarks/answer_extraction.py [--steps 10 50 200] [--step-chars 2000] [--repeat 5]
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.answer_parsing import extract_answer, extract_new_answer
+
+LEGACY_PATTERNS = [
+    r'ANSWER:\s*(.+?)(?:\n|$)',
+    r'Final Answer:\s*(.+?)(?:\n|$)',
+    r'The answer is:\s*(.+?)(?:\n|$)',
+    r'Result:\s*(.+?)(?:\n|$)',
+    r'Solution:\s*(.+?)(?:\n|$)',
+]
+
+WORDS = (
+    "we consider the divisors of the number and compute their sum step by step "
+    "then check whether the remainder vanishes so the factorization gives"
+).split()
+
+
+def legacy_extract_answer(text: str) -> Optional[str]:
+    """The previous implementation: uncompiled patterns over the given text."""
+    for pattern in LEGACY_PATTERNS:
+        match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
+        if match:
+            return match.group(1).strip()
+    return None
+
+
+def make_responses(steps: int, step_chars: int, seed: int) -> List[str]:
+    """Reasoning responses without an answer, except for the last one."""
+    rng = random.Random(seed)
+    responses = []
+    for _ in range(steps - 1):
+        lines = []
+        length = 0
+        while length < step_chars:
+            line = " ".join(rng.choice(WORDS) for _ in range(12))
+            lines.append(line)
+            length += len(line) + 1
+        responses.append("\n".join(lines))
+    responses.append("Putting it together, the sum is 42.\nANSWER: 42")
+    return responses
+
+
+def run_full_rescan(responses: List[str]) -> Optional[str]:
+    trace = ""
+    answer = None
+    for response in responses:
+        trace = trace + "\n" + response
+        answer = legacy_extract_answer(trace)
+    return answer
+
+
+def run_incremental(responses: List[str]) -> Optional[str]:
+    trace = ""
+    answer = None
+    for response in responses:
+        answer = extract_new_answer(trace, response) or answer
+        trace = trace + "\n" + response
+    return answer
+
+
+def best_time(function, responses: List[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(responses)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, nargs="+", default=[10, 50, 200],
+                        help="Reasoning steps per trace (default: 10 50 200)")
+    parser.add_argument("--step-chars", type=int, default=2000, help="Characters per response (default: 2000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement, best is reported (default: 5)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the traces (default: 0)")
+    args = parser.parse_args()
+
+    print(f"{'steps':>6}{'trace KB':>10}{'full rescan ms':>16}{'incremental ms':>16}{'speedup':>9}")
+    for steps in args.steps:
+        responses = make_responses(steps, args.step_chars, args.seed)
+        assert run_full_rescan(responses) == run_incremental(responses) == extract_answer(responses[-1])
+        full = best_time(run_full_rescan, responses, args.repeat)
+        incremental = best_time(run_incremental, responses, args.repeat)
+        trace_kb = sum(len(response) + 1 for response in responses) / 1024
+        print(f"{steps:>6}{trace_kb:>10.0f}{full * 1000:>16.2f}{incremental * 1000:>16.2f}{full / incremental:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
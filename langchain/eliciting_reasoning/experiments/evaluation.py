@@ -1,12 +1,20 @@
 """Evaluation framework for cognitive tools experiment."""
 
-import re
 import json
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 from collections import defaultdict
 import numpy as np
 
+from src.answer_parsing import (
+    TERM_SEPARATOR_PATTERN,
+    extract_interval,
+    extract_number,
+    extract_numbers,
+    extract_solution_values,
+    normalize_answer
+)
+
 
 @dataclass
 class EvaluationResult:
@@ -186,43 +194,11 @@ class Evaluator:
     
     def _normalize_answer(self, answer: str) -> str:
         """Normalize answer string for comparison."""
-        # Convert to lowercase and strip whitespace
-        answer = answer.lower().strip()
-        
-        # Remove common prefixes
-        prefixes = ["answer:", "the answer is", "final answer:"]
-        for prefix in prefixes:
-            if answer.startswith(prefix):
-                answer = answer[len(prefix):].strip()
-        
-        # Normalize mathematical notation
-        answer = answer.replace("×", "*").replace("÷", "/")
-        answer = answer.replace("^", "**")
-        
-        return answer
+        return normalize_answer(answer)
     
     def _extract_number(self, text: str) -> Optional[float]:
         """Extract a number from text."""
-        # Try to find a number pattern
-        patterns = [
-            r"[-+]?\d*\.?\d+",  # Regular number
-            r"[-+]?\d+/\d+",    # Fraction
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text)
-            if match:
-                num_str = match.group()
-                try:
-                    # Handle fractions
-                    if "/" in num_str:
-                        num, denom = num_str.split("/")
-                        return float(num) / float(denom)
-                    return float(num_str)
-                except:
-                    continue
-        
-        return None
+        return extract_number(text)
     
     def _normalize_number(self, text: str) -> Optional[float]:
         """Normalize a numeric answer."""
@@ -235,31 +211,19 @@ class Evaluator:
         # Sort terms if it's a sum
         if "+" in text or "-" in text:
             # Simple term sorting (not perfect but helps)
-            terms = re.split(r'([+-])', text)
+            terms = TERM_SEPARATOR_PATTERN.split(text)
             terms = [t for t in terms if t]
             # This is simplified; real implementation would parse properly
         return text
     
     def _normalize_interval(self, text: str) -> Tuple[float, float]:
         """Normalize an interval answer."""
-        # Extract bounds from interval notation
-        match = re.search(r'([\[\(])\s*([-\d.]+)\s*,\s*([-\d.]+)\s*([\]\)])', text)
-        if match:
-            left_bracket, left, right, right_bracket = match.groups()
-            return (float(left), float(right))
-        
-        # Try inequality format: a < x < b
-        match = re.search(r'([-\d.]+)\s*<\s*x\s*<\s*([-\d.]+)', text)
-        if match:
-            return (float(match.group(1)), float(match.group(2)))
-        
-        return None
+        return extract_interval(text)
     
     def _normalize_set(self, text: str) -> List[float]:
         """Normalize a set answer."""
         # Extract numbers from set notation or list
-        numbers = re.findall(r'[-+]?\d*\.?\d+', text)
-        return sorted([float(n) for n in numbers])
+        return sorted(extract_numbers(text))
     
     def _compare_algebraic_answers(self, pred: str, exp: str) -> bool:
         """Compare algebraic answers with more flexibility."""
@@ -283,20 +247,4 @@ class Evaluator:
     
     def _extract_solution_values(self, text: str) -> Optional[List[float]]:
         """Extract solution values from 'x = a or x = b' format."""
-        # Look for "x = number" patterns
-        matches = re.findall(r'x\s*=\s*([-+]?\d*\.?\d+)', text)
-        if matches:
-            return [float(m) for m in matches]
-        
-        # Look for just numbers separated by "or"
-        if " or " in text:
-            parts = text.split(" or ")
-            values = []
-            for part in parts:
-                num = self._extract_number(part)
-                if num is not None:
-                    values.append(num)
-            if values:
-                return values
-        
-        return None
\ No newline at end of file
+        return extract_solution_values(text)
\ No newline at end of file
@@ -4,6 +4,7 @@ import os
 import sys
 import json
 import argparse
+import hashlib
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -14,38 +15,98 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 from langchain_anthropic import ChatAnthropic
+from langchain_core.globals import set_llm_cache
 from tqdm import tqdm
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 
 from src.agents import CognitiveAgent
+from src.agents.cognitive_agent import run_sync
+from src.answer_parsing import extract_answer_line
+from src.checkpointing import SQLiteCheckpointSaver
+from src.llm_cache import SQLiteLLMCache
+from src.problem_index import ProblemIndex, SolvedProblem
 from experiments.evaluation import Evaluator, ExperimentResults
 
 
 class ExperimentRunner:
     """Runs experiments comparing cognitive tools vs baseline."""
     
-    def __init__(self, model_name: str = "gpt-4"):
+    def __init__(
+        self,
+        model_name: str = "gpt-4",
+        concurrency: int = 8,
+        requests_per_second: Optional[float] = None,
+        cache_path: Optional[str] = None,
+        cache_size_mb: int = 512,
+        recall_index: bool = False,
+        record_traces: bool = False,
+        checkpoint_path: Optional[str] = None,
+        samples: int = 1,
+        sample_temperature: float = 0.7
+    ):
         """Initialize experiment runner.
         
         Args:
             model_name: Name of the model to use (gpt-4, claude-3, etc.)
+            concurrency: Number of problems solved concurrently
+            requests_per_second: Optional limit on LLM requests per second
+            cache_path: SQLite file for caching LLM responses across runs
+            cache_size_mb: Size limit of the response cache
+            recall_index: Let recall_related retrieve analogues from the
+                datasets instead of the LLM; problems similar to the ones
+                being evaluated are left out
+            record_traces: With recall_index, also index successful traces
+                saved by earlier runs and save this run's. Off by default,
+                as it makes results depend on the runs before
+            checkpoint_path: SQLite file for reasoning checkpoints, so an
+                interrupted run resumes each problem where it stopped
+            samples: Reasoning trajectories per problem; above 1, the
+                answer is chosen by self-consistency voting
+            sample_temperature: Sampling temperature of those trajectories
         """
         # Load environment variables
         load_dotenv()
         
+        # Cache LLM responses so re-runs only pay for changed calls
+        self.llm_cache = None
+        if cache_path:
+            self.llm_cache = SQLiteLLMCache(cache_path, max_size_bytes=cache_size_mb * 1024 * 1024)
+            set_llm_cache(self.llm_cache)
+        
         # Initialize LLM
         self.llm = self._create_llm(model_name)
         self.model_name = model_name
-        
-        # Initialize agent and evaluator
-        self.agent = CognitiveAgent(self.llm)
-        self.evaluator = Evaluator()
+        self.concurrency = concurrency
+        self.samples = samples
+        self.sample_temperature = sample_temperature
         
         # Set up directories
         self.results_dir = Path("results")
         self.results_dir.mkdir(exist_ok=True)
+        self.traces_path = self.results_dir / "solved_traces.jsonl"
+        self.record_traces = record_traces
+        
+        # Index of solved problems for recall_related
+        self.problem_index = None
+        if recall_index:
+            datasets_dir = Path(__file__).parent / "datasets"
+            self.problem_index = ProblemIndex.from_datasets(sorted(datasets_dir.glob("*.json")))
+            if record_traces:
+                self.problem_index.load_traces(self.traces_path)
+        
+        # Save reasoning progress so interrupted runs can resume
+        self.checkpointer = SQLiteCheckpointSaver(checkpoint_path) if checkpoint_path else None
+        
+        # Initialize agent and evaluator
+        self.agent = CognitiveAgent(
+            self.llm,
+            requests_per_second=requests_per_second,
+            problem_index=self.problem_index,
+            checkpointer=self.checkpointer
+        )
+        self.evaluator = Evaluator()
     
     def _create_llm(self, model_name: str):
         """Create LLM based on model name."""
@@ -70,6 +131,11 @@ class ExperimentRunner:
             data = json.load(f)
         return data["problems"]
     
+    def _thread_id(self, problem: Dict, max_iterations: int) -> str:
+        """Checkpoint thread of a problem, distinct per model and iteration limit."""
+        question_hash = hashlib.sha256(problem["question"].encode("utf-8")).hexdigest()[:16]
+        return f"{self.model_name}:{max_iterations}:{problem['id']}:{question_hash}"
+    
     def run_cognitive_tools_experiment(
         self,
         problems: List[Dict],
@@ -78,27 +144,47 @@ class ExperimentRunner:
         """Run experiment with cognitive tools."""
         print("\n=== Running Cognitive Tools Experiment ===")
         
-        solutions = []
-        for problem in tqdm(problems, desc="Solving problems"):
-            try:
-                solution = self.agent.solve(
-                    problem["question"],
-                    max_iterations=max_iterations
-                )
-                solutions.append(solution)
-            except Exception as e:
-                print(f"Error solving {problem['id']}: {e}")
-                solutions.append({
-                    "problem": problem["question"],
-                    "final_answer": None,
-                    "reasoning_trace": f"Error: {str(e)}",
-                    "tool_usage": [],
-                    "iterations": 0,
-                    "error": str(e)
-                })
+        # Don't let recall_related hand out the answers being evaluated
+        if self.problem_index is not None:
+            self.problem_index.exclude_similar(problem["question"] for problem in problems)
+        
+        progress = tqdm(total=len(problems), desc="Solving problems")
+        
+        def on_result(index: int, solution: Dict):
+            if solution.get("error"):
+                progress.write(f"Error solving {problems[index]['id']}: {solution['error']}")
+            progress.update()
+        
+        solutions = run_sync(self.agent.asolve_batch(
+            [problem["question"] for problem in problems],
+            max_iterations=max_iterations,
+            concurrency=self.concurrency,
+            on_result=on_result,
+            thread_ids=[self._thread_id(problem, max_iterations) for problem in problems]
+            if self.checkpointer else None,
+            samples=self.samples,
+            temperature=self.sample_temperature
+        ))
+        progress.close()
         
         # Evaluate results
         results = self.evaluator.evaluate_experiment(problems, solutions)
+        
+        # Remember successful traces as worked examples for future runs
+        if self.problem_index is not None and self.record_traces:
+            solved = [
+                SolvedProblem(
+                    question=problem["question"],
+                    answer=str(problem["answer"]),
+                    solution=solution["reasoning_trace"].strip(),
+                    type=problem.get("type", ""),
+                    source="trace"
+                )
+                for problem, solution, result in zip(problems, solutions, results.detailed_results)
+                if result.is_correct
+            ]
+            ProblemIndex.save_traces(self.traces_path, solved)
+        
         return results
     
     def run_baseline_experiment(
@@ -122,9 +208,7 @@ Think through this carefully and show your work. When you have the final answer,
                 answer_text = response.content if hasattr(response, 'content') else str(response)
                 
                 # Extract answer
-                import re
-                match = re.search(r'ANSWER:\s*(.+?)(?:\n|$)', answer_text, re.IGNORECASE)
-                final_answer = match.group(1).strip() if match else None
+                final_answer = extract_answer_line(answer_text)
                 
                 solutions.append({
                     "problem": problem["question"],
@@ -361,17 +445,90 @@ def main():
         default="experiments/datasets/math_problems.json",
         help="Path to dataset JSON file"
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Number of problems solved concurrently"
+    )
+    parser.add_argument(
+        "--requests-per-second",
+        type=float,
+        default=None,
+        help="Limit LLM requests per second (shared per provider)"
+    )
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        const="results/llm_cache.sqlite",
+        default=None,
+        metavar="PATH",
+        help="Cache LLM responses in a SQLite file (default path: results/llm_cache.sqlite)"
+    )
+    parser.add_argument(
+        "--cache-size-mb",
+        type=int,
+        default=512,
+        help="Size limit of the LLM response cache in MB"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        nargs="?",
+        const="results/checkpoints.sqlite",
+        default=None,
+        metavar="PATH",
+        help="Checkpoint reasoning in a SQLite file and resume unfinished problems "
+             "(default path: results/checkpoints.sqlite)"
+    )
+    parser.add_argument(
+        "--samples",
+        type=int,
+        default=1,
+        help="Reasoning trajectories per problem, combined by majority vote (self-consistency)"
+    )
+    parser.add_argument(
+        "--sample-temperature",
+        type=float,
+        default=0.7,
+        help="Sampling temperature of the trajectories when --samples is above 1"
+    )
+    parser.add_argument(
+        "--recall-index",
+        action="store_true",
+        help="Answer recall_related from a local index of solved problems, falling back to the LLM"
+    )
+    parser.add_argument(
+        "--record-traces",
+        action="store_true",
+        help="With --recall-index, also recall successful traces of earlier runs and save this run's"
+    )
     
     args = parser.parse_args()
     
     # Run experiment
-    runner = ExperimentRunner(model_name=args.model)
+    runner = ExperimentRunner(
+        model_name=args.model,
+        concurrency=args.concurrency,
+        requests_per_second=args.requests_per_second,
+        cache_path=args.cache,
+        cache_size_mb=args.cache_size_mb,
+        recall_index=args.recall_index,
+        record_traces=args.record_traces,
+        checkpoint_path=args.checkpoint,
+        samples=args.samples,
+        sample_temperature=args.sample_temperature
+    )
     results = runner.run_full_experiment(args.dataset)
     
     # Print summary
     print("\n=== Experiment Summary ===")
     for name, result in results.items():
         print(f"{name}: {result.accuracy:.2%} ({result.correct_count}/{result.total_problems})")
+    
+    if runner.llm_cache:
+        stats = runner.llm_cache.stats()
+        print(f"LLM cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.1%}), "
+              f"{stats['entries']} entries, {stats['size_bytes'] / 1024 / 1024:.1f} MB")
 
 
 if __name__ == "__main__":
@@ -1,30 +1,123 @@
 """Cognitive Agent that uses the reasoning graph."""
 
-from typing import Dict, Optional
+import asyncio
+import random
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Coroutine, Dict, Iterator, List, Optional, Sequence, Tuple
 from langchain_core.language_models import BaseLanguageModel
+from langchain_core.rate_limiters import InMemoryRateLimiter
+from langgraph.checkpoint.base import BaseCheckpointSaver
 
+from ..answer_parsing import answer_key
 from ..graphs.reasoning_graph import CognitiveReasoningGraph
+from ..problem_index import ProblemIndex
+
+
+# One token bucket per provider, shared by every agent talking to it
+_PROVIDER_RATE_LIMITERS: Dict[str, InMemoryRateLimiter] = {}
+
+
+def provider_rate_limiter(provider: str, requests_per_second: float) -> InMemoryRateLimiter:
+    """Get the shared token-bucket rate limiter for a provider.
+    
+    The limiter is shared by every agent using the provider, so asking for
+    a different rate changes it for all of them; a warning says so.
+    
+    Args:
+        provider: Provider name, e.g. the model's ``_llm_type``
+        requests_per_second: Sustained request rate allowed for the provider
+    
+    Returns:
+        The provider's rate limiter, updated to the given rate
+    """
+    limiter = _PROVIDER_RATE_LIMITERS.get(provider)
+    if limiter is None:
+        limiter = _PROVIDER_RATE_LIMITERS[provider] = InMemoryRateLimiter(
+            requests_per_second=requests_per_second,
+            check_every_n_seconds=0.05,
+            max_bucket_size=max(1.0, requests_per_second)
+        )
+    elif limiter.requests_per_second != requests_per_second:
+        warnings.warn(
+            f"Changing the shared {provider} rate limit from {limiter.requests_per_second} to "
+            f"{requests_per_second} requests per second for every agent using it",
+            stacklevel=3
+        )
+        limiter.requests_per_second = requests_per_second
+        limiter.max_bucket_size = max(1.0, requests_per_second)
+    return limiter
+
+
+def run_sync(coroutine: Coroutine[Any, Any, Any]) -> Any:
+    """Run a coroutine to completion from synchronous code.
+    
+    ``asyncio.run`` fails inside a running event loop (Jupyter, async
+    callers), so there the coroutine runs on its own loop in a worker
+    thread, and the caller blocks until it finishes as with any sync call.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
 
 
 class CognitiveAgent:
     """Agent that solves problems using cognitive tools."""
     
-    def __init__(self, llm: BaseLanguageModel):
+    def __init__(
+        self,
+        llm: BaseLanguageModel,
+        requests_per_second: Optional[float] = None,
+        max_parallel_tools: int = 8,
+        problem_index: Optional[ProblemIndex] = None,
+        max_context_tokens: Optional[int] = 8000,
+        checkpointer: Optional[BaseCheckpointSaver] = None,
+        verify_with_llm: bool = True
+    ):
         """Initialize the cognitive agent.
         
         Args:
             llm: Language model to use for reasoning
+            requests_per_second: Optional limit on LLM requests per second,
+                shared by all agents using the same provider
+            max_parallel_tools: Maximum number of tool calls running at once
+            problem_index: Solved problems for the recall_related tool
+            max_context_tokens: Token budget for the messages sent on each
+                reasoning step (None for no limit)
+            checkpointer: Saves reasoning progress so runs given a thread id
+                can resume after a failure, e.g. ``SQLiteCheckpointSaver``
+            verify_with_llm: Ask examine_answer to verify answers that the
+                local checks (substitution, code re-execution) cannot decide
         """
         self.llm = llm
-        self.graph = CognitiveReasoningGraph(llm)
+        if requests_per_second:
+            if not hasattr(llm, "rate_limiter"):
+                raise TypeError(f"{type(llm).__name__} does not support rate limiting")
+            provider = getattr(llm, "_llm_type", type(llm).__name__)
+            llm.rate_limiter = provider_rate_limiter(provider, requests_per_second)
+        self._graph_options = {
+            "max_parallel_tools": max_parallel_tools,
+            "problem_index": problem_index,
+            "max_context_tokens": max_context_tokens,
+            "checkpointer": checkpointer,
+            "verify_with_llm": verify_with_llm
+        }
+        self.graph = CognitiveReasoningGraph.shared(llm, **self._graph_options)
+        # Graphs on copies of the LLM for self-consistency sampling, by temperature
+        self._sampling_graphs: Dict[float, CognitiveReasoningGraph] = {}
     
-    def solve(self, problem: str, max_iterations: int = 10) -> Dict:
+    def solve(self, problem: str, max_iterations: int = 10, thread_id: Optional[str] = None) -> Dict:
         """Solve a problem using cognitive tools.
         
         Args:
             problem: The problem to solve
             max_iterations: Maximum number of reasoning iterations
-            
+            thread_id: Checkpoint thread to resume or record this run in
+                (requires a checkpointer)
+        
         Returns:
             Dictionary containing:
                 - problem: The original problem
@@ -32,31 +125,244 @@ class CognitiveAgent:
                 - reasoning_trace: Full reasoning process
                 - tool_usage: List of tools used
                 - iterations: Number of iterations taken
+                - verified: Whether a check confirmed the answer
+                - verification: How the answer was checked
         """
-        return self.graph.solve(problem, max_iterations)
+        return self.graph.solve(problem, max_iterations, thread_id=thread_id)
     
-    def solve_batch(self, problems: list[str], max_iterations: int = 10) -> list[Dict]:
-        """Solve multiple problems.
+    async def asolve(self, problem: str, max_iterations: int = 10, thread_id: Optional[str] = None) -> Dict:
+        """Async version of ``solve``."""
+        return await self.graph.asolve(problem, max_iterations, thread_id=thread_id)
+    
+    def solve_stream(self, problem: str, max_iterations: int = 10, thread_id: Optional[str] = None) -> Iterator[Dict]:
+        """Solve a problem, yielding token and graph update events as they arrive.
+        
+        The last event has type "result" and holds the solution dictionary.
+        Reasoning stops generating as soon as an "ANSWER:" line is complete.
+        ``thread_id`` is used as in ``solve``.
+        """
+        return self.graph.solve_stream(problem, max_iterations, thread_id=thread_id)
+    
+    def asolve_stream(
+        self,
+        problem: str,
+        max_iterations: int = 10,
+        thread_id: Optional[str] = None
+    ) -> AsyncIterator[Dict]:
+        """Async version of ``solve_stream``."""
+        return self.graph.asolve_stream(problem, max_iterations, thread_id=thread_id)
+    
+    def solve_self_consistent(
+        self,
+        problem: str,
+        samples: int = 5,
+        temperature: float = 0.7,
+        quorum: Optional[int] = None,
+        max_iterations: int = 10,
+        thread_id: Optional[str] = None
+    ) -> Dict:
+        """Solve a problem by majority vote over sampled reasoning trajectories.
+        
+        Args:
+            problem: The problem to solve
+            samples: Number of independent trajectories
+            temperature: Sampling temperature of the trajectories
+            quorum: Votes for one answer that end sampling early
+                (default: a majority of ``samples``)
+            max_iterations: Maximum reasoning iterations per trajectory
+            thread_id: Base of the checkpoint threads of the trajectories
+                (requires a checkpointer)
+        
+        Returns:
+            The solution dictionary of a trajectory with the winning answer,
+            with vote counts under "self_consistency"
+        """
+        return run_sync(self.asolve_self_consistent(
+            problem,
+            samples=samples,
+            temperature=temperature,
+            quorum=quorum,
+            max_iterations=max_iterations,
+            thread_id=thread_id
+        ))
+    
+    async def asolve_self_consistent(
+        self,
+        problem: str,
+        samples: int = 5,
+        temperature: float = 0.7,
+        quorum: Optional[int] = None,
+        max_iterations: int = 10,
+        thread_id: Optional[str] = None
+    ) -> Dict:
+        """Async version of ``solve_self_consistent``.
+        
+        All trajectories run concurrently. Answers are grouped with
+        ``answer_key``, so "21", "21.0" and "ANSWER: 21" vote together, and
+        the remaining trajectories are cancelled as soon as one answer has
+        ``quorum`` votes. With a ``thread_id``, each trajectory is
+        checkpointed in its own thread derived from it and the temperature.
+        """
+        graph = self._sampling_graph(temperature)
+        quorum = quorum or samples // 2 + 1
+        tasks = [
+            asyncio.ensure_future(graph.asolve(
+                problem,
+                max_iterations,
+                thread_id=f"{thread_id}:t{temperature}:sample-{i}" if thread_id is not None else None
+            ))
+            for i in range(samples)
+        ]
+        
+        solutions: List[Dict] = []
+        votes: Dict[Tuple, List[Dict]] = {}
+        errors: List[Exception] = []
+        try:
+            for finished in asyncio.as_completed(tasks):
+                try:
+                    solution = await finished
+                except Exception as e:
+                    errors.append(e)
+                    continue
+                solutions.append(solution)
+                if solution.get("final_answer"):
+                    supporters = votes.setdefault(answer_key(solution["final_answer"]), [])
+                    supporters.append(solution)
+                    if len(supporters) >= quorum:
+                        break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        if not solutions:
+            raise errors[-1]
+        # Most votes wins; ties go to the answer that was reached first
+        winners = max(votes.values(), key=len) if votes else solutions
+        result = dict(winners[0])
+        result["self_consistency"] = {
+            "votes": {supporters[0]["final_answer"]: len(supporters) for supporters in votes.values()},
+            "samples": len(solutions),
+            "errors": len(errors),
+            "quorum_reached": any(len(supporters) >= quorum for supporters in votes.values())
+        }
+        return result
+    
+    def _sampling_graph(self, temperature: float) -> CognitiveReasoningGraph:
+        """Reasoning graph on a copy of the LLM that samples at ``temperature``."""
+        graph = self._sampling_graphs.get(temperature)
+        if graph is None:
+            if "temperature" not in type(self.llm).model_fields:
+                raise TypeError(f"{type(self.llm).__name__} does not support a sampling temperature")
+            # Bypass the LLM cache, which would return the same response to every sample
+            llm = self.llm.model_copy(update={"temperature": temperature, "cache": False})
+            graph = self._sampling_graphs[temperature] = CognitiveReasoningGraph.shared(llm, **self._graph_options)
+        return graph
+    
+    def solve_batch(
+        self,
+        problems: List[str],
+        max_iterations: int = 10,
+        concurrency: int = 8,
+        max_retries: int = 2,
+        thread_ids: Optional[Sequence[str]] = None,
+        samples: int = 1,
+        temperature: float = 0.7
+    ) -> List[Dict]:
+        """Solve multiple problems concurrently.
+        
+        Args:
+            problems: List of problems to solve
+            max_iterations: Maximum iterations per problem
+            concurrency: Maximum number of problems solved at once
+            max_retries: Retries per problem after a failed attempt
+            thread_ids: Checkpoint thread of each problem (requires a checkpointer)
+            samples: Trajectories per problem; above 1, answers are chosen
+                by self-consistency voting
+            temperature: Sampling temperature when ``samples`` is above 1
+        
+        Returns:
+            List of solution dictionaries, in the order of ``problems``
+        """
+        return run_sync(self.asolve_batch(
+            problems,
+            max_iterations=max_iterations,
+            concurrency=concurrency,
+            max_retries=max_retries,
+            thread_ids=thread_ids,
+            samples=samples,
+            temperature=temperature
+        ))
+    
+    async def asolve_batch(
+        self,
+        problems: List[str],
+        max_iterations: int = 10,
+        concurrency: int = 8,
+        max_retries: int = 2,
+        retry_delay: float = 1.0,
+        on_result: Optional[Callable[[int, Dict], None]] = None,
+        thread_ids: Optional[Sequence[str]] = None,
+        samples: int = 1,
+        temperature: float = 0.7
+    ) -> List[Dict]:
+        """Solve multiple problems concurrently.
+        
+        A failed problem is retried with exponential backoff and full jitter
+        (a random delay of up to ``retry_delay * 2 ** attempt`` seconds), so
+        problems hitting the same rate limit do not retry in lockstep. A
+        problem that still fails gets a solution dictionary with an "error"
+        key instead of failing the batch. With ``thread_ids`` and a
+        checkpointer, retries resume from the last completed node, and so do
+        problems left unfinished by an earlier, interrupted batch.
         
         Args:
             problems: List of problems to solve
             max_iterations: Maximum iterations per problem
-            
+            concurrency: Maximum number of problems solved at once
+            max_retries: Retries per problem after a failed attempt
+            retry_delay: Base delay in seconds for the retry backoff
+            on_result: Called with (index, solution) as each problem finishes
+            thread_ids: Checkpoint thread of each problem (requires a checkpointer)
+            samples: Trajectories per problem; above 1, answers are chosen
+                by self-consistency voting
+            temperature: Sampling temperature when ``samples`` is above 1
+        
         Returns:
-            List of solution dictionaries
+            List of solution dictionaries, in the order of ``problems``
         """
-        results = []
-        for problem in problems:
-            try:
-                result = self.solve(problem, max_iterations)
-                results.append(result)
-            except Exception as e:
-                results.append({
-                    "problem": problem,
-                    "final_answer": None,
-                    "reasoning_trace": f"Error: {str(e)}",
-                    "tool_usage": [],
-                    "iterations": 0,
-                    "error": str(e)
-                })
-        return results
\ No newline at end of file
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        async def solve_one(index: int, problem: str) -> Dict:
+            async with semaphore:
+                for attempt in range(max_retries + 1):
+                    try:
+                        thread_id = thread_ids[index] if thread_ids is not None else None
+                        if samples > 1:
+                            result = await self.asolve_self_consistent(
+                                problem,
+                                samples=samples,
+                                temperature=temperature,
+                                max_iterations=max_iterations,
+                                thread_id=thread_id
+                            )
+                        else:
+                            result = await self.asolve(problem, max_iterations, thread_id=thread_id)
+                        break
+                    except Exception as e:
+                        if attempt == max_retries:
+                            result = {
+                                "problem": problem,
+                                "final_answer": None,
+                                "reasoning_trace": f"Error: {str(e)}",
+                                "tool_usage": [],
+                                "iterations": 0,
+                                "error": str(e)
+                            }
+                        else:
+                            await asyncio.sleep(random.uniform(0, retry_delay * 2 ** attempt))
+            if on_result:
+                on_result(index, result)
+            return result
+        
+        return await asyncio.gather(*(solve_one(i, problem) for i, problem in enumerate(problems)))
@@ -0,0 +1,295 @@
+"""Answer extraction and number parsing shared by the graph, evaluator and runner.
+
+All patterns are compiled once at import time. The common cases - an
+"ANSWER: ..." line, text without any answer label, a plain number - are
+handled with string operations before falling back to the regexes, which
+give the same results in the remaining cases.
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+
+# Explicit answer statements, in order of preference
+ANSWER_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE | re.MULTILINE)
+    for pattern in (
+        r'ANSWER:\s*(.+?)(?:\n|$)',
+        r'Final Answer:\s*(.+?)(?:\n|$)',
+        r'The answer is:\s*(.+?)(?:\n|$)',
+        r'Result:\s*(.+?)(?:\n|$)',
+        r'Solution:\s*(.+?)(?:\n|$)',
+    )
+]
+ANSWER_LINE_PATTERN = ANSWER_PATTERNS[0]
+
+# Lowercase substrings one of which every ANSWER_PATTERNS match contains
+ANSWER_LABELS = ("answer:", "answer is:", "result:", "solution:")
+
+# Looser patterns used only when the iteration limit is reached
+FALLBACK_ANSWER_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r'(?:GCD|gcd|answer|result|solution)(?:\s+is\s+|\s*:\s*|\s*=\s*)(\d+)',
+        r'(?:equals?|is)\s+(\d+)',
+        r'(?:x\s*=\s*)([\d\s,or]+)',
+        r'(?:The\s+)?(?:final\s+)?(?:answer|result|solution)\s+(?:is\s+)?([^\n.]+)',
+    )
+]
+
+EXECUTION_OUTPUT_LABEL = "Execution Output:"
+INTEGER_PATTERN = re.compile(r'\b\d+\b')
+NUMBER_PATTERN = re.compile(r'[-+]?\d*\.?\d+')
+FRACTION_PATTERN = re.compile(r'[-+]?\d+/\d+')
+INTERVAL_PATTERN = re.compile(r'([\[\(])\s*([-\d.]+)\s*,\s*([-\d.]+)\s*([\]\)])')
+INEQUALITY_INTERVAL_PATTERN = re.compile(r'([-\d.]+)\s*<\s*x\s*<\s*([-\d.]+)')
+SOLUTION_VALUE_PATTERN = re.compile(r'x\s*=\s*([-+]?\d*\.?\d+)')
+TERM_SEPARATOR_PATTERN = re.compile(r'([+-])')
+
+# How much of the already scanned trace is rescanned with each new response,
+# so an answer label at the end of one response still matches its value in
+# the next
+ANSWER_OVERLAP_CHARS = 256
+
+
+def _line_value(text: str, start: int) -> Tuple[str, int]:
+    """The stripped text after ``start``, skipping whitespace, up to the end of its line, and that end."""
+    end = len(text)
+    while start < end and text[start].isspace():
+        start += 1
+    newline = text.find("\n", start)
+    if newline != -1:
+        end = newline
+    return text[start:end].strip(), end
+
+
+def _answer_line_span(text: str, lowered: str) -> Optional[Tuple[str, int]]:
+    """Value of the first "ANSWER: ..." line and the offset where that line ends."""
+    position = lowered.find("answer:")
+    if position == -1:
+        return None
+    # lower() can change the length of some characters, so check the offset is valid
+    if text[position:position + 7].lower() == "answer:":
+        value, end = _line_value(text, position + 7)
+        if value:
+            return value, end
+    match = ANSWER_LINE_PATTERN.search(text)
+    return (match.group(1).strip(), match.end(1)) if match else None
+
+
+def _answer_line(text: str, lowered: str) -> Optional[str]:
+    span = _answer_line_span(text, lowered)
+    return span[0] if span else None
+
+
+def extract_answer_line(text: str) -> Optional[str]:
+    """Value of the first "ANSWER: ..." line (case-insensitive)."""
+    return _answer_line(text, text.lower())
+
+
+def _execution_output_answer(text: str) -> Optional[str]:
+    """First line of the first execution output, unless it reports an error."""
+    output_start = text.find(EXECUTION_OUTPUT_LABEL)
+    if output_start == -1:
+        return None
+    output_text = text[output_start + len(EXECUTION_OUTPUT_LABEL):].strip()
+    # Take first line of output as answer
+    first_line = output_text.split('\n', 1)[0].strip()
+    if first_line and not first_line.startswith(("Error", "Code executed")):
+        return first_line
+    return None
+
+
+def extract_answer(text: str) -> Optional[str]:
+    """Extract the final answer from text."""
+    lowered = text.lower()
+    answer = _answer_line(text, lowered)
+    if answer is not None:
+        return answer
+
+    # Text without any answer label can skip the remaining patterns
+    if any(label in lowered for label in ANSWER_LABELS):
+        for pattern in ANSWER_PATTERNS[1:]:
+            match = pattern.search(text)
+            if match:
+                return match.group(1).strip()
+
+    # If no explicit answer pattern, try to extract from execution output
+    return _execution_output_answer(text)
+
+
+def extract_new_answer(previous_reasoning: str, response_content: str) -> Optional[str]:
+    """Extract an answer from a response appended to an already scanned trace.
+
+    Equivalent to ``extract_answer`` on the whole trace when the earlier part
+    contained no answer, but costs time proportional to the new response
+    rather than to the whole trace.
+    """
+    return extract_answer(previous_reasoning[-ANSWER_OVERLAP_CHARS:] + "\n" + response_content)
+
+
+def extract_answer_from_reasoning(reasoning: str) -> Optional[str]:
+    """Extract an answer from a reasoning trace using various heuristics."""
+    # First try standard extraction
+    answer = extract_answer(reasoning)
+    if answer:
+        return answer
+
+    # Look for common answer patterns in the text
+    for pattern in FALLBACK_ANSWER_PATTERNS:
+        matches = pattern.findall(reasoning)
+        if matches:
+            # Return the last match
+            return matches[-1].strip()
+
+    # For code execution results, look for the last number
+    if EXECUTION_OUTPUT_LABEL in reasoning:
+        output_section = reasoning.rsplit(EXECUTION_OUTPUT_LABEL, 1)[-1]
+        numbers = INTEGER_PATTERN.findall(output_section)
+        if numbers:
+            return numbers[-1]
+
+    return None
+
+
+def extract_number(text: str) -> Optional[float]:
+    """Extract the first number from text."""
+    # Fast path: the text is a plain decimal number
+    stripped = text.strip()
+    body = stripped[1:] if stripped[:1] in ("-", "+") else stripped
+    if body.replace(".", "", 1).isdecimal():
+        try:
+            return float(stripped)
+        except ValueError:
+            pass
+
+    for pattern in (NUMBER_PATTERN, FRACTION_PATTERN):
+        match = pattern.search(text)
+        if match:
+            num_str = match.group()
+            try:
+                # Handle fractions
+                if "/" in num_str:
+                    num, denom = num_str.split("/")
+                    return float(num) / float(denom)
+                return float(num_str)
+            except (ValueError, ZeroDivisionError):
+                continue
+
+    return None
+
+
+def extract_numbers(text: str) -> List[float]:
+    """All numbers in text, in order."""
+    return [float(n) for n in NUMBER_PATTERN.findall(text)]
+
+
+def extract_interval(text: str) -> Optional[Tuple[float, float]]:
+    """Bounds of an interval written as (a, b), [a, b] or a < x < b."""
+    # Extract bounds from interval notation
+    match = INTERVAL_PATTERN.search(text)
+    if match:
+        left_bracket, left, right, right_bracket = match.groups()
+        return (float(left), float(right))
+
+    # Try inequality format: a < x < b
+    match = INEQUALITY_INTERVAL_PATTERN.search(text)
+    if match:
+        return (float(match.group(1)), float(match.group(2)))
+
+    return None
+
+
+def extract_solution_values(text: str) -> Optional[List[float]]:
+    """Solution values from 'x = a or x = b' style answers."""
+    # Look for "x = number" patterns
+    matches = SOLUTION_VALUE_PATTERN.findall(text)
+    if matches:
+        return [float(m) for m in matches]
+
+    # Look for just numbers separated by "or"
+    if " or " in text:
+        values = []
+        for part in text.split(" or "):
+            num = extract_number(part)
+            if num is not None:
+                values.append(num)
+        if values:
+            return values
+
+    return None
+
+
+def normalize_answer(answer: str) -> str:
+    """Normalize answer string for comparison."""
+    # Convert to lowercase and strip whitespace
+    answer = answer.lower().strip()
+    
+    # Remove common prefixes
+    prefixes = ["answer:", "the answer is", "final answer:"]
+    for prefix in prefixes:
+        if answer.startswith(prefix):
+            answer = answer[len(prefix):].strip()
+    
+    # Normalize mathematical notation
+    answer = answer.replace("×", "*").replace("÷", "/")
+    answer = answer.replace("^", "**")
+    
+    return answer
+
+
+def answer_key(answer: str) -> Tuple:
+    """A hashable key under which equivalent answers compare equal.
+    
+    Numbers (including fractions) are keyed by value, intervals by their
+    bounds, "x = a or x = b" answers by their set of values and anything
+    else by its normalized text without spaces.
+    """
+    normalized = normalize_answer(answer).strip("$. ")
+    if NUMBER_PATTERN.fullmatch(normalized):
+        return ("number", round(float(normalized), 9))
+    if FRACTION_PATTERN.fullmatch(normalized):
+        num, denom = normalized.split("/")
+        if float(denom):
+            return ("number", round(float(num) / float(denom), 9))
+    try:
+        interval = extract_interval(normalized)
+    except ValueError:
+        interval = None
+    if interval:
+        return ("interval", round(interval[0], 9), round(interval[1], 9))
+    values = SOLUTION_VALUE_PATTERN.findall(normalized)
+    if values:
+        return ("values", tuple(sorted({round(float(value), 9) for value in values})))
+    return ("text", normalized.replace(" ", ""))
+
+
+class AnswerLineDetector:
+    """Spots a complete "ANSWER: ..." line in text that arrives in pieces.
+    
+    Only the text since the previous complete line (plus an overlap, for an
+    answer label on a line of its own) is scanned when a new line completes,
+    so feeding a whole response costs time proportional to its length.
+    Once an answer is found, ``answer_end`` is the offset in ``text`` where
+    its line ends.
+    """
+    
+    def __init__(self):
+        self.text = ""
+        self.answer_end: Optional[int] = None
+        self._checked = 0
+    
+    def feed(self, delta: str) -> Optional[str]:
+        """Add streamed text; return the answer once its line is complete."""
+        self.text += delta
+        if "\n" not in delta:
+            return None
+        end = self.text.rfind("\n")
+        start = max(0, self._checked - ANSWER_OVERLAP_CHARS)
+        window = self.text[start:end]
+        self._checked = end
+        span = _answer_line_span(window, window.lower())
+        if not span or not span[0]:
+            return None
+        self.answer_end = start + span[1]
+        return span[0]
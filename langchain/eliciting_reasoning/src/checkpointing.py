@@ -0,0 +1,77 @@
+"""SQLite checkpoint storage for resumable reasoning runs."""
+
+import asyncio
+import sqlite3
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional, Sequence, Tuple, Union
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+
+class SQLiteCheckpointSaver(SqliteSaver):
+    """LangGraph checkpoint saver stored in a local SQLite file.
+    
+    With a checkpointer, the graph state is saved after every node, keyed
+    by the run's thread id, so a run that crashed or hit a rate limit can
+    resume from its last completed node instead of starting over.
+    
+    ``SqliteSaver`` only supports sync graphs; this saver also serves async
+    graphs by running its queries in a worker thread, so one file (and one
+    connection) works for ``solve``, ``asolve`` and batch runs alike.
+    """
+    
+    def __init__(self, path: Union[str, Path]):
+        """Open (or create) the checkpoint database.
+        
+        Args:
+            path: SQLite database file
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        super().__init__(sqlite3.connect(str(self.path), check_same_thread=False))
+    
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+    
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> AsyncIterator[CheckpointTuple]:
+        # list() holds the connection lock until exhausted, so read it all in the thread
+        checkpoints = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for checkpoint in checkpoints:
+            yield checkpoint
+    
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+    
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = ""
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+    
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,313 @@
+"""Sandboxed worker processes for executing generated Python code.
+
+Code from the use_code tool runs in a pool of warm worker interpreters
+rather than in the host process. Each worker has an address-space limit,
+each snippet a CPU-time limit and a wall-clock timeout, and stdout is
+captured inside the worker, so concurrent snippets cannot interfere with
+each other or with the host. A worker that times out, runs out of CPU time
+or crashes is killed and replaced.
+
+Results of deterministic snippets can be memoized with ExecutionCache.
+
+Worker processes import this module, so it only imports the standard library.
+"""
+
+import ast
+import asyncio
+import contextlib
+import hashlib
+import io
+import multiprocessing
+import os
+import signal
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows: limits other than the timeout are skipped
+    resource = None
+
+
+# Code using these modules can give a different result on every run
+NONDETERMINISTIC_MODULES = frozenset({"random", "time", "datetime", "secrets", "uuid"})
+
+# Sandbox failures that say nothing about the code's result and are not cached
+TRANSIENT_ERRORS = ("TimeoutError:", "RuntimeError: sandbox process exited")
+
+
+def normalized_code_key(code: str) -> Optional[str]:
+    """Hash of the code's AST, or None if the code is non-deterministic.
+    
+    Hashing the AST rather than the text makes snippets that differ only in
+    comments, blank lines or formatting share a key. Code that imports (or
+    uses an attribute named after) a module in NONDETERMINISTIC_MODULES, such
+    as ``np.random``, gets no key.
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        # The syntax error is deterministic, so key it on the text
+        return "text:" + hashlib.sha256(code.encode("utf-8")).hexdigest()
+    
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            names = [node.module or ""] + [alias.name for alias in node.names]
+        elif isinstance(node, ast.Attribute):
+            names = [node.attr]
+        else:
+            continue
+        if any(part in NONDETERMINISTIC_MODULES for name in names for part in name.split(".")):
+            return None
+    
+    dump = ast.dump(tree, annotate_fields=False, include_attributes=False)
+    return "ast:" + hashlib.sha256(dump.encode("utf-8")).hexdigest()
+
+
+class ExecutionCache:
+    """Thread-safe LRU cache of code execution results keyed by normalized source."""
+    
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._results: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            result = self._results.get(key)
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._results.move_to_end(key)
+            return result
+    
+    def put(self, key: str, result: str) -> None:
+        """Store a result unless it is a transient sandbox failure."""
+        if result.startswith("Error executing code:") and any(error in result for error in TRANSIENT_ERRORS):
+            return
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._results)}
+
+
+def execute_snippet(code: str) -> str:
+    """Execute Python code and describe its result.
+    
+    Returns the printed output, else the value of a trailing expression,
+    else the variables the code created.
+    """
+    output_buffer = io.StringIO()
+    # One namespace, so functions defined by the code can see its other globals
+    namespace = {}
+    
+    try:
+        with contextlib.redirect_stdout(output_buffer):
+            exec(code, namespace)
+            
+            # Get the output
+            output = output_buffer.getvalue()
+            
+            # If no output from print, try to get the last expression value
+            if not output:
+                # Try to find the last expression in the code
+                lines = code.strip().split('\n')
+                last_line = lines[-1].strip()
+                
+                # If last line is not an assignment or import, evaluate it
+                if (last_line and
+                    not last_line.startswith(('import ', 'from ', 'def ', 'class ')) and
+                    '=' not in last_line and
+                    not last_line.startswith(('#', 'print('))):
+                    try:
+                        result = eval(last_line, namespace)
+                        if result is not None:
+                            output = str(result)
+                    except Exception:
+                        pass
+        
+        if not output:
+            # Check if any variables were created
+            created_vars = {k: v for k, v in namespace.items() if not k.startswith('_')}
+            if created_vars:
+                output = "Variables created:\n"
+                for name, value in created_vars.items():
+                    output += f"{name} = {value}\n"
+            else:
+                output = "Code executed successfully but produced no output."
+        
+        return output
+    
+    except MemoryError:
+        return "Error executing code:\nMemoryError: memory limit exceeded"
+    except BaseException as e:
+        # Capture the error (including SystemExit from exit() calls)
+        return f"Error executing code:\n{type(e).__name__}: {str(e)}"
+
+
+def _set_cpu_limit(cpu_seconds: float) -> None:
+    """Allow ``cpu_seconds`` more CPU time from now; SIGXCPU kills the worker after that."""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    soft = int(usage.ru_utime + usage.ru_stime + cpu_seconds) + 1
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _worker_main(conn, cpu_seconds: Optional[float], memory_bytes: Optional[int]) -> None:
+    """Worker process loop: execute code snippets until the pipe closes."""
+    if resource is not None and memory_bytes:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+    while True:
+        try:
+            code = conn.recv()
+        except (EOFError, OSError):
+            return
+        if resource is not None and cpu_seconds:
+            _set_cpu_limit(cpu_seconds)
+        conn.send(execute_snippet(code))
+
+
+class _Worker:
+    def __init__(self, context, cpu_seconds: Optional[float], memory_bytes: Optional[int]):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, cpu_seconds, memory_bytes),
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+    
+    def kill(self) -> Optional[int]:
+        """Kill the process (if still running) and return its exit code."""
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+        return self.process.exitcode
+
+
+class CodeSandbox:
+    """A pool of pre-started worker processes that execute code snippets.
+    
+    ``run`` is thread-safe and ``arun`` can be awaited from many tasks; at
+    most ``size`` snippets run at once and the rest wait for a free worker.
+    """
+    
+    def __init__(
+        self,
+        size: int = 4,
+        timeout: float = 10.0,
+        cpu_seconds: Optional[float] = 10.0,
+        memory_mb: Optional[int] = 1024,
+        max_output_chars: int = 10000,
+        start_method: str = "spawn"
+    ):
+        """Start the worker processes.
+        
+        Args:
+            size: Number of worker processes
+            timeout: Wall-clock seconds before a snippet's worker is killed
+            cpu_seconds: CPU seconds a snippet may use (None for no limit)
+            memory_mb: Address-space limit of each worker (None for no limit)
+            max_output_chars: Longer output is truncated
+            start_method: multiprocessing start method for the workers
+        """
+        self.size = size
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_bytes = memory_mb * 1024 * 1024 if memory_mb else None
+        self.max_output_chars = max_output_chars
+        self._context = multiprocessing.get_context(start_method)
+        self._available = threading.Condition()
+        self._idle: List[_Worker] = [self._start_worker() for _ in range(size)]
+        self._count = size
+    
+    def _start_worker(self) -> _Worker:
+        return _Worker(self._context, self.cpu_seconds, self.memory_bytes)
+    
+    def _acquire(self) -> _Worker:
+        with self._available:
+            while not self._idle and self._count >= self.size:
+                self._available.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._count += 1
+        try:
+            return self._start_worker()
+        except BaseException:
+            self._release(None)
+            raise
+    
+    def _release(self, worker: Optional[_Worker]) -> None:
+        """Return a healthy worker to the pool, or free the slot of a dead one."""
+        with self._available:
+            if worker is None:
+                self._count -= 1
+            else:
+                self._idle.append(worker)
+            self._available.notify()
+    
+    def run(self, code: str) -> str:
+        """Execute code in a worker and return its output or an error description."""
+        worker = self._acquire()
+        try:
+            worker.conn.send(code)
+            if not worker.conn.poll(self.timeout):
+                worker.kill()
+                worker = None
+                return f"Error executing code:\nTimeoutError: execution exceeded {self.timeout}s"
+            output = worker.conn.recv()
+        except (EOFError, OSError):
+            exitcode = worker.kill()
+            worker = None
+            if exitcode == -getattr(signal, "SIGXCPU", 0):
+                return f"Error executing code:\nTimeoutError: CPU time limit of {self.cpu_seconds}s exceeded"
+            return f"Error executing code:\nRuntimeError: sandbox process exited with code {exitcode}"
+        except BaseException:
+            worker.kill()
+            worker = None
+            raise
+        finally:
+            self._release(worker)
+        
+        if len(output) > self.max_output_chars:
+            output = output[:self.max_output_chars] + "\n... (output truncated)"
+        return output
+    
+    async def arun(self, code: str) -> str:
+        """Async version of ``run``."""
+        return await asyncio.get_running_loop().run_in_executor(None, self.run, code)
+    
+    def close(self) -> None:
+        """Kill all idle workers."""
+        with self._available:
+            for worker in self._idle:
+                worker.kill()
+            self._count -= len(self._idle)
+            self._idle.clear()
+
+
+_default_sandbox: Optional[CodeSandbox] = None
+_default_sandbox_lock = threading.Lock()
+
+
+def get_default_sandbox() -> CodeSandbox:
+    """The process-wide sandbox, started on first use."""
+    global _default_sandbox
+    with _default_sandbox_lock:
+        if _default_sandbox is None:
+            _default_sandbox = CodeSandbox(size=min(4, os.cpu_count() or 1))
+        return _default_sandbox
@@ -0,0 +1,131 @@
+"""Compaction of the message history sent to the LLM on each reasoning step."""
+
+from typing import Callable, List, Optional, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+
+
+# Characters of a tool call's output kept in the summary of an omitted step
+SUMMARY_OUTPUT_CHARS = 160
+
+# Most recent omitted tool calls listed in the summary; older ones are only counted
+MAX_SUMMARY_LINES = 12
+
+
+def truncate_text(text: str, max_chars: int) -> str:
+    """Keep the start and end of a long text, marking what was cut."""
+    if len(text) <= max_chars:
+        return text
+    head = max_chars * 2 // 3
+    tail = max_chars - head
+    omitted = len(text) - head - tail
+    return f"{text[:head]}\n... ({omitted} characters omitted) ...\n{text[len(text) - tail:]}"
+
+
+def _content_text(message: BaseMessage) -> str:
+    if isinstance(message.content, list):
+        return " ".join(str(item) for item in message.content)
+    return str(message.content)
+
+
+def _split_rounds(messages: Sequence[BaseMessage]) -> List[List[BaseMessage]]:
+    """Group messages into rounds: an AI message followed by its tool results.
+    
+    A round is only ever kept or dropped as a whole, so no tool result is
+    sent without the tool call it answers.
+    """
+    rounds: List[List[BaseMessage]] = []
+    for message in messages:
+        if isinstance(message, AIMessage) or not rounds:
+            rounds.append([message])
+        else:
+            rounds[-1].append(message)
+    return rounds
+
+
+def _truncate_tool_outputs(round_messages: List[BaseMessage], max_chars: int) -> List[BaseMessage]:
+    return [
+        message.model_copy(update={"content": truncate_text(_content_text(message), max_chars)})
+        if isinstance(message, ToolMessage) and len(_content_text(message)) > max_chars
+        else message
+        for message in round_messages
+    ]
+
+
+def _summary_lines(round_messages: List[BaseMessage]) -> List[str]:
+    """One line per tool call of an omitted round, with the start of its output."""
+    outputs = {
+        message.tool_call_id: " ".join(_content_text(message).split())
+        for message in round_messages
+        if isinstance(message, ToolMessage)
+    }
+    lines = []
+    for message in round_messages:
+        for tool_call in getattr(message, "tool_calls", None) or []:
+            output = outputs.get(tool_call["id"], "(no result)")
+            if len(output) > SUMMARY_OUTPUT_CHARS:
+                output = output[:SUMMARY_OUTPUT_CHARS] + "..."
+            lines.append(f"- {tool_call['name']}: {output}")
+    return lines
+
+
+def _with_summary(prompt: HumanMessage, omitted_rounds: List[List[BaseMessage]]) -> HumanMessage:
+    lines = [line for round_messages in omitted_rounds for line in _summary_lines(round_messages)]
+    summary = f"Earlier steps ({len(omitted_rounds)} omitted to save context)"
+    if len(lines) > MAX_SUMMARY_LINES:
+        summary += f", last {MAX_SUMMARY_LINES} of {len(lines)} tool calls"
+        lines = lines[-MAX_SUMMARY_LINES:]
+    summary = "\n".join([summary + ":"] + lines)
+    return prompt.model_copy(update={"content": f"{_content_text(prompt)}\n\n{summary}"})
+
+
+def compact_history(
+    prompt: HumanMessage,
+    history: Sequence[BaseMessage],
+    max_tokens: Optional[int],
+    max_tool_output_chars: int = 2000,
+    token_counter: Callable[[Sequence[BaseMessage]], int] = count_tokens_approximately
+) -> List[BaseMessage]:
+    """Build the messages for an LLM call within a token budget.
+    
+    The prompt (system instructions and problem) and the latest round are
+    always kept. Tool outputs of earlier rounds are truncated to
+    ``max_tool_output_chars``, then the oldest rounds are dropped until the
+    messages fit in ``max_tokens``; the tool calls of dropped rounds are
+    summarized in one line each at the end of the prompt. If the latest
+    round alone is over budget, its tool outputs are truncated as well.
+    
+    Args:
+        prompt: Message with the system instructions and the problem
+        history: Messages of the previous reasoning steps, oldest first
+        max_tokens: Token budget for all messages (None for no limit)
+        max_tool_output_chars: Length tool outputs of earlier rounds are cut to
+        token_counter: Function estimating the tokens of a list of messages
+    
+    Returns:
+        The messages to send, starting with the (possibly extended) prompt
+    """
+    if max_tokens is None or not history:
+        return [prompt, *history]
+    
+    rounds = _split_rounds(history)
+    latest = rounds.pop()
+    rounds = [_truncate_tool_outputs(round_messages, max_tool_output_chars) for round_messages in rounds]
+    
+    # Count each round once and drop the oldest until the rest, with the
+    # summary of the dropped ones, fits
+    round_tokens = [token_counter(round_messages) for round_messages in rounds]
+    latest_tokens = token_counter(latest)
+    summarized = prompt
+    fixed_tokens = token_counter([prompt]) + latest_tokens
+    dropped = 0
+    while dropped < len(rounds) and fixed_tokens + sum(round_tokens[dropped:]) > max_tokens:
+        dropped += 1
+        summarized = _with_summary(prompt, rounds[:dropped])
+        fixed_tokens = token_counter([summarized]) + latest_tokens
+    
+    if fixed_tokens > max_tokens:
+        latest = _truncate_tool_outputs(latest, max_tool_output_chars)
+    
+    return [summarized] + [message for round_messages in rounds[dropped:] for message in round_messages] + latest
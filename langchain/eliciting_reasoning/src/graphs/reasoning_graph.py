@@ -1,16 +1,25 @@
 """LangGraph implementation of the cognitive reasoning system."""
 
-import re
-from typing import Dict, List, Literal, Optional, Sequence, Annotated
+import asyncio
+import threading
+import weakref
+from typing import Annotated, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Literal, Optional, Sequence, Tuple
 from operator import add
 
-from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, ToolMessage
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, AIMessageChunk, ToolMessage
+from langchain_core.messages.utils import message_chunk_to_message
 from langchain_core.language_models import BaseLanguageModel
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langchain_core.tools import BaseTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import StateGraph, START, END
 from langgraph.prebuilt import ToolNode
+from langgraph.prebuilt.tool_node import ToolCallRequest
 from langgraph.graph.message import add_messages
 
 from .state import CognitiveReasoningState
+from .compaction import compact_history, truncate_text
 from ..tools import (
     UnderstandQuestionTool,
     RecallRelatedTool,
@@ -19,35 +28,164 @@ from ..tools import (
     UseCodeTool
 )
 from ..prompts.system_prompts import MAIN_SYSTEM_PROMPT
+from ..problem_index import ProblemIndex
+from ..answer_parsing import (
+    AnswerLineDetector,
+    answer_key,
+    extract_answer,
+    extract_answer_from_reasoning,
+    extract_new_answer
+)
+from ..verification import Verification, check_code_outputs, check_substitution, examination_verdict
+
+
+# use_code snippets from the latest steps that are re-run to check an answer
+MAX_VERIFIED_SNIPPETS = 3
+
+# Characters of the reasoning shown to examine_answer along with the answer
+EXAMINED_REASONING_CHARS = 2000
+
+# Characters of a rejecting examination passed back to the model
+EXAMINATION_FEEDBACK_CHARS = 1000
+
+# Config key that makes the reasoning node stream its LLM calls and stop them early
+STREAM_REASONING_KEY = "stream_reasoning"
+
+# OpenAI-format tool schemas, which only depend on the tool's class, name and description
+_TOOL_SCHEMAS: Dict[tuple, Dict] = {}
+_TOOL_SCHEMAS_LOCK = threading.Lock()
+
+# Graphs shared by agents with the same LLM and options. A graph references
+# its LLM, so the LLM's id cannot be reused while the entry exists.
+_SHARED_GRAPHS: "weakref.WeakValueDictionary[tuple, CognitiveReasoningGraph]" = weakref.WeakValueDictionary()
+_SHARED_GRAPHS_LOCK = threading.Lock()
+
+
+def tool_schema(tool: BaseTool) -> Dict:
+    """The tool's OpenAI function-calling schema, generated once per tool type."""
+    key = (type(tool), tool.name, tool.description)
+    schema = _TOOL_SCHEMAS.get(key)
+    if schema is None:
+        schema = convert_to_openai_tool(tool)
+        with _TOOL_SCHEMAS_LOCK:
+            _TOOL_SCHEMAS[key] = schema
+    return schema
 
 
 class CognitiveReasoningGraph:
     """Graph for cognitive reasoning with tools."""
     
-    def __init__(self, llm: BaseLanguageModel):
+    def __init__(
+        self,
+        llm: BaseLanguageModel,
+        max_parallel_tools: int = 8,
+        problem_index: Optional[ProblemIndex] = None,
+        max_context_tokens: Optional[int] = 8000,
+        max_tool_output_chars: int = 2000,
+        checkpointer: Optional[BaseCheckpointSaver] = None,
+        verify_with_llm: bool = True
+    ):
+        """Initialize the reasoning graph.
+        
+        Args:
+            llm: Language model to use for reasoning and tools
+            max_parallel_tools: Maximum number of tool calls running at once,
+                across all problems this graph is solving
+            problem_index: Solved problems for recall_related to retrieve
+                instead of asking the LLM for analogues
+            max_context_tokens: Token budget for the messages sent on each
+                reasoning step (None to always send the full history)
+            max_tool_output_chars: Length tool outputs of earlier steps are
+                truncated to when the history is compacted
+            checkpointer: Saves the state after every node, so runs given a
+                thread id can be resumed
+            verify_with_llm: Ask examine_answer about answers that the local
+                checks can neither confirm nor refute
+        """
         self.llm = llm
+        self.max_parallel_tools = max_parallel_tools
+        self.problem_index = problem_index
+        self.max_context_tokens = max_context_tokens
+        self.max_tool_output_chars = max_tool_output_chars
+        self.checkpointer = checkpointer
+        self.verify_with_llm = verify_with_llm
         self.tools = self._create_tools(llm)
-        self.graph = self._build_graph()
+        # Bound once, so each step skips re-binding and converting the tools
+        self.bound_llm = llm.bind_tools([tool_schema(tool) for tool in self.tools])
+        self.system_prompt = MAIN_SYSTEM_PROMPT.format(
+            tool_descriptions=self._format_tool_descriptions()
+        )
+        # Sync runs execute tool calls in threads, async runs as tasks on an event loop
+        self._tool_slots = threading.BoundedSemaphore(max_parallel_tools)
+        self._async_tool_slots = weakref.WeakKeyDictionary()
+        self.graph = self._build_graph(checkpointer)
+        # Runs without a thread id are not checkpointed
+        self._unsaved_graph = self.graph if checkpointer is None else self._build_graph(None)
+    
+    @classmethod
+    def shared(
+        cls,
+        llm: BaseLanguageModel,
+        max_parallel_tools: int = 8,
+        problem_index: Optional[ProblemIndex] = None,
+        max_context_tokens: Optional[int] = 8000,
+        max_tool_output_chars: int = 2000,
+        checkpointer: Optional[BaseCheckpointSaver] = None,
+        verify_with_llm: bool = True
+    ) -> "CognitiveReasoningGraph":
+        """Get a graph for these arguments, reusing one built earlier if it is still in use.
+        
+        Graphs hold no per-problem state, so agents with the same LLM and
+        tool set can share one compiled graph (and its parallel tool limit).
+        """
+        key = (
+            id(llm),
+            max_parallel_tools,
+            id(problem_index),
+            max_context_tokens,
+            max_tool_output_chars,
+            id(checkpointer),
+            verify_with_llm
+        )
+        with _SHARED_GRAPHS_LOCK:
+            graph = _SHARED_GRAPHS.get(key)
+            if graph is None:
+                graph = _SHARED_GRAPHS[key] = cls(
+                    llm,
+                    max_parallel_tools=max_parallel_tools,
+                    problem_index=problem_index,
+                    max_context_tokens=max_context_tokens,
+                    max_tool_output_chars=max_tool_output_chars,
+                    checkpointer=checkpointer,
+                    verify_with_llm=verify_with_llm
+                )
+        return graph
     
     def _create_tools(self, llm: BaseLanguageModel) -> List:
         """Create cognitive tools with the given LLM."""
         return [
             UnderstandQuestionTool(llm=llm),
-            RecallRelatedTool(llm=llm),
+            RecallRelatedTool(llm=llm, index=self.problem_index),
             ExamineAnswerTool(llm=llm),
             BacktrackingTool(llm=llm),
             UseCodeTool(llm=llm)
         ]
     
-    def _build_graph(self) -> StateGraph:
+    def _build_graph(self, checkpointer: Optional[BaseCheckpointSaver]) -> StateGraph:
         """Build the reasoning graph."""
         # Create graph
         graph = StateGraph(CognitiveReasoningState)
         
         # Add nodes
-        graph.add_node("reason", self._reason_node)
-        graph.add_node("tools", ToolNode(self.tools))
-        graph.add_node("check_solution", self._check_solution_node)
+        graph.add_node("reason", RunnableLambda(self._reason_node, afunc=self._areason_node))
+        # ToolNode runs all tool calls of one AI message concurrently and
+        # returns their ToolMessages in call order; the wrappers bound the fan-out
+        graph.add_node("tools", ToolNode(
+            self.tools,
+            wrap_tool_call=self._limit_tool_call,
+            awrap_tool_call=self._alimit_tool_call
+        ))
+        graph.add_node("check_solution", RunnableLambda(self._check_solution_node, afunc=self._acheck_solution_node))
         graph.add_node("finalize", self._finalize_node)
         
         # Add edges
@@ -72,7 +210,25 @@ class CognitiveReasoningGraph:
         )
         graph.add_edge("finalize", END)
         
-        return graph.compile()
+        return graph.compile(checkpointer=checkpointer)
+    
+    def _limit_tool_call(self, request: ToolCallRequest, execute: Callable) -> ToolMessage:
+        """Run a tool call once a parallel tool slot is free."""
+        with self._tool_slots:
+            return execute(request)
+    
+    async def _alimit_tool_call(self, request: ToolCallRequest, execute: Callable) -> ToolMessage:
+        """Async version of ``_limit_tool_call``."""
+        loop = asyncio.get_running_loop()
+        slots = self._async_tool_slots.get(loop)
+        if slots is None:
+            slots = self._async_tool_slots[loop] = asyncio.Semaphore(self.max_parallel_tools)
+        async with slots:
+            return await execute(request)
+    
+    def _tool(self, name: str) -> BaseTool:
+        """The cognitive tool with the given name."""
+        return next(tool for tool in self.tools if tool.name == name)
     
     def _format_tool_descriptions(self) -> str:
         """Format tool descriptions for the system prompt."""
@@ -81,43 +237,114 @@ class CognitiveReasoningGraph:
             descriptions.append(f"- {tool.name}: {tool.description}")
         return "\n".join(descriptions)
     
-    def _reason_node(self, state: CognitiveReasoningState) -> Dict:
+    def _reason_node(self, state: CognitiveReasoningState, config: RunnableConfig) -> Dict:
         """Main reasoning node that decides on actions."""
         # Increment iteration
         iteration = state.get("iteration", 0) + 1
         
         # Check if we've reached max iterations
         if iteration >= state.get("max_iterations", 10):
-            # Try to extract answer from reasoning trace
-            extracted_answer = self._extract_answer_from_reasoning(state.get("current_reasoning", ""))
-            if extracted_answer:
-                return {
-                    "messages": [AIMessage(content=f"ANSWER: {extracted_answer}")],
-                    "iteration": iteration,
-                    "final_answer": extracted_answer
-                }
-            else:
-                return {
-                    "messages": [AIMessage(content="Maximum iterations reached. Unable to provide a final answer.")],
-                    "iteration": iteration,
-                    "final_answer": None
-                }
+            return self._max_iterations_updates(state, iteration)
         
-        # Build context from previous messages
-        messages = state.get("messages", [])
+        # Get LLM response
+        messages = self._build_messages(state, iteration)
+        llm = self.bound_llm
+        if config.get("configurable", {}).get(STREAM_REASONING_KEY):
+            chunks = llm.stream(messages, config)
+            try:
+                response = self._collect_until_answer(chunks)
+            finally:
+                # Stops the generation if an answer ended the stream early
+                chunks.close()
+        else:
+            response = llm.invoke(messages)
         
-        # Create system message if this is the first iteration
-        if iteration == 1:
-            system_prompt = MAIN_SYSTEM_PROMPT.format(
-                tool_descriptions=self._format_tool_descriptions()
-            )
-            messages = [
-                HumanMessage(content=f"{system_prompt}\n\nProblem: {state['problem']}\n\nRemember: You MUST end your response with 'ANSWER: [your final answer]' when you have solved the problem.")
-            ]
+        return self._reasoning_updates(state, iteration, response)
+    
+    async def _areason_node(self, state: CognitiveReasoningState, config: RunnableConfig) -> Dict:
+        """Async version of the reasoning node, used by ``ainvoke``."""
+        iteration = state.get("iteration", 0) + 1
         
-        # Get LLM response
-        response = self.llm.bind_tools(self.tools).invoke(messages)
+        if iteration >= state.get("max_iterations", 10):
+            return self._max_iterations_updates(state, iteration)
+        
+        messages = self._build_messages(state, iteration)
+        llm = self.bound_llm
+        if config.get("configurable", {}).get(STREAM_REASONING_KEY):
+            chunks = llm.astream(messages, config)
+            try:
+                response = await self._acollect_until_answer(chunks)
+            finally:
+                await chunks.aclose()
+        else:
+            response = await llm.ainvoke(messages)
+        
+        return self._reasoning_updates(state, iteration, response)
+    
+    def _collect_until_answer(self, chunks: Iterable[AIMessageChunk]) -> AIMessage:
+        """Merge streamed chunks into a message, stopping at a complete ANSWER: line."""
+        response = None
+        detector = AnswerLineDetector()
+        for chunk in chunks:
+            response = chunk if response is None else response + chunk
+            if detector.feed(chunk.text):
+                return self._answer_only(response, detector.answer_end)
+        return message_chunk_to_message(response) if response is not None else AIMessage(content="")
+    
+    async def _acollect_until_answer(self, chunks: AsyncIterator[AIMessageChunk]) -> AIMessage:
+        """Async version of ``_collect_until_answer``."""
+        response = None
+        detector = AnswerLineDetector()
+        async for chunk in chunks:
+            response = chunk if response is None else response + chunk
+            if detector.feed(chunk.text):
+                return self._answer_only(response, detector.answer_end)
+        return message_chunk_to_message(response) if response is not None else AIMessage(content="")
+    
+    @staticmethod
+    def _answer_only(response: AIMessageChunk, answer_end: int) -> AIMessage:
+        """The text of a response up to the end of its answer line, without partial tool calls."""
+        return AIMessage(
+            content=response.text[:answer_end],
+            id=response.id,
+            response_metadata=response.response_metadata,
+            usage_metadata=response.usage_metadata
+        )
+    
+    def _max_iterations_updates(self, state: CognitiveReasoningState, iteration: int) -> Dict:
+        """State updates once the iteration limit is reached."""
+        # Try to extract answer from reasoning trace
+        extracted_answer = self._extract_answer_from_reasoning(state.get("current_reasoning", ""))
+        if extracted_answer:
+            return {
+                "messages": [AIMessage(content=f"ANSWER: {extracted_answer}")],
+                "iteration": iteration,
+                "final_answer": extracted_answer
+            }
+        else:
+            return {
+                "messages": [AIMessage(content="Maximum iterations reached. Unable to provide a final answer.")],
+                "iteration": iteration,
+                "final_answer": None
+            }
+    
+    def _build_messages(self, state: CognitiveReasoningState, iteration: int) -> List[BaseMessage]:
+        """Build the messages to send to the LLM for this iteration.
         
+        Every step starts with the instructions and the problem, followed by
+        the previous steps compacted to fit ``max_context_tokens``.
+        """
+        prompt = HumanMessage(content=f"{self.system_prompt}\n\nProblem: {state['problem']}\n\nRemember: You MUST end your response with 'ANSWER: [your final answer]' when you have solved the problem.")
+        
+        return compact_history(
+            prompt,
+            state.get("messages", []),
+            self.max_context_tokens,
+            max_tool_output_chars=self.max_tool_output_chars
+        )
+    
+    def _reasoning_updates(self, state: CognitiveReasoningState, iteration: int, response: BaseMessage) -> Dict:
+        """Turn an LLM response into state updates."""
         # Extract content from response
         response_content = ""
         if hasattr(response, 'content'):
@@ -128,19 +355,31 @@ class CognitiveReasoningGraph:
                 response_content = str(response.content)
         
         # Update state
+        previous_reasoning = state.get("current_reasoning", "")
         updates = {
             "messages": [response],
             "iteration": iteration,
-            "current_reasoning": state.get("current_reasoning", "") + "\n" + response_content
+            "current_reasoning": previous_reasoning + "\n" + response_content
         }
         
         # Check if answer is provided
         if response_content and "ANSWER:" in response_content.upper():
             updates["final_answer"] = self._extract_answer(response_content)
         
-        # Also check the entire reasoning trace for answers
-        if not updates.get("final_answer") and updates["current_reasoning"]:
-            updates["final_answer"] = self._extract_answer(updates["current_reasoning"])
+        # Also check the rest of the reasoning trace for answers. Earlier
+        # steps already scanned it, so only the new response (plus a small
+        # overlap) is scanned, falling back to their answer. After a failed
+        # verification, only answers from the revised response count.
+        if not updates.get("final_answer"):
+            if state.get("needs_backtracking"):
+                updates["final_answer"] = extract_new_answer("", response_content)
+            else:
+                updates["final_answer"] = (
+                    extract_new_answer(previous_reasoning, response_content)
+                    or state.get("final_answer")
+                )
+        if updates["final_answer"]:
+            updates["needs_backtracking"] = False
         
         return updates
     
@@ -167,19 +406,137 @@ class CognitiveReasoningGraph:
         return "tools"  # Default to trying tools
     
     def _check_solution_node(self, state: CognitiveReasoningState) -> Dict:
-        """Check if the solution needs verification."""
-        # For now, we'll skip automatic verification
-        # In a full implementation, this could use examine_answer tool
+        """Verify the answer, trying cheap local checks before the LLM.
+        
+        The answer is substituted into the problem's equation, then compared
+        with the output of the use_code snippets, which are re-run (usually
+        a cache hit). Only if neither decides is examine_answer asked, and
+        only if the model has not already examined this answer itself.
+        """
+        answer = state["final_answer"]
+        verification = check_substitution(state["problem"], answer)
+        if verification.verified is None:
+            use_code = self._tool("use_code")
+            outputs = [use_code._execute_code_safely(code) for code in self._code_snippets(state)]
+            verification = check_code_outputs(answer, outputs)
+        if verification.verified is None and self.verify_with_llm:
+            verification = self._previous_examination(state)
+            if verification.verified is None:
+                try:
+                    examination = self._tool("examine_answer").invoke(self._examination_args(state))
+                except Exception as e:
+                    return self._verification_updates(state, verification, error=e)
+                verification = self._examination_result(examination)
+        return self._verification_updates(state, verification)
+    
+    async def _acheck_solution_node(self, state: CognitiveReasoningState) -> Dict:
+        """Async version of ``_check_solution_node``."""
+        answer = state["final_answer"]
+        verification = check_substitution(state["problem"], answer)
+        if verification.verified is None:
+            use_code = self._tool("use_code")
+            outputs = await asyncio.gather(
+                *(use_code._aexecute_code_safely(code) for code in self._code_snippets(state))
+            )
+            verification = check_code_outputs(answer, outputs)
+        if verification.verified is None and self.verify_with_llm:
+            verification = self._previous_examination(state)
+            if verification.verified is None:
+                try:
+                    examination = await self._tool("examine_answer").ainvoke(self._examination_args(state))
+                except Exception as e:
+                    return self._verification_updates(state, verification, error=e)
+                verification = self._examination_result(examination)
+        return self._verification_updates(state, verification)
+    
+    def _code_snippets(self, state: CognitiveReasoningState) -> List[str]:
+        """Code of the latest use_code results, newest first.
+        
+        The code is re-run rather than trusting the "Execution Output" text
+        in the history, which the model could have written itself.
+        """
+        use_code = self._tool("use_code")
+        snippets = []
+        for message in reversed(state.get("messages", [])):
+            if isinstance(message, ToolMessage) and message.name == "use_code":
+                code = use_code._extract_code(str(message.content))
+                if code and code not in snippets:
+                    snippets.append(code)
+                    if len(snippets) == MAX_VERIFIED_SNIPPETS:
+                        break
+        return snippets
+    
+    def _previous_examination(self, state: CognitiveReasoningState) -> Verification:
+        """The verdict of an examine_answer call the model made on the current answer."""
+        key = answer_key(state["final_answer"])
+        examined = set()
+        for message in state.get("messages", []):
+            for tool_call in getattr(message, "tool_calls", None) or []:
+                if tool_call["name"] != "examine_answer":
+                    continue
+                proposed = str(tool_call["args"].get("current_proposed_answer", ""))
+                if answer_key(self._extract_answer_from_reasoning(proposed) or proposed) == key:
+                    examined.add(tool_call["id"])
+        for message in reversed(state.get("messages", [])):
+            if isinstance(message, ToolMessage) and message.tool_call_id in examined:
+                verdict = examination_verdict(str(message.content))
+                if verdict is not None:
+                    return Verification(verdict, "examine_answer", "judged during reasoning")
+        return Verification(None, "examine_answer", "not examined during reasoning")
+    
+    def _examination_args(self, state: CognitiveReasoningState) -> Dict:
+        """examine_answer input: the end of the reasoning followed by the answer."""
+        reasoning = state.get("current_reasoning", "").strip()[-EXAMINED_REASONING_CHARS:]
         return {
-            "solution_verified": True,
-            "verification_result": "Solution accepted without verification."
+            "question": state["problem"],
+            "current_proposed_answer": f"{reasoning}\n\nFinal answer: {state['final_answer']}"
         }
     
+    @staticmethod
+    def _examination_result(examination: str) -> Verification:
+        verdict = examination_verdict(examination)
+        if verdict is None:
+            return Verification(None, "examine_answer", "no clear judgment")
+        if verdict:
+            return Verification(True, "examine_answer", "judged correct")
+        # Its explanation tells the model what to revise
+        return Verification(False, "examine_answer", truncate_text(examination.strip(), EXAMINATION_FEEDBACK_CHARS))
+    
+    def _verification_updates(
+        self,
+        state: CognitiveReasoningState,
+        verification: Verification,
+        error: Optional[Exception] = None
+    ) -> Dict:
+        """State updates for a verification outcome.
+        
+        A refuted answer is sent back for revision while iterations remain;
+        answers that could not be checked are accepted.
+        """
+        summary = f"{verification.method}: {verification.detail}"
+        updates = {
+            "solution_verified": verification.verified is True,
+            "verification_result": summary,
+            "needs_backtracking": False
+        }
+        if error is not None:
+            updates["errors"] = state.get("errors", []) + [f"Verification failed: {error}"]
+        if verification.verified is False and state.get("iteration", 0) + 1 < state.get("max_iterations", 10):
+            updates.update({
+                "messages": [HumanMessage(content=(
+                    f"Verification rejected the answer {state['final_answer']!r} ({summary}). "
+                    "Find the mistake, revise your solution and end with 'ANSWER: [your final answer]'."
+                ))],
+                "final_answer": None,
+                "needs_backtracking": True
+            })
+        return updates
+    
     def _check_result(self, state: CognitiveReasoningState) -> Literal["continue", "finalize"]:
-        """Decide based on verification result."""
-        if state.get("solution_verified", False):
-            return "finalize"
-        return "continue"
+        """Revise a rejected answer, or finalize."""
+        if state.get("needs_backtracking", False):
+            return "continue"
+        return "finalize"
     
     def _finalize_node(self, state: CognitiveReasoningState) -> Dict:
         """Finalize the solution."""
@@ -189,64 +546,106 @@ class CognitiveReasoningGraph:
     
     def _extract_answer(self, text: str) -> Optional[str]:
         """Extract the final answer from text."""
-        # Try multiple patterns for answer extraction
-        patterns = [
-            r'ANSWER:\s*(.+?)(?:\n|$)',
-            r'Final Answer:\s*(.+?)(?:\n|$)',
-            r'The answer is:\s*(.+?)(?:\n|$)',
-            r'Result:\s*(.+?)(?:\n|$)',
-            r'Solution:\s*(.+?)(?:\n|$)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-            if match:
-                return match.group(1).strip()
-        
-        # If no explicit answer pattern, try to extract from execution output
-        if "Execution Output:" in text:
-            output_start = text.find("Execution Output:") + len("Execution Output:")
-            output_text = text[output_start:].strip()
-            # Take first line of output as answer
-            first_line = output_text.split('\n')[0].strip()
-            if first_line and not first_line.startswith(("Error", "Code executed")):
-                return first_line
-        
-        return None
+        return extract_answer(text)
     
     def _extract_answer_from_reasoning(self, reasoning: str) -> Optional[str]:
         """Extract answer from reasoning trace using various heuristics."""
-        # First try standard extraction
-        answer = self._extract_answer(reasoning)
-        if answer:
-            return answer
-        
-        # Look for common answer patterns in the text
-        patterns = [
-            r'(?:GCD|gcd|answer|result|solution)(?:\s+is\s+|\s*:\s*|\s*=\s*)(\d+)',
-            r'(?:equals?|is)\s+(\d+)',
-            r'(?:x\s*=\s*)([\d\s,or]+)',
-            r'(?:The\s+)?(?:final\s+)?(?:answer|result|solution)\s+(?:is\s+)?([^\n.]+)',
-        ]
+        return extract_answer_from_reasoning(reasoning)
+    
+    def solve(self, problem: str, max_iterations: int = 10, thread_id: Optional[str] = None) -> Dict:
+        """Solve a problem using the cognitive reasoning graph.
         
-        for pattern in patterns:
-            matches = re.findall(pattern, reasoning, re.IGNORECASE)
-            if matches:
-                # Return the last match
-                return matches[-1].strip()
+        With a checkpointer and a ``thread_id``, a run of that thread that
+        was interrupted resumes from its last completed node, and a finished
+        one returns its saved result without calling the LLM. Runs without a
+        ``thread_id`` are not checkpointed.
+        """
+        graph, config = self._thread_run(thread_id)
+        graph_input = self._initial_state(problem, max_iterations)
+        if thread_id is not None and graph.get_state(config).values:
+            graph_input = None
+        result = graph.invoke(graph_input, config)
+        return self._format_result(problem, result)
+    
+    async def asolve(self, problem: str, max_iterations: int = 10, thread_id: Optional[str] = None) -> Dict:
+        """Solve a problem without blocking the event loop."""
+        graph, config = self._thread_run(thread_id)
+        graph_input = self._initial_state(problem, max_iterations)
+        if thread_id is not None and (await graph.aget_state(config)).values:
+            graph_input = None
+        result = await graph.ainvoke(graph_input, config)
+        return self._format_result(problem, result)
+    
+    def _thread_run(self, thread_id: Optional[str]) -> Tuple[StateGraph, RunnableConfig]:
+        """Compiled graph and run config for a checkpointed thread, or for a run without one."""
+        if thread_id is None:
+            return self._unsaved_graph, {"configurable": {}}
+        if self.checkpointer is None:
+            raise ValueError("thread_id requires a graph with a checkpointer")
+        return self.graph, {"configurable": {"thread_id": thread_id}}
+    
+    def solve_stream(self, problem: str, max_iterations: int = 10, thread_id: Optional[str] = None) -> Iterator[Dict]:
+        """Solve a problem, yielding progress as it happens.
         
-        # For code execution results, look for the last number
-        if "Execution Output:" in reasoning:
-            output_section = reasoning.split("Execution Output:")[-1]
-            numbers = re.findall(r'\b\d+\b', output_section)
-            if numbers:
-                return numbers[-1]
+        The reasoning LLM calls are streamed, and a call is stopped as soon
+        as its response contains a complete "ANSWER: ..." line, instead of
+        generating the rest of the response. A ``thread_id`` is resumed or
+        recorded as in ``solve``.
         
-        return None
+        Yields:
+            Event dictionaries with a "type" key:
+                - token: "content" streamed by an LLM call in "node"
+                - update: "update" returned by graph node "node"
+                - result: the solution dictionary, as returned by ``solve``
+        """
+        graph, config = self._thread_run(thread_id)
+        config["configurable"][STREAM_REASONING_KEY] = True
+        graph_input = self._initial_state(problem, max_iterations)
+        if thread_id is not None and graph.get_state(config).values:
+            graph_input = None
+        result = None
+        for mode, data in graph.stream(graph_input, config, stream_mode=["messages", "updates", "values"]):
+            if mode == "values":
+                result = data
+            else:
+                yield from self._stream_events(mode, data)
+        yield {"type": "result", "result": self._format_result(problem, result)}
+    
+    async def asolve_stream(
+        self,
+        problem: str,
+        max_iterations: int = 10,
+        thread_id: Optional[str] = None
+    ) -> AsyncIterator[Dict]:
+        """Async version of ``solve_stream``."""
+        graph, config = self._thread_run(thread_id)
+        config["configurable"][STREAM_REASONING_KEY] = True
+        graph_input = self._initial_state(problem, max_iterations)
+        if thread_id is not None and (await graph.aget_state(config)).values:
+            graph_input = None
+        result = None
+        async for mode, data in graph.astream(graph_input, config, stream_mode=["messages", "updates", "values"]):
+            if mode == "values":
+                result = data
+            else:
+                for event in self._stream_events(mode, data):
+                    yield event
+        yield {"type": "result", "result": self._format_result(problem, result)}
+    
+    @staticmethod
+    def _stream_events(mode: str, data) -> List[Dict]:
+        """Convert a graph stream item into solve_stream events."""
+        if mode == "messages":
+            message, metadata = data
+            # Complete messages (such as tool results) also show up in node updates
+            if isinstance(message, AIMessageChunk) and message.text:
+                return [{"type": "token", "node": metadata.get("langgraph_node"), "content": message.text}]
+            return []
+        return [{"type": "update", "node": node, "update": update} for node, update in data.items()]
     
-    def solve(self, problem: str, max_iterations: int = 10) -> Dict:
-        """Solve a problem using the cognitive reasoning graph."""
-        initial_state = {
+    def _initial_state(self, problem: str, max_iterations: int) -> Dict:
+        """Initial graph state for a problem."""
+        return {
             "problem": problem,
             "messages": [],
             "current_reasoning": "",
@@ -260,15 +659,17 @@ class CognitiveReasoningGraph:
             "errors": [],
             "needs_backtracking": False
         }
-        
-        result = self.graph.invoke(initial_state)
-        
+    
+    def _format_result(self, problem: str, result: Dict) -> Dict:
+        """Convert the final graph state into a solution dictionary."""
         return {
             "problem": problem,
             "final_answer": result.get("final_answer"),
             "reasoning_trace": result.get("current_reasoning", ""),
             "tool_usage": self._extract_tool_usage(result.get("messages", [])),
-            "iterations": result.get("iteration", 0)
+            "iterations": result.get("iteration", 0),
+            "verified": result.get("solution_verified", False),
+            "verification": result.get("verification_result")
         }
     
     def _extract_tool_usage(self, messages: List[BaseMessage]) -> List[Dict]:
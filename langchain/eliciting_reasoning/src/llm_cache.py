@@ -0,0 +1,175 @@
+"""Persistent SQLite cache for LLM responses."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Union
+
+from langchain_core.caches import BaseCache
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+
+
+# Message fields that describe a response rather than what is sent to the
+# model. Cache hits rewrite usage_metadata, so hashing them would make a
+# replayed conversation miss on its next call.
+VOLATILE_MESSAGE_FIELDS = ("usage_metadata", "response_metadata")
+
+
+def _strip_volatile(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: _strip_volatile(item)
+            for key, item in value.items()
+            if key not in VOLATILE_MESSAGE_FIELDS
+        }
+    if isinstance(value, list):
+        return [_strip_volatile(item) for item in value]
+    return value
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Drop volatile response metadata from serialized chat messages."""
+    if not prompt.startswith("["):
+        return prompt
+    try:
+        messages = json.loads(prompt)
+    except ValueError:
+        return prompt
+    return json.dumps(_strip_volatile(messages), sort_keys=True)
+
+
+class SQLiteLLMCache(BaseCache):
+    """Content-addressed LLM response cache stored in a SQLite file.
+    
+    Entries are keyed by a hash of the model's ``llm_string`` (which covers
+    the model name, temperature, bound tools and other call parameters) and
+    of the normalized prompt or messages, so any change to either is a miss.
+    When the stored responses exceed ``max_size_bytes``, the least recently
+    used entries are evicted until the cache is back under 90% of the limit.
+    
+    Install it for all models with ``set_llm_cache(SQLiteLLMCache(path))``.
+    """
+    
+    def __init__(self, path: Union[str, Path], max_size_bytes: int = 512 * 1024 * 1024):
+        """Open (or create) the cache.
+        
+        Args:
+            path: SQLite database file
+            max_size_bytes: Total size of stored responses before eviction
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = max_size_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+    
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        llm_hash = hashlib.sha256(llm_string.encode("utf-8")).hexdigest()
+        prompt_hash = hashlib.sha256(normalize_prompt(prompt).encode("utf-8")).hexdigest()
+        return f"{llm_hash}:{prompt_hash}"
+    
+    @staticmethod
+    def _dumps(generations: Sequence[Generation]) -> str:
+        return json.dumps([
+            {"message": message_to_dict(generation.message), "generation_info": generation.generation_info}
+            if isinstance(generation, ChatGeneration)
+            else {"text": generation.text, "generation_info": generation.generation_info}
+            for generation in generations
+        ])
+    
+    @staticmethod
+    def _loads(value: str) -> list:
+        generations = []
+        for item in json.loads(value):
+            if "message" in item:
+                message = messages_from_dict([item["message"]])[0]
+                generations.append(ChatGeneration(message=message, generation_info=item["generation_info"]))
+            else:
+                generations.append(Generation(text=item["text"], generation_info=item["generation_info"]))
+        return generations
+    
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        """Return the cached generations for a prompt, if any."""
+        key = self._key(prompt, llm_string)
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return self._loads(row[0])
+    
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        """Store the generations for a prompt, evicting old entries if needed."""
+        key = self._key(prompt, llm_string)
+        value = self._dumps(return_val)
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            previous = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time())
+            )
+            self._size += size - (previous[0] if previous else 0)
+            if self._size > self.max_size_bytes:
+                self._evict(int(self.max_size_bytes * 0.9))
+            self._conn.commit()
+    
+    def _evict(self, target_size: int) -> None:
+        """Delete least recently used entries until the cache is under ``target_size``."""
+        keys = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_used"):
+            if self._size <= target_size:
+                break
+            keys.append((key,))
+            self._size -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", keys)
+        self.evictions += len(keys)
+    
+    def clear(self, **kwargs: Any) -> None:
+        """Delete all cached responses."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._size = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process and the current cache size."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "size_bytes": self._size
+        }
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
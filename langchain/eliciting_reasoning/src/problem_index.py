@@ -0,0 +1,234 @@
+"""Nearest-neighbour index over solved problems for the recall_related tool."""
+
+import json
+import re
+import threading
+import zlib
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+
+TOKEN_PATTERN = re.compile(r"[a-z]+|\d+|[^\sa-z\d]")
+
+# Similarity from which an indexed problem counts as a variant of an
+# evaluated one ("2^10 mod 7" vs "2^100 mod 7") and would leak its answer
+NEAR_DUPLICATE_SIMILARITY = 0.85
+
+
+@dataclass
+class SolvedProblem:
+    """A problem with its known answer and, if available, a worked solution."""
+    question: str
+    answer: str
+    solution: str = ""
+    type: str = ""
+    source: str = ""
+
+
+def problem_features(text: str) -> List[str]:
+    """Word, word-bigram and character-trigram features of a problem statement."""
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    words = [token for token in tokens if token.isalpha()]
+    features = list(tokens)
+    features.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+    for word in words:
+        padded = f"#{word}#"
+        features.extend(f"#3{padded[i:i + 3]}" for i in range(len(padded) - 2))
+    return features
+
+
+class ProblemIndex:
+    """Cosine-similarity index over solved problems.
+    
+    Problems are embedded as hashed TF-IDF vectors of ``problem_features``,
+    so no model or network access is needed, and searched with one NumPy
+    matrix-vector product (exact search is fast at this corpus size, so no
+    approximate graph index is built). Alternatively any langchain
+    ``Embeddings`` can be passed in to embed problems instead.
+    """
+    
+    def __init__(self, dim: int = 4096, embeddings=None):
+        """Create an empty index.
+        
+        Args:
+            dim: Number of hash buckets for the local TF-IDF vectors
+            embeddings: Optional langchain Embeddings used instead of TF-IDF
+        """
+        self.dim = dim
+        self.embeddings = embeddings
+        self.problems: List[SolvedProblem] = []
+        self._vectors: List[np.ndarray] = []
+        self._document_frequency = np.zeros(dim, dtype=np.float32)
+        # Normalized matrix of all vectors, rebuilt lazily after additions
+        self._matrix: Optional[np.ndarray] = None
+        self._idf: Optional[np.ndarray] = None
+        # Questions whose near-duplicates are hidden from search, and the
+        # resulting mask over problems (computed with the matrix)
+        self._excluded_questions: List[str] = []
+        self._exclusion_threshold = NEAR_DUPLICATE_SIMILARITY
+        self._excluded: Optional[np.ndarray] = None
+        # Guards the derived arrays above, which concurrent searches share
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self.problems)
+    
+    def _term_frequencies(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in problem_features(text):
+            vector[zlib.crc32(feature.encode("utf-8")) % self.dim] += 1.0
+        # Sublinear term frequency
+        np.log1p(vector, out=vector)
+        return vector
+    
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+    
+    def add(self, problems: Iterable[SolvedProblem]) -> None:
+        """Add solved problems to the index."""
+        problems = list(problems)
+        if not problems:
+            return
+        if self.embeddings is not None:
+            vectors = self.embeddings.embed_documents([problem.question for problem in problems])
+            vectors = [np.asarray(vector, dtype=np.float32) for vector in vectors]
+        else:
+            vectors = [self._term_frequencies(problem.question) for problem in problems]
+        with self._lock:
+            if self.embeddings is None:
+                for vector in vectors:
+                    self._document_frequency += vector > 0
+                self._vectors.extend(vectors)
+            self.problems.extend(problems)
+            self._matrix = None
+            self._excluded = None
+    
+    def _prepare(self) -> Tuple[np.ndarray, Optional[np.ndarray], np.ndarray]:
+        """The normalized matrix, IDF weights and exclusion mask, rebuilt after changes.
+        
+        They are built together and returned as one snapshot, so a search
+        never mixes arrays from before and after a concurrent change.
+        """
+        with self._lock:
+            if self._matrix is None:
+                matrix = np.vstack(self._vectors)
+                idf = None
+                if self.embeddings is None:
+                    count = len(self.problems)
+                    idf = np.log((1 + count) / (1 + self._document_frequency)) + 1
+                    matrix = matrix * idf
+                matrix = self._normalize(matrix)
+                excluded = np.zeros(len(self.problems), dtype=bool)
+                if self._excluded_questions:
+                    queries = np.vstack([self._query_vector(question, idf) for question in self._excluded_questions])
+                    excluded = (matrix @ queries.T).max(axis=1) >= self._exclusion_threshold
+                self._idf = idf
+                self._excluded = excluded
+                # Set last: a matrix means the other arrays match it
+                self._matrix = matrix
+            return self._matrix, self._idf, self._excluded
+    
+    def _query_vector(self, question: str, idf: Optional[np.ndarray]) -> np.ndarray:
+        if self.embeddings is not None:
+            query = np.asarray(self.embeddings.embed_query(question), dtype=np.float32)
+        else:
+            query = self._term_frequencies(question) * idf
+        return self._normalize(query)
+    
+    def exclude_similar(self, questions: Iterable[str], threshold: float = NEAR_DUPLICATE_SIMILARITY) -> int:
+        """Hide problems similar to any of ``questions`` from search.
+        
+        Used before an evaluation, so the index cannot hand the model the
+        answer to a problem being evaluated, or to a variant of it with
+        other numbers. Replaces any earlier exclusion; pass no questions to
+        clear it.
+        
+        Args:
+            questions: Problem statements to hide, with their near-duplicates
+            threshold: Cosine similarity from which a problem is hidden
+        
+        Returns:
+            Number of indexed problems hidden
+        """
+        with self._lock:
+            self._excluded_questions = list(questions)
+            self._exclusion_threshold = threshold
+            self._matrix = None
+            self._excluded = None
+        if not self.problems:
+            return 0
+        return int(self._prepare()[2].sum())
+    
+    def search(
+        self,
+        question: str,
+        k: int = 3,
+        exclude_above: float = 0.98
+    ) -> List[Tuple[SolvedProblem, float]]:
+        """Find the solved problems most similar to a question.
+        
+        Args:
+            question: Problem statement to find analogues for
+            k: Maximum number of results
+            exclude_above: Skip matches at least this similar, which are
+                the question itself rather than an analogue
+        
+        Returns:
+            (problem, cosine similarity) pairs, most similar first
+        """
+        if not self.problems:
+            return []
+        matrix, idf, excluded = self._prepare()
+        scores = matrix @ self._query_vector(question, idf)
+        
+        # Over-fetch to make up for skipped near-duplicates and repeated questions
+        candidates = min(len(scores), 2 * k + 1)
+        top = np.argpartition(-scores, candidates - 1)[:candidates]
+        results = []
+        seen = set()
+        for i in top[np.argsort(-scores[top])]:
+            problem = self.problems[i]
+            if scores[i] < exclude_above and not excluded[i] and problem.question not in seen:
+                seen.add(problem.question)
+                results.append((problem, float(scores[i])))
+        return results[:k]
+    
+    @classmethod
+    def from_datasets(cls, paths: Iterable[Union[str, Path]], **kwargs) -> "ProblemIndex":
+        """Build an index from experiment dataset JSON files."""
+        index = cls(**kwargs)
+        for path in paths:
+            with open(path, "r") as f:
+                data = json.load(f)
+            index.add(
+                SolvedProblem(
+                    question=problem["question"],
+                    answer=str(problem["answer"]),
+                    type=problem.get("type", ""),
+                    source=Path(path).name
+                )
+                for problem in data["problems"]
+            )
+        return index
+    
+    def load_traces(self, path: Union[str, Path]) -> None:
+        """Add solved problems saved with ``save_traces``, if the file exists."""
+        path = Path(path)
+        if not path.exists():
+            return
+        with open(path, "r") as f:
+            self.add(SolvedProblem(**json.loads(line)) for line in f if line.strip())
+    
+    @staticmethod
+    def save_traces(path: Union[str, Path], problems: Iterable[SolvedProblem]) -> None:
+        """Append solved problems (e.g. successful reasoning traces) to a JSONL file."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a") as f:
+            for problem in problems:
+                f.write(json.dumps(asdict(problem)) + "\n")
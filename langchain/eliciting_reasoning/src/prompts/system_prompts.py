@@ -121,7 +121,9 @@ Follow a structured **verification process**:
 
 ### **4. Providing a Judgment**
 - Clearly state whether the proposed solution is **correct or incorrect**.
-- Justify your judgment with a concise explanation."""
+- Justify your judgment with a concise explanation.
+- End your response with a line that is exactly `Judgment: CORRECT` or 
+  `Judgment: INCORRECT`."""
 
 BACKTRACKING_PROMPT = """You are a careful problem-solving assistant with the ability to backtrack from 
 flawed logic. You will be given a math or logic problem and a reasoning trace. 
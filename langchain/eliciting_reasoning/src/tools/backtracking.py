@@ -1,7 +1,7 @@
 """Backtracking cognitive tool implementation."""
 
 from typing import Optional, Type
-from langchain_core.callbacks import CallbackManagerForToolRun
+from langchain_core.callbacks import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
 from langchain_core.language_models import BaseLanguageModel
 from pydantic import BaseModel, Field
 
@@ -26,6 +26,13 @@ class BacktrackingTool(CognitiveTool):
     args_schema: Type[BaseModel] = BacktrackingInput
     llm: BaseLanguageModel
     
+    def _prompt(self, question: str, reasoning_trace: str) -> str:
+        """Build the backtracking prompt."""
+        return f"""{BACKTRACKING_PROMPT}
+
+Problem: {question}
+Current Reasoning Trace: {reasoning_trace}"""
+    
     def _run(
         self,
         question: str,
@@ -33,13 +40,15 @@ class BacktrackingTool(CognitiveTool):
         run_manager: Optional[CallbackManagerForToolRun] = None
     ) -> str:
         """Execute the backtracking tool."""
-        prompt = f"""{BACKTRACKING_PROMPT}
-
-Problem: {question}
-Current Reasoning Trace: {reasoning_trace}"""
-        
-        response = self.llm.invoke(prompt)
-        
-        if hasattr(response, 'content'):
-            return response.content
-        return str(response)
\ No newline at end of file
+        response = self.llm.invoke(self._prompt(question, reasoning_trace))
+        return self._response_text(response)
+    
+    async def _arun(
+        self,
+        question: str,
+        reasoning_trace: str,
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None
+    ) -> str:
+        """Execute the backtracking tool asynchronously."""
+        response = await self.llm.ainvoke(self._prompt(question, reasoning_trace))
+        return self._response_text(response)
@@ -29,11 +29,9 @@ class CognitiveTool(BaseTool, ABC):
         """Execute the cognitive tool."""
         pass
     
-    async def _arun(
-        self,
-        question: str,
-        context: Optional[Dict[str, Any]] = None,
-        run_manager: Optional[CallbackManagerForToolRun] = None
-    ) -> str:
-        """Async execution - not implemented for this experiment."""
-        raise NotImplementedError("Async execution not implemented")
\ No newline at end of file
+    @staticmethod
+    def _response_text(response: Any) -> str:
+        """Get the text of an LLM response."""
+        if hasattr(response, 'content'):
+            return response.content
+        return str(response)
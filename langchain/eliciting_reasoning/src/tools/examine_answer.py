@@ -1,7 +1,7 @@
 """Examine Answer cognitive tool implementation."""
 
 from typing import Optional, Type
-from langchain_core.callbacks import CallbackManagerForToolRun
+from langchain_core.callbacks import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
 from langchain_core.language_models import BaseLanguageModel
 from pydantic import BaseModel, Field
 
@@ -26,6 +26,13 @@ class ExamineAnswerTool(CognitiveTool):
     args_schema: Type[BaseModel] = ExamineAnswerInput
     llm: BaseLanguageModel
     
+    def _prompt(self, question: str, current_proposed_answer: str) -> str:
+        """Build the examine_answer prompt."""
+        return f"""{EXAMINE_ANSWER_PROMPT}
+
+Question: {question}
+Current Proposed Answer: {current_proposed_answer}"""
+    
     def _run(
         self,
         question: str,
@@ -33,13 +40,15 @@ class ExamineAnswerTool(CognitiveTool):
         run_manager: Optional[CallbackManagerForToolRun] = None
     ) -> str:
         """Execute the examine_answer tool."""
-        prompt = f"""{EXAMINE_ANSWER_PROMPT}
-
-Question: {question}
-Current Proposed Answer: {current_proposed_answer}"""
-        
-        response = self.llm.invoke(prompt)
-        
-        if hasattr(response, 'content'):
-            return response.content
-        return str(response)
\ No newline at end of file
+        response = self.llm.invoke(self._prompt(question, current_proposed_answer))
+        return self._response_text(response)
+    
+    async def _arun(
+        self,
+        question: str,
+        current_proposed_answer: str,
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None
+    ) -> str:
+        """Execute the examine_answer tool asynchronously."""
+        response = await self.llm.ainvoke(self._prompt(question, current_proposed_answer))
+        return self._response_text(response)
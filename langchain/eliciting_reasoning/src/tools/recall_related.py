@@ -1,11 +1,12 @@
 """Recall Related cognitive tool implementation."""
 
 from typing import Optional, Type
-from langchain_core.callbacks import CallbackManagerForToolRun
+from langchain_core.callbacks import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
 from langchain_core.language_models import BaseLanguageModel
 from pydantic import BaseModel, Field
 
 from .base import CognitiveTool
+from ..problem_index import ProblemIndex
 from ..prompts.system_prompts import RECALL_RELATED_PROMPT
 
 
@@ -24,6 +25,38 @@ class RecallRelatedTool(CognitiveTool):
     )
     args_schema: Type[BaseModel] = RecallRelatedInput
     llm: BaseLanguageModel
+    # Solved problems to retrieve from; the LLM is only asked when the best
+    # match is less similar than min_similarity
+    index: Optional[ProblemIndex] = None
+    min_similarity: float = 0.35
+    max_examples: int = 3
+    max_solution_chars: int = 1500
+    
+    def _recall_from_index(self, question: str) -> Optional[str]:
+        """Format the closest solved problems from the index, if similar enough."""
+        if self.index is None:
+            return None
+        matches = self.index.search(question, k=self.max_examples)
+        matches = [(problem, score) for problem, score in matches if score >= self.min_similarity]
+        if not matches:
+            return None
+        
+        examples = []
+        for i, (problem, score) in enumerate(matches, 1):
+            solution = problem.solution or "(worked solution not recorded)"
+            if len(solution) > self.max_solution_chars:
+                solution = solution[:self.max_solution_chars] + " ..."
+            examples.append(
+                f"Analogous Example {i} (similarity {score:.2f}):\n"
+                f"Q: {problem.question}\n"
+                f"A: {solution}\n"
+                f"Final Answer: {problem.answer}"
+            )
+        return "\n\n".join(examples)
+    
+    def _prompt(self, question: str) -> str:
+        """Build the recall_related prompt."""
+        return f"{RECALL_RELATED_PROMPT}\n\nCurrent Problem: {question}"
     
     def _run(
         self,
@@ -31,10 +64,20 @@ class RecallRelatedTool(CognitiveTool):
         run_manager: Optional[CallbackManagerForToolRun] = None
     ) -> str:
         """Execute the recall_related tool."""
-        prompt = f"{RECALL_RELATED_PROMPT}\n\nCurrent Problem: {question}"
-        
-        response = self.llm.invoke(prompt)
-        
-        if hasattr(response, 'content'):
-            return response.content
-        return str(response)
\ No newline at end of file
+        recalled = self._recall_from_index(question)
+        if recalled:
+            return recalled
+        response = self.llm.invoke(self._prompt(question))
+        return self._response_text(response)
+    
+    async def _arun(
+        self,
+        question: str,
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None
+    ) -> str:
+        """Execute the recall_related tool asynchronously."""
+        recalled = self._recall_from_index(question)
+        if recalled:
+            return recalled
+        response = await self.llm.ainvoke(self._prompt(question))
+        return self._response_text(response)
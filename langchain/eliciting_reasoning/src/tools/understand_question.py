@@ -1,7 +1,7 @@
 """Understand Question cognitive tool implementation."""
 
 from typing import Any, Dict, Optional, Type
-from langchain_core.callbacks import CallbackManagerForToolRun
+from langchain_core.callbacks import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
 from langchain_core.language_models import BaseLanguageModel
 from pydantic import BaseModel, Field
 
@@ -29,6 +29,10 @@ class UnderstandQuestionTool(CognitiveTool):
     args_schema: Type[BaseModel] = UnderstandQuestionInput
     llm: BaseLanguageModel
     
+    def _prompt(self, question: str, model: str) -> str:
+        """Build the understand_question prompt."""
+        return f"{UNDERSTAND_QUESTION_PROMPT}\n\nProblem: {question}\nModel: {model}"
+    
     def _run(
         self,
         question: str,
@@ -36,10 +40,15 @@ class UnderstandQuestionTool(CognitiveTool):
         run_manager: Optional[CallbackManagerForToolRun] = None
     ) -> str:
         """Execute the understand_question tool."""
-        prompt = f"{UNDERSTAND_QUESTION_PROMPT}\n\nProblem: {question}\nModel: {model}"
-        
-        response = self.llm.invoke(prompt)
-        
-        if hasattr(response, 'content'):
-            return response.content
-        return str(response)
\ No newline at end of file
+        response = self.llm.invoke(self._prompt(question, model))
+        return self._response_text(response)
+    
+    async def _arun(
+        self,
+        question: str,
+        model: str = "math_problem",
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None
+    ) -> str:
+        """Execute the understand_question tool asynchronously."""
+        response = await self.llm.ainvoke(self._prompt(question, model))
+        return self._response_text(response)
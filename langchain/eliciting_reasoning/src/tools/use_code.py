@@ -1,15 +1,12 @@
 """Use Code cognitive tool implementation."""
 
-import sys
-import io
-import contextlib
-import traceback
 from typing import Optional, Type
-from langchain_core.callbacks import CallbackManagerForToolRun
+from langchain_core.callbacks import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
 from langchain_core.language_models import BaseLanguageModel
 from pydantic import BaseModel, Field
 
 from .base import CognitiveTool
+from ..code_sandbox import CodeSandbox, ExecutionCache, get_default_sandbox, normalized_code_key
 from ..prompts.system_prompts import USE_CODE_PROMPT
 
 
@@ -32,6 +29,19 @@ class UseCodeTool(CognitiveTool):
     )
     args_schema: Type[BaseModel] = UseCodeInput
     llm: BaseLanguageModel
+    # Worker processes that execute the generated code; a shared default
+    # pool is started on first use if none is given
+    sandbox: Optional[CodeSandbox] = None
+    # Results of deterministic snippets, shared across iterations and problems;
+    # None disables caching
+    execution_cache: Optional[ExecutionCache] = Field(default_factory=ExecutionCache)
+    
+    def _prompt(self, problem: str, reasoning: str) -> str:
+        """Build the use_code prompt."""
+        return f"""{USE_CODE_PROMPT}
+
+Problem: {problem}
+Previous Reasoning: {reasoning}"""
     
     def _run(
         self,
@@ -40,18 +50,27 @@ class UseCodeTool(CognitiveTool):
         run_manager: Optional[CallbackManagerForToolRun] = None
     ) -> str:
         """Execute the use_code tool."""
-        prompt = f"""{USE_CODE_PROMPT}
-
-Problem: {problem}
-Previous Reasoning: {reasoning}"""
-        
-        response = self.llm.invoke(prompt)
+        response = self.llm.invoke(self._prompt(problem, reasoning))
+        return self._run_response_code(self._response_text(response))
+    
+    async def _arun(
+        self,
+        problem: str,
+        reasoning: str = "",
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None
+    ) -> str:
+        """Execute the use_code tool asynchronously."""
+        response_text = self._response_text(await self.llm.ainvoke(self._prompt(problem, reasoning)))
         
-        if hasattr(response, 'content'):
-            response_text = response.content
-        else:
-            response_text = str(response)
+        code = self._extract_code(response_text)
+        if code:
+            execution_result = await self._aexecute_code_safely(code)
+            return f"{response_text}\n\nExecution Output:\n{execution_result}"
         
+        return response_text
+    
+    def _run_response_code(self, response_text: str) -> str:
+        """Execute the code in an LLM response and append its output."""
         # Extract code from response
         code = self._extract_code(response_text)
         
@@ -72,62 +91,25 @@ Previous Reasoning: {reasoning}"""
         return None
     
     def _execute_code_safely(self, code: str) -> str:
-        """Execute Python code safely and capture output."""
-        # Create StringIO object to capture output
-        output_buffer = io.StringIO()
-        
-        # Save original stdout
-        old_stdout = sys.stdout
-        
-        try:
-            # Redirect stdout to our buffer
-            sys.stdout = output_buffer
-            
-            # Create execution namespace
-            exec_globals = {}
-            exec_locals = {}
-            
-            # Execute the code with full builtins available
-            exec(code, exec_globals, exec_locals)
-            
-            # Get the output
-            output = output_buffer.getvalue()
-            
-            # If no output from print, try to get the last expression value
-            if not output:
-                # Try to find the last expression in the code
-                lines = code.strip().split('\n')
-                last_line = lines[-1].strip()
-                
-                # If last line is not an assignment or import, evaluate it
-                if (last_line and 
-                    not last_line.startswith(('import ', 'from ', 'def ', 'class ')) and
-                    '=' not in last_line and
-                    not last_line.startswith(('#', 'print('))):
-                    try:
-                        result = eval(last_line, exec_globals, exec_locals)
-                        if result is not None:
-                            output = str(result)
-                    except:
-                        pass
-            
-            if not output:
-                # Check if any variables were created
-                created_vars = {k: v for k, v in exec_locals.items() if not k.startswith('_')}
-                if created_vars:
-                    output = "Variables created:\n"
-                    for name, value in created_vars.items():
-                        output += f"{name} = {value}\n"
-                else:
-                    output = "Code executed successfully but produced no output."
-            
-            return output
-            
-        except Exception as e:
-            # Capture the error
-            return f"Error executing code:\n{type(e).__name__}: {str(e)}"
-        
-        finally:
-            # Restore original stdout
-            sys.stdout = old_stdout
-            output_buffer.close()
\ No newline at end of file
+        """Execute Python code in the sandbox and capture output."""
+        key = normalized_code_key(code) if self.execution_cache is not None else None
+        if key is not None:
+            cached = self.execution_cache.get(key)
+            if cached is not None:
+                return cached
+        result = (self.sandbox or get_default_sandbox()).run(code)
+        if key is not None:
+            self.execution_cache.put(key, result)
+        return result
+    
+    async def _aexecute_code_safely(self, code: str) -> str:
+        """Async version of ``_execute_code_safely``."""
+        key = normalized_code_key(code) if self.execution_cache is not None else None
+        if key is not None:
+            cached = self.execution_cache.get(key)
+            if cached is not None:
+                return cached
+        result = await (self.sandbox or get_default_sandbox()).arun(code)
+        if key is not None:
+            self.execution_cache.put(key, result)
+        return result
@@ -0,0 +1,421 @@
+"""Local checks of proposed answers, used before asking the LLM to verify them."""
+
+import ast
+import math
+import operator
+import random
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .answer_parsing import answer_key
+
+
+@dataclass
+class Verification:
+    """Outcome of checking a proposed answer.
+    
+    ``verified`` is True if the check confirmed the answer, False if it
+    refuted it and None if it could not decide.
+    """
+    verified: Optional[bool]
+    method: str
+    detail: str = ""
+
+
+_BINARY_OPERATORS: Dict[type, Callable[[float, float], float]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+_UNARY_OPERATORS: Dict[type, Callable[[float], float]] = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+FUNCTIONS: Dict[str, Callable[[float], float]] = {
+    "sqrt": math.sqrt,
+    "abs": abs,
+    "exp": math.exp,
+    "log": math.log,
+    "ln": math.log,
+    "sin": math.sin,
+    "cos": math.cos,
+    "tan": math.tan,
+}
+CONSTANTS: Dict[str, float] = {"pi": math.pi, "e": math.e}
+
+# Exponents above this are not evaluated, to keep every check cheap
+MAX_EXPONENT = 64
+# Highest degree of polynomial equation whose solutions are counted
+MAX_POLYNOMIAL_DEGREE = 6
+# Points at which equations are sampled to fit a polynomial, and to check the fit
+SAMPLE_POINTS = (0.37, -1.21, 1.73, -2.47, 2.91, -0.59, 1.13)
+CHECK_POINTS = (0.83, -2.13)
+
+# Implicit products: a digit or ")" before a name or "(", and a one-letter variable before "("
+IMPLICIT_PRODUCT_PATTERN = re.compile(r'(\d|\))\s*(?=[a-z(])')
+VARIABLE_PRODUCT_PATTERN = re.compile(r'\b([a-z])\s*\(')
+# Names that can be unknowns; other names are prose, not math
+VARIABLE_PATTERN = re.compile(r'[a-z](?:_\d+)?')
+ROOT_PATTERN = re.compile(r'√\s*(\d+(?:\.\d+)?|[a-z]\b)')
+# Characters an expression can consist of; anything else is prose
+EXPRESSION_CHARS = re.compile(r'[0-9a-z_\s+\-*/().^√×÷−]+')
+# Delimiters between the clauses of a problem statement
+CLAUSE_SEPARATOR_PATTERN = re.compile(r'[,;:?\n]|\.(?:\s|$)')
+EQUATION_SIGN_PATTERN = re.compile(r'(?<![<>!=])=(?!=)')
+# Words that can stand next to an equation without changing it ("the equation
+# 2x + 1 = 5", "find x if ..."); any other word dropped there, such as "log",
+# "times", "of" or a unit, could be part of the equation
+EQUATION_BOUNDARY_WORDS = frozenset({
+    "equation", "equations", "solve", "find", "determine", "if", "when", "where", "such", "that",
+    "given", "satisfying", "satisfies", "and", "then", "so",
+})
+ANSWER_SEPARATOR_PATTERN = re.compile(r'\s+or\s+|\s+and\s+|,|;')
+# Words that ask for something; the last one in a problem is its final ask
+ASK_PATTERN = re.compile(r'\b(?:solve|find|what\s+(?:is|are)|determine|compute|calculate|evaluate)\b')
+# What follows an ask for the bare unknown, with {variable} filled in
+BARE_VARIABLE_ASK = (
+    r'\s*(?:for\s+)?(?:all\s+)?(?:the\s+)?(?:(?:possible|real)\s+)?(?:values?\s+of\s+)?{variable}'
+    r'\s*(?:$|[?.:,;]|(?:if|when|such|given|where|that|satisfying|in)\b)'
+)
+# The line examine_answer is asked to end its response with
+JUDGMENT_PATTERN = re.compile(r'Judgment:\s*(CORRECT|INCORRECT)')
+
+
+def to_python_expression(expression: str) -> str:
+    """Rewrite math notation ("2x^2", "3(x+1)", "√2") as a Python expression."""
+    text = expression.strip().lower()
+    text = text.replace("^", "**").replace("×", "*").replace("÷", "/").replace("−", "-")
+    text = ROOT_PATTERN.sub(r'sqrt(\1)', text).replace("√", "sqrt")
+    # 2x, 2(x+1), (x+1)(x-1), x(x+1)
+    text = IMPLICIT_PRODUCT_PATTERN.sub(r'\1*', text)
+    return VARIABLE_PRODUCT_PATTERN.sub(r'\1*(', text)
+
+
+def _evaluate_node(node: ast.AST, variables: Dict[str, float]) -> float:
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        return float(node.value)
+    if isinstance(node, ast.Name):
+        if node.id in variables:
+            return variables[node.id]
+        if node.id in CONSTANTS:
+            return CONSTANTS[node.id]
+        raise ValueError(f"unknown name {node.id}")
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+        left = _evaluate_node(node.left, variables)
+        right = _evaluate_node(node.right, variables)
+        if isinstance(node.op, ast.Pow) and abs(right) > MAX_EXPONENT:
+            raise ValueError("exponent too large")
+        return _BINARY_OPERATORS[type(node.op)](left, right)
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+        return _UNARY_OPERATORS[type(node.op)](_evaluate_node(node.operand, variables))
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS
+            and len(node.args) == 1 and not node.keywords):
+        return FUNCTIONS[node.func.id](_evaluate_node(node.args[0], variables))
+    raise ValueError(f"unsupported expression {type(node).__name__}")
+
+
+def _parse(expression: str) -> Optional[ast.Expression]:
+    if not EXPRESSION_CHARS.fullmatch(expression.lower()):
+        return None
+    try:
+        return ast.parse(to_python_expression(expression), mode="eval")
+    except SyntaxError:
+        return None
+
+
+def expression_variables(expression: str) -> Optional[Set[str]]:
+    """Free variables of a math expression, or None if it cannot be parsed."""
+    tree = _parse(expression)
+    if tree is None:
+        return None
+    names = {node.id for node in ast.walk(tree) if isinstance(node, ast.Name)}
+    names -= set(FUNCTIONS) | set(CONSTANTS)
+    if not all(VARIABLE_PATTERN.fullmatch(name) for name in names):
+        return None
+    return names
+
+
+def evaluate_expression(expression: str, variables: Optional[Dict[str, float]] = None) -> Optional[float]:
+    """Numeric value of a math expression, or None if it cannot be evaluated.
+    
+    Only arithmetic, the functions in FUNCTIONS and the constants in
+    CONSTANTS are supported, so untrusted text is never executed.
+    """
+    tree = _parse(expression)
+    if tree is None:
+        return None
+    try:
+        value = _evaluate_node(tree.body, variables or {})
+    except (ValueError, TypeError, ZeroDivisionError, OverflowError):
+        return None
+    if isinstance(value, complex) or not math.isfinite(value):
+        return None
+    return value
+
+
+def values_close(a: float, b: float) -> bool:
+    return abs(a - b) <= 1e-6 * max(1.0, abs(a), abs(b))
+
+
+def expressions_equal(a: str, b: str, trials: int = 3) -> bool:
+    """Whether two answers are mathematically equal.
+    
+    Constant expressions are compared by value. Expressions in variables
+    are compared at random points, which identifies equal expressions such
+    as "2(x+1)" and "2x+2" without a computer algebra system. Anything
+    else is compared by its normalized answer key.
+    """
+    a_variables = expression_variables(a)
+    b_variables = expression_variables(b)
+    if a_variables is not None and b_variables is not None:
+        variables = sorted(a_variables | b_variables)
+        rng = random.Random(0)
+        for _ in range(trials if variables else 1):
+            point = {name: rng.uniform(0.5, 3.0) for name in variables}
+            a_value = evaluate_expression(a, point)
+            b_value = evaluate_expression(b, point)
+            if a_value is None or b_value is None:
+                break
+            if not values_close(a_value, b_value):
+                return False
+        else:
+            return True
+    return answer_key(a) == answer_key(b)
+
+
+def _trim_expression(words: List[str], from_start: bool) -> Tuple[Optional[str], bool]:
+    """The longest run of words at one end of a clause that is an expression.
+    
+    Also returns whether the word dropped next to it, if any, is one of
+    EQUATION_BOUNDARY_WORDS, so that the expression is the whole side.
+    """
+    for count in range(len(words), 0, -1):
+        part = words[:count] if from_start else words[len(words) - count:]
+        expression = " ".join(part)
+        if expression_variables(expression) is not None:
+            if count == len(words):
+                return expression, True
+            neighbour = words[count] if from_start else words[len(words) - count - 1]
+            return expression, neighbour.lower().strip(".,;:!?()\"'") in EQUATION_BOUNDARY_WORDS
+    return None, False
+
+
+def _read_equations(problem: str) -> Tuple[List[tuple], bool]:
+    """Equations stated in a problem, and whether every one was read in full."""
+    equations = []
+    complete = True
+    for clause in CLAUSE_SEPARATOR_PATTERN.split(problem):
+        sides = EQUATION_SIGN_PATTERN.split(clause)
+        if len(sides) != 2:
+            continue
+        left, left_whole = _trim_expression(sides[0].split(), from_start=False)
+        right, right_whole = _trim_expression(sides[1].split(), from_start=True)
+        if left and right:
+            equations.append((left, right))
+            complete = complete and left_whole and right_whole
+    return equations, complete
+
+
+def find_equations(problem: str) -> List[tuple]:
+    """(left, right) sides of the equations stated in a problem."""
+    return _read_equations(problem)[0]
+
+
+def _answer_values(answer: str, variable: str) -> Optional[List[float]]:
+    """Values of ``variable`` in an answer like "x = 2 or x = 3" or "{2, 3}"."""
+    values = []
+    for part in ANSWER_SEPARATOR_PATTERN.split(answer.strip().strip("{}[]$. ")):
+        part = part.strip()
+        if part.lower().startswith(variable):
+            name, _, part = part.partition("=")
+            if name.strip().lower() != variable:
+                return None
+        value = evaluate_expression(part.strip())
+        if value is None:
+            return None
+        values.append(value)
+    return values or None
+
+
+def asks_for_variable(problem: str, variable: str) -> bool:
+    """Whether the final ask of a problem is the bare unknown ("solve for x", "what is x?").
+    
+    "Solve for x: 2x + 1 = 5. Then what is x + 3?" asks for x + 3, not x.
+    """
+    text = problem.lower()
+    asks = list(ASK_PATTERN.finditer(text))
+    if not asks:
+        return False
+    last = asks[-1]
+    rest = text[last.end():]
+    # "Solve 2x + 1 = 5" and "solve the equation" ask for its unknown
+    if last.group(0) == "solve" and not re.match(r'\s+for\b', rest):
+        return True
+    return re.match(BARE_VARIABLE_ASK.format(variable=re.escape(variable)), rest) is not None
+
+
+def _polynomial_roots(left: str, right: str, variable: str) -> Optional[List[float]]:
+    """Real solutions of ``left = right`` if it is a polynomial equation of low degree.
+    
+    The difference of the sides is interpolated at ``degree + 1`` points
+    for increasing degrees, and a degree counts once the polynomial also
+    matches at CHECK_POINTS. Returns None if the equation is not such a
+    polynomial or holds for every value.
+    """
+    def difference(value: float) -> Optional[float]:
+        left_value = evaluate_expression(left, {variable: value})
+        right_value = evaluate_expression(right, {variable: value})
+        if left_value is None or right_value is None:
+            return None
+        return left_value - right_value
+    
+    samples = [difference(point) for point in SAMPLE_POINTS + CHECK_POINTS]
+    if any(sample is None for sample in samples):
+        return None
+    checks = samples[-len(CHECK_POINTS):]
+    for degree in range(MAX_POLYNOMIAL_DEGREE + 1):
+        coefficients = np.polyfit(SAMPLE_POINTS[:degree + 1], samples[:degree + 1], degree)
+        fitted = np.polyval(coefficients, CHECK_POINTS)
+        if all(values_close(value, check) for value, check in zip(fitted, checks)):
+            break
+    else:
+        return None
+    if degree == 0:
+        return None if values_close(coefficients[0], 0.0) else []
+    roots = []
+    for root in np.roots(coefficients):
+        if abs(root.imag) <= 1e-6 * max(1.0, abs(root.real)) and not any(
+                _roots_close(root.real, other) for other in roots):
+            roots.append(float(root.real))
+    return roots
+
+
+def _roots_close(a: float, b: float) -> bool:
+    # Looser than values_close: numerically found roots, repeated ones especially, are less precise
+    return abs(a - b) <= 1e-5 * max(1.0, abs(a), abs(b))
+
+
+def _solutions(equations: List[tuple], variable: str) -> Optional[List[float]]:
+    """Every real solution of a set of equations, if some equation is a polynomial."""
+    for left, right in equations:
+        roots = _polynomial_roots(left, right, variable)
+        if roots is None:
+            continue
+        solutions = []
+        for root in roots:
+            sides = [
+                (evaluate_expression(other_left, {variable: root}), evaluate_expression(other_right, {variable: root}))
+                for other_left, other_right in equations
+            ]
+            if any(a is None or b is None for a, b in sides):
+                return None
+            if all(_roots_close(a, b) for a, b in sides):
+                solutions.append(root)
+        return solutions
+    return None
+
+
+def check_substitution(problem: str, answer: str) -> Verification:
+    """Substitute the answer into the equation(s) stated in the problem.
+    
+    Only applies when every equation has the same single unknown and either
+    the problem's final ask is that unknown or the answer is written
+    "x = ...", so that definitions such as "a_1 = 1", and asks for another
+    expression such as "then what is x + 3?", are not mistaken for the
+    equation to solve. An answer that satisfies the equations is only
+    confirmed if it also gives every solution, which is known when one of
+    the equations is a polynomial of low degree.
+    """
+    method = "substitution"
+    equations, complete = _read_equations(problem)
+    if not complete:
+        # "log x = 2" must not be checked as "x = 2"
+        return Verification(None, method, "the equation contains words that could not be read as math")
+    unknowns = set()
+    for left, right in equations:
+        unknowns |= expression_variables(left) | expression_variables(right)
+    if not equations or len(unknowns) != 1:
+        return Verification(None, method, "no single-variable equation in the problem")
+    variable = unknowns.pop()
+    if not asks_for_variable(problem, variable) and not re.match(rf'\s*{re.escape(variable)}\s*=', answer.lower()):
+        return Verification(None, method, f"the answer is not a value of {variable}")
+    
+    values = _answer_values(answer, variable)
+    if values is None:
+        return Verification(None, method, f"could not read values of {variable} from the answer")
+    for value in values:
+        for left, right in equations:
+            left_value = evaluate_expression(left, {variable: value})
+            right_value = evaluate_expression(right, {variable: value})
+            if left_value is None or right_value is None:
+                return Verification(None, method, f"could not evaluate {left} = {right}")
+            if not values_close(left_value, right_value):
+                return Verification(
+                    False,
+                    method,
+                    f"{variable} = {value:g} does not satisfy {left} = {right} "
+                    f"(left side {left_value:g}, right side {right_value:g})"
+                )
+    
+    solutions = _solutions(equations, variable)
+    if solutions is None:
+        return Verification(None, method, "the values satisfy the equations, but the number of solutions is unknown")
+    missing = [root for root in solutions if not any(_roots_close(root, value) for value in values)]
+    if missing:
+        return Verification(
+            None,
+            method,
+            f"the values satisfy the equations, but {variable} = {missing[0]:g} is a solution too"
+        )
+    return Verification(True, method, f"the values are all the solutions of the equation{'s' if len(equations) > 1 else ''}")
+
+
+def final_output_value(output: str) -> Optional[str]:
+    """The last value a snippet printed ("x = 5" gives "5"), or None if it printed none."""
+    output = output.strip()
+    if not output or output.startswith(("Error", "Variables created", "Code executed")):
+        return None
+    line = output.splitlines()[-1].strip()
+    if len(line) > 200:
+        return None
+    name, sign, value = line.partition(" = ")
+    return value.strip() if sign and name.isidentifier() else line
+
+
+def check_code_outputs(answer: str, outputs: Iterable[str]) -> Verification:
+    """Confirm the answer if a snippet's final printed value equals it.
+    
+    Earlier lines of the output are not compared: the model copies its
+    answer from the output it sees, so some line almost always matches.
+    """
+    method = "code execution"
+    outputs = list(outputs)
+    if not outputs:
+        return Verification(None, method, "no code was run")
+    for output in outputs:
+        value = final_output_value(output)
+        if value is not None and expressions_equal(answer, value):
+            return Verification(True, method, f"final code output {value!r} matches the answer")
+    return Verification(None, method, "no final code output matches the answer")
+
+
+def examination_verdict(examination: str) -> Optional[bool]:
+    """The judgment of an examine_answer response: True if correct, False if not.
+    
+    Only a last line of the form "Judgment: CORRECT" or "Judgment:
+    INCORRECT" counts; prose such as "the reasoning is correct but the
+    answer is wrong" is too easy to misread, so anything else is None.
+    """
+    lines = [line for line in examination.strip().splitlines() if line.strip()]
+    if not lines:
+        return None
+    match = JUDGMENT_PATTERN.fullmatch(lines[-1].strip("*_` \t"))
+    if match is None:
+        return None
+    return match.group(1) == "CORRECT"
@@ -0,0 +1 @@
+"""Tests for the cognitive tools experiment."""
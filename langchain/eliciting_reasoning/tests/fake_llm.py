@@ -0,0 +1,103 @@
+"""Scripted chat model for driving the reasoning graph without an API."""
+
+import asyncio
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import Field, PrivateAttr
+
+
+ScriptItem = Union[str, AIMessage, Callable[[Sequence[BaseMessage]], Union[str, AIMessage]]]
+
+
+def problem_of(messages: Sequence[BaseMessage]) -> str:
+    """The problem in the prompt of a reasoning step."""
+    text = str(messages[0].content)
+    start = text.find("Problem: ")
+    if start == -1:
+        return ""
+    start += len("Problem: ")
+    return text[start:text.find("\n\n", start)]
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Chat model that replies with a fixed script.
+
+    Each call takes the next item of ``script`` (the last one repeats once
+    the script runs out). An item is a reply text, an AIMessage (e.g. with
+    tool calls) or a function of the prompt messages returning either.
+    Streamed replies are split into ``chunk_size``-character chunks.
+    """
+
+    script: List[Any] = Field(default_factory=lambda: ["ANSWER: 6"])
+    delay: float = 0.0
+    fail_first: int = 0
+    chunk_size: int = 4
+    temperature: Optional[float] = None
+    calls: int = 0
+    streamed_chunks: int = 0
+    prompts: List[Sequence[BaseMessage]] = Field(default_factory=list)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        # Part of the LLM cache key, as for real chat models
+        return {"temperature": self.temperature}
+
+    def bind_tools(self, tools, **kwargs) -> "ScriptedChatModel":
+        return self
+
+    def _reply(self, messages: Sequence[BaseMessage]) -> AIMessage:
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+            self.prompts.append(messages)
+        if call <= self.fail_first:
+            raise RuntimeError("rate limited")
+        item = self.script[min(call, len(self.script)) - 1]
+        if callable(item):
+            item = item(messages)
+        return AIMessage(content=item) if isinstance(item, str) else item
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.delay)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.delay)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    def _chunks(self, message: AIMessage) -> List[ChatGenerationChunk]:
+        text = str(message.content)
+        pieces = [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)] or [""]
+        chunks = [ChatGenerationChunk(message=AIMessageChunk(content=piece)) for piece in pieces]
+        if message.tool_calls:
+            chunks.append(ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[
+                {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": index}
+                for index, call in enumerate(message.tool_calls)
+            ])))
+        return chunks
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        for chunk in self._chunks(self._reply(messages)):
+            self.streamed_chunks += 1
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        for chunk in self._chunks(self._reply(messages)):
+            self.streamed_chunks += 1
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+            await asyncio.sleep(0)
@@ -0,0 +1,120 @@
+"""Tests for the answer parsing shared by the reasoning graph and the evaluator."""
+
+import pytest
+
+from experiments.evaluation import Evaluator
+from src.answer_parsing import (
+    answer_key,
+    extract_answer,
+    extract_answer_from_reasoning,
+    extract_answer_line,
+    extract_interval,
+    extract_new_answer,
+    extract_number,
+    extract_solution_values,
+    normalize_answer,
+)
+
+
+class TestExtractAnswer:
+    @pytest.mark.parametrize("text, answer", [
+        ("Some reasoning.\nANSWER: 42\nMore text.", "42"),
+        ("answer: x = 2 or x = 3", "x = 2 or x = 3"),
+        ("ANSWER:\n  7\n", "7"),
+        ("Final Answer: 12", "12"),
+        ("The answer is: 5", "5"),
+        ("Result: 3/4", "3/4"),
+        ("print(6 * 7)\n\nExecution Output:\n42\n", "42"),
+    ])
+    def test_labelled_answers(self, text, answer):
+        assert extract_answer(text) == answer
+
+    def test_first_answer_line_wins(self):
+        assert extract_answer("ANSWER: 1\nANSWER: 2") == "1"
+
+    @pytest.mark.parametrize("text", [
+        "No answer here.",
+        "Execution Output:\nError executing code:\nNameError",
+        "Execution Output:\nCode executed successfully but produced no output.",
+    ])
+    def test_no_answer(self, text):
+        assert extract_answer(text) is None
+
+    def test_answer_line_ignores_other_labels(self):
+        assert extract_answer_line("Result: 12") is None
+        assert extract_answer_line("Result: 12\nAnswer: 13") == "13"
+
+    def test_new_answer_label_split_across_responses(self):
+        assert extract_new_answer("long reasoning " * 100 + "ANSWER:", " 9") == "9"
+        assert extract_new_answer("ANSWER: 1 " + "x" * 1000, "no answer") is None
+
+    def test_fallback_patterns_for_unfinished_reasoning(self):
+        assert extract_answer_from_reasoning("so the GCD is 6, done") == "6"
+        assert extract_answer_from_reasoning("nothing to see") is None
+
+
+class TestNumbersAndSets:
+    @pytest.mark.parametrize("text, number", [
+        ("42", 42.0),
+        ("-3.5", -3.5),
+        ("about 12 apples", 12.0),
+        ("nothing", None),
+    ])
+    def test_extract_number(self, text, number):
+        assert extract_number(text) == number
+
+    def test_solution_values(self):
+        assert extract_solution_values("x = 1 or x = 3") == [1.0, 3.0]
+        assert extract_solution_values("1 or 3") == [1.0, 3.0]
+        assert extract_solution_values("seven") is None
+
+    @pytest.mark.parametrize("text", ["(-1, 2)", "[-1, 2]", "-1 < x < 2"])
+    def test_interval(self, text):
+        assert extract_interval(text) == (-1.0, 2.0)
+
+    def test_normalize_answer(self):
+        assert normalize_answer("  The answer is 2^3 ") == "2**3"
+
+
+class TestAnswerKey:
+    @pytest.mark.parametrize("a, b", [
+        ("1/2", "0.5"),
+        ("5.", "5"),
+        ("x = 3 or x = 1", "x=1, x=3"),
+        ("(1, 2)", "(1.0, 2.0)"),
+        ("Answer: 2x + 1", "2x+1"),
+    ])
+    def test_equivalent_answers_share_a_key(self, a, b):
+        assert answer_key(a) == answer_key(b)
+
+    @pytest.mark.parametrize("a, b", [("1/2", "2"), ("x = 1", "x = 1 or x = 2"), ("2x + 1", "2x - 1")])
+    def test_different_answers_do_not(self, a, b):
+        assert answer_key(a) != answer_key(b)
+
+
+class TestEvaluator:
+    @pytest.mark.parametrize("predicted, expected, problem_type", [
+        ("42", "42", "arithmetic"),
+        ("42.0", "42", "arithmetic"),
+        ("ANSWER: 7", "7", "arithmetic"),
+        ("x = 1 or x = 3", "x=1 or x=3", "algebra"),
+        ("(-1, 2)", "-1 < x < 2", "inequality"),
+    ])
+    def test_correct(self, predicted, expected, problem_type):
+        assert Evaluator()._check_answer(predicted, expected, problem_type)
+
+    @pytest.mark.parametrize("predicted, expected, problem_type", [
+        ("41", "42", "arithmetic"),
+        ("seven", "7", "arithmetic"),
+        ("x = 2", "x = 1 or x = 3", "algebra"),
+    ])
+    def test_incorrect(self, predicted, expected, problem_type):
+        assert not Evaluator()._check_answer(predicted, expected, problem_type)
+
+    def test_error_is_incorrect(self):
+        result = Evaluator().evaluate_solution(
+            {"id": "p", "type": "arithmetic", "answer": "4"},
+            {"final_answer": "4", "error": "rate limited"}
+        )
+        assert not result.is_correct
+        assert result.error == "rate limited"
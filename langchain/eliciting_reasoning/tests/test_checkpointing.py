@@ -0,0 +1,145 @@
+"""Tests for resuming reasoning runs from SQLite checkpoints."""
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from src.agents import CognitiveAgent
+from src.agents.cognitive_agent import run_sync
+from src.checkpointing import SQLiteCheckpointSaver
+from tests.fake_llm import ScriptedChatModel
+
+
+PROBLEM = "What is 6 times 7?"
+
+
+def failing_model():
+    """Call understand_question, then fail once on the next reasoning step, then answer.
+
+    Returns the model and the list of steps it was called for, in order.
+    """
+    steps = []
+
+    def reply(messages):
+        if "You MUST end your response" not in str(messages[0].content):
+            steps.append("tool")
+            return "It asks for a product."
+        steps.append("reasoning")
+        if steps.count("reasoning") == 1:
+            return AIMessage(content="First understand it.", tool_calls=[
+                {"name": "understand_question", "args": {"question": PROBLEM}, "id": "call_1"}
+            ])
+        if steps.count("reasoning") == 2:
+            raise RuntimeError("rate limited")
+        return "ANSWER: 42"
+
+    return ScriptedChatModel(script=[reply]), steps
+
+
+@pytest.fixture
+def checkpointer(tmp_path):
+    saver = SQLiteCheckpointSaver(tmp_path / "checkpoints.sqlite")
+    yield saver
+    saver.close()
+
+
+def test_run_resumes_after_a_mid_run_failure(checkpointer):
+    llm, steps = failing_model()
+    agent = CognitiveAgent(llm, checkpointer=checkpointer, verify_with_llm=False)
+    with pytest.raises(RuntimeError, match="rate limited"):
+        agent.solve(PROBLEM, thread_id="p1")
+    assert steps == ["reasoning", "tool", "reasoning"]
+
+    result = agent.solve(PROBLEM, thread_id="p1")
+    assert result["final_answer"] == "42"
+    # Only the failed step is repeated; the first step and the tool call are not
+    assert steps == ["reasoning", "tool", "reasoning", "reasoning"]
+    assert [usage["tool"] for usage in result["tool_usage"]] == ["understand_question"]
+
+    # A finished thread returns its saved result without calling the LLM
+    assert agent.solve(PROBLEM, thread_id="p1")["final_answer"] == "42"
+    assert len(steps) == 4
+
+
+def test_resume_after_reopening_the_file(tmp_path):
+    path = tmp_path / "checkpoints.sqlite"
+    llm, steps = failing_model()
+    saver = SQLiteCheckpointSaver(path)
+    with pytest.raises(RuntimeError):
+        CognitiveAgent(llm, checkpointer=saver, verify_with_llm=False).solve(PROBLEM, thread_id="p1")
+    saver.close()
+
+    saver = SQLiteCheckpointSaver(path)
+    try:
+        result = CognitiveAgent(llm, checkpointer=saver, verify_with_llm=False).solve(PROBLEM, thread_id="p1")
+    finally:
+        saver.close()
+    assert result["final_answer"] == "42"
+    assert steps.count("tool") == 1
+
+
+@pytest.mark.asyncio
+async def test_async_run_resumes(checkpointer):
+    llm, steps = failing_model()
+    agent = CognitiveAgent(llm, checkpointer=checkpointer, verify_with_llm=False)
+    with pytest.raises(RuntimeError):
+        await agent.asolve(PROBLEM, thread_id="p1")
+    result = await agent.asolve(PROBLEM, thread_id="p1")
+    assert result["final_answer"] == "42"
+    assert steps == ["reasoning", "tool", "reasoning", "reasoning"]
+
+
+def test_batch_retries_resume_instead_of_starting_over(checkpointer):
+    llm, steps = failing_model()
+    agent = CognitiveAgent(llm, checkpointer=checkpointer, verify_with_llm=False)
+    results = run_sync(agent.asolve_batch([PROBLEM], max_retries=1, retry_delay=0.0, thread_ids=["p1"]))
+    assert results[0]["final_answer"] == "42"
+    assert steps == ["reasoning", "tool", "reasoning", "reasoning"]
+
+
+def test_threads_are_independent(checkpointer):
+    agent = CognitiveAgent(ScriptedChatModel(script=["ANSWER: 1", "ANSWER: 2"]), checkpointer=checkpointer,
+                           verify_with_llm=False)
+    assert agent.solve("a", thread_id="a")["final_answer"] == "1"
+    assert agent.solve("b", thread_id="b")["final_answer"] == "2"
+    assert agent.solve("a", thread_id="a")["final_answer"] == "1"
+
+
+def test_thread_id_requires_a_checkpointer():
+    with pytest.raises(ValueError, match="checkpointer"):
+        CognitiveAgent(ScriptedChatModel()).solve(PROBLEM, thread_id="p1")
+
+
+def test_runs_without_a_thread_id_are_not_checkpointed(checkpointer):
+    agent = CognitiveAgent(ScriptedChatModel(script=["ANSWER: 1", "ANSWER: 2"]), checkpointer=checkpointer,
+                           verify_with_llm=False)
+    assert agent.solve("a")["final_answer"] == "1"
+    events = list(agent.solve_stream("b"))
+    assert events[-1]["result"]["final_answer"] == "2"
+    assert list(checkpointer.list(None)) == []
+
+
+@pytest.mark.asyncio
+async def test_async_stream_without_a_thread_id(checkpointer):
+    agent = CognitiveAgent(ScriptedChatModel(script=["ANSWER: 3"]), checkpointer=checkpointer,
+                           verify_with_llm=False)
+    events = [event async for event in agent.asolve_stream("a")]
+    assert events[-1]["result"]["final_answer"] == "3"
+
+
+def test_stream_resumes_a_thread(checkpointer):
+    llm, steps = failing_model()
+    agent = CognitiveAgent(llm, checkpointer=checkpointer, verify_with_llm=False)
+    with pytest.raises(RuntimeError):
+        list(agent.solve_stream(PROBLEM, thread_id="p1"))
+    events = list(agent.solve_stream(PROBLEM, thread_id="p1"))
+    assert events[-1]["result"]["final_answer"] == "42"
+    assert steps == ["reasoning", "tool", "reasoning", "reasoning"]
+
+
+def test_self_consistency_checkpoints_each_sample(checkpointer):
+    agent = CognitiveAgent(ScriptedChatModel(script=["ANSWER: 5"]), checkpointer=checkpointer,
+                           verify_with_llm=False)
+    result = agent.solve_self_consistent("a", samples=3, quorum=3, thread_id="vote")
+    assert result["final_answer"] == "5"
+    threads = {checkpoint.config["configurable"]["thread_id"] for checkpoint in checkpointer.list(None)}
+    assert threads == {f"vote:t0.7:sample-{i}" for i in range(3)}
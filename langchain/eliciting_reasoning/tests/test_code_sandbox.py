@@ -0,0 +1,75 @@
+"""Tests for the worker process sandbox that runs use_code snippets."""
+
+import asyncio
+import os
+
+import pytest
+
+from src.code_sandbox import CodeSandbox, execute_snippet, resource
+
+
+requires_rlimits = pytest.mark.skipif(resource is None, reason="resource limits are not available")
+
+
+@pytest.fixture(scope="module")
+def sandbox():
+    sandbox = CodeSandbox(size=2, timeout=5.0, cpu_seconds=1.0, memory_mb=256, max_output_chars=200)
+    yield sandbox
+    sandbox.close()
+
+
+class TestExecuteSnippet:
+    def test_printed_output(self):
+        assert execute_snippet("print(6 * 7)") == "42\n"
+
+    def test_trailing_expression(self):
+        assert execute_snippet("x = 6\nx * 7") == "42"
+
+    def test_created_variables(self):
+        assert execute_snippet("x = 6\ny = 7") == "Variables created:\nx = 6\ny = 7\n"
+
+    def test_errors_are_described(self):
+        assert execute_snippet("1 / 0").startswith("Error executing code:\nZeroDivisionError")
+        assert "SystemExit" in execute_snippet("exit(3)")
+
+
+class TestCodeSandbox:
+    def test_runs_code_in_a_worker(self, sandbox):
+        assert sandbox.run("import os\nprint(os.getpid())") != f"{os.getpid()}\n"
+        assert sandbox.run("print(sum(range(10)))") == "45\n"
+
+    def test_output_is_truncated(self, sandbox):
+        output = sandbox.run("print('x' * 1000)")
+        assert output.endswith("... (output truncated)")
+        assert len(output) < 300
+
+    def test_crashed_worker_is_replaced(self, sandbox):
+        assert sandbox.run("import os\nos._exit(3)") == (
+            "Error executing code:\nRuntimeError: sandbox process exited with code 3"
+        )
+        assert sandbox.run("print('still working')") == "still working\n"
+
+    def test_wall_clock_timeout(self):
+        sandbox = CodeSandbox(size=1, timeout=0.5, cpu_seconds=None, memory_mb=None)
+        try:
+            assert "TimeoutError: execution exceeded 0.5s" in sandbox.run("import time\ntime.sleep(10)")
+            assert sandbox.run("print(1)") == "1\n"
+        finally:
+            sandbox.close()
+
+    @requires_rlimits
+    def test_cpu_limit(self, sandbox):
+        assert "CPU time limit of 1.0s exceeded" in sandbox.run("while True:\n    pass")
+        assert sandbox.run("print(2)") == "2\n"
+
+    @requires_rlimits
+    def test_memory_limit(self, sandbox):
+        assert "MemoryError" in sandbox.run("data = bytearray(512 * 1024 * 1024)")
+        assert sandbox.run("print(3)") == "3\n"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_snippets_keep_their_own_output(self, sandbox):
+        outputs = await asyncio.gather(*(
+            sandbox.arun(f"import time\ntime.sleep(0.05)\nprint({i})") for i in range(6)
+        ))
+        assert outputs == [f"{i}\n" for i in range(6)]
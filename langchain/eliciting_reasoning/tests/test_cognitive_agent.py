@@ -0,0 +1,108 @@
+"""Tests for batch solving, retries and rate limiting in CognitiveAgent."""
+
+import asyncio
+import random
+import warnings
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from src.agents import CognitiveAgent
+from src.agents.cognitive_agent import provider_rate_limiter, run_sync
+from tests.fake_llm import ScriptedChatModel, problem_of
+
+
+def echo_problem(messages):
+    """Answer every problem with its own text, so results can be matched to problems."""
+    return f"ANSWER: {problem_of(messages)}"
+
+
+class SlowFirstModel(ScriptedChatModel):
+    """Takes longer for earlier problems, so problems finish in reverse order."""
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(0.02 * (5 - int(problem_of(messages)[1:])))
+        return await super()._agenerate(messages, stop, run_manager, **kwargs)
+
+
+class TestBatch:
+    def test_results_keep_problem_order(self):
+        agent = CognitiveAgent(SlowFirstModel(script=[echo_problem]), verify_with_llm=False)
+        finished = []
+        results = run_sync(agent.asolve_batch(
+            [f"p{i}" for i in range(5)],
+            on_result=lambda index, solution: finished.append(index)
+        ))
+        assert [result["final_answer"] for result in results] == ["p0", "p1", "p2", "p3", "p4"]
+        assert finished == [4, 3, 2, 1, 0]
+
+    def test_failed_attempts_are_retried_with_jittered_backoff(self, monkeypatch):
+        delays = []
+
+        def uniform(low, high):
+            delays.append(high)
+            return 0.0
+
+        monkeypatch.setattr(random, "uniform", uniform)
+        llm = ScriptedChatModel(fail_first=2)
+        agent = CognitiveAgent(llm, verify_with_llm=False)
+        results = run_sync(agent.asolve_batch(["p"], max_retries=2, retry_delay=0.5))
+        assert results[0]["final_answer"] == "6"
+        assert "error" not in results[0]
+        assert llm.calls == 3
+        assert delays == [0.5, 1.0]
+
+    def test_problem_that_keeps_failing_gets_an_error_dict(self):
+        def fail_on_bad(messages):
+            if problem_of(messages) == "bad":
+                raise ValueError("model refused")
+            return echo_problem(messages)
+
+        agent = CognitiveAgent(ScriptedChatModel(script=[fail_on_bad]), verify_with_llm=False)
+        results = agent.solve_batch(["good", "bad", "fine"], max_retries=1)
+        assert [result["final_answer"] for result in results] == ["good", None, "fine"]
+        assert results[1]["error"] == "model refused"
+        assert results[1]["problem"] == "bad"
+        assert "error" not in results[0]
+
+    @pytest.mark.asyncio
+    async def test_solve_batch_inside_a_running_event_loop(self):
+        agent = CognitiveAgent(ScriptedChatModel(script=[echo_problem]), verify_with_llm=False)
+        results = agent.solve_batch(["a", "b"])
+        assert [result["final_answer"] for result in results] == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_solve_self_consistent_inside_a_running_event_loop(self):
+        agent = CognitiveAgent(ScriptedChatModel(temperature=0.0), verify_with_llm=False)
+        result = agent.solve_self_consistent("p", samples=3)
+        assert result["final_answer"] == "6"
+        assert result["self_consistency"]["quorum_reached"]
+
+
+class TestProviderRateLimiter:
+    def test_agents_of_one_provider_share_a_bucket(self):
+        first = CognitiveAgent(ScriptedChatModel(), requests_per_second=50)
+        second = CognitiveAgent(ScriptedChatModel(), requests_per_second=50)
+        assert first.llm.rate_limiter is second.llm.rate_limiter
+        assert first.llm.rate_limiter is provider_rate_limiter("scripted", 50)
+
+    def test_changing_the_rate_warns_and_applies_to_everyone(self):
+        limiter = provider_rate_limiter("test-provider", 5)
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            assert provider_rate_limiter("test-provider", 5) is limiter
+        with pytest.warns(UserWarning, match="from 5 to 10"):
+            assert provider_rate_limiter("test-provider", 10) is limiter
+        assert limiter.requests_per_second == 10
+
+    def test_rate_limit_requires_support(self):
+        class NoLimiter:
+            pass
+
+        with pytest.raises(TypeError):
+            CognitiveAgent(NoLimiter(), requests_per_second=1)
+
+    def test_rate_limited_batch_still_finishes(self):
+        llm = ScriptedChatModel(script=[AIMessage(content="ANSWER: 1")])
+        agent = CognitiveAgent(llm, requests_per_second=50, verify_with_llm=False)
+        assert [r["final_answer"] for r in agent.solve_batch(["a", "b", "c"])] == ["1", "1", "1"]
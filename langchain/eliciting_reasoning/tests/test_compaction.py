@@ -0,0 +1,113 @@
+"""Tests for compacting the message history sent on each reasoning step."""
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from src.agents import CognitiveAgent
+from src.graphs.compaction import compact_history, truncate_text
+from tests.fake_llm import ScriptedChatModel
+
+
+def characters(messages):
+    """Token counter for tests: one token per character."""
+    return sum(len(str(message.content)) for message in messages)
+
+
+def tool_round(step, output_chars=100):
+    call_id = f"call_{step}"
+    return [
+        AIMessage(content=f"step {step}", tool_calls=[{"name": "use_code", "args": {}, "id": call_id}]),
+        ToolMessage(content=f"output {step} " + "x" * output_chars, tool_call_id=call_id, name="use_code"),
+    ]
+
+
+def assert_tool_results_follow_their_calls(messages):
+    called = set()
+    for message in messages:
+        if isinstance(message, ToolMessage):
+            assert message.tool_call_id in called
+        for tool_call in getattr(message, "tool_calls", None) or []:
+            called.add(tool_call["id"])
+
+
+PROMPT = HumanMessage(content="Solve the problem.")
+
+
+class TestCompactHistory:
+    def test_no_budget_sends_everything(self):
+        history = tool_round(1) + tool_round(2)
+        assert compact_history(PROMPT, history, None) == [PROMPT, *history]
+
+    def test_oldest_rounds_are_dropped_and_summarized(self):
+        history = tool_round(1, 300) + tool_round(2, 300) + tool_round(3, 300)
+        messages = compact_history(PROMPT, history, 800, token_counter=characters)
+        assert messages[1:] == history[4:]
+        assert "Earlier steps (2 omitted to save context):" in messages[0].content
+        assert "- use_code: output 1 xxx" in messages[0].content
+        assert characters(messages) <= 800
+
+    def test_tool_results_are_never_separated_from_their_calls(self):
+        history = []
+        for step in range(1, 9):
+            history += tool_round(step, output_chars=50 * step)
+        for budget in range(200, 3000, 97):
+            messages = compact_history(PROMPT, history, budget, token_counter=characters)
+            assert_tool_results_follow_their_calls(messages)
+            assert messages[-2:] == history[-2:]
+
+    def test_earlier_tool_outputs_are_truncated_first(self):
+        history = tool_round(1, output_chars=5000) + tool_round(2)
+        messages = compact_history(PROMPT, history, 2000, max_tool_output_chars=500, token_counter=characters)
+        assert len(messages) == 5
+        assert "characters omitted" in messages[2].content
+        assert messages[3:] == history[2:]
+
+    def test_latest_round_over_budget_is_truncated(self):
+        history = tool_round(1, output_chars=5000)
+        messages = compact_history(PROMPT, history, 1000, max_tool_output_chars=500, token_counter=characters)
+        assert len(messages[-1].content) < 1000
+        assert messages[-1].tool_call_id == "call_1"
+
+    def test_summary_lists_only_the_latest_tool_calls(self):
+        history = []
+        for step in range(1, 21):
+            history += tool_round(step)
+        messages = compact_history(PROMPT, history, 1000, token_counter=characters)
+        assert "last 12 of" in messages[0].content
+        assert "output 1 " not in messages[0].content
+
+    def test_truncate_text_keeps_both_ends(self):
+        text = "a" * 100 + "b" * 100
+        truncated = truncate_text(text, 30)
+        assert truncated.startswith("a" * 20)
+        assert truncated.endswith("b" * 10)
+        assert "(170 characters omitted)" in truncated
+
+
+def tool_calling_model(steps):
+    """Call use_code for ``steps`` reasoning steps, then answer."""
+    reasoning_steps = []
+
+    def reply(messages):
+        prompt = str(messages[0].content)
+        if "Previous Reasoning:" in prompt:
+            return f"```python\nprint({len(reasoning_steps)} * 1000)\n```\n" + "explanation " * 200
+        reasoning_steps.append(messages)
+        if len(reasoning_steps) <= steps:
+            call_id = f"call_{len(reasoning_steps)}"
+            return AIMessage(content="Let me compute.", tool_calls=[
+                {"name": "use_code", "args": {"problem": "p", "reasoning": ""}, "id": call_id}
+            ])
+        return "ANSWER: 42"
+
+    return ScriptedChatModel(script=[reply]), reasoning_steps
+
+
+def test_reasoning_steps_send_complete_rounds_within_budget():
+    llm, reasoning_steps = tool_calling_model(steps=6)
+    agent = CognitiveAgent(llm, max_context_tokens=1500, verify_with_llm=False)
+    result = agent.solve("What is 6 times 7?", max_iterations=10)
+    assert result["final_answer"] == "42"
+    assert len(reasoning_steps) == 7
+    for messages in reasoning_steps:
+        assert_tool_results_follow_their_calls(messages)
+    assert "omitted to save context" in str(reasoning_steps[-1][0].content)
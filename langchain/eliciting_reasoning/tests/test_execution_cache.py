@@ -0,0 +1,99 @@
+"""Tests for memoizing use_code execution results."""
+
+import pytest
+
+from src.code_sandbox import CodeSandbox, ExecutionCache, normalized_code_key
+from src.tools.use_code import UseCodeTool
+from tests.fake_llm import ScriptedChatModel
+
+
+@pytest.fixture(scope="module")
+def sandbox():
+    sandbox = CodeSandbox(size=1)
+    yield sandbox
+    sandbox.close()
+
+
+class TestNormalizedCodeKey:
+    def test_formatting_and_comments_do_not_matter(self):
+        assert normalized_code_key("x = 1+2\nprint(x)") == normalized_code_key(
+            "# add\nx = 1 + 2\n\nprint( x )  # show\n"
+        )
+
+    def test_different_code_gets_a_different_key(self):
+        assert normalized_code_key("print(1)") != normalized_code_key("print(2)")
+
+    @pytest.mark.parametrize("code", [
+        "import random\nprint(random.random())",
+        "from datetime import datetime\nprint(datetime.now())",
+        "import numpy as np\nprint(np.random.rand())",
+        "import time\nprint(time.time())",
+    ])
+    def test_nondeterministic_code_gets_no_key(self, code):
+        assert normalized_code_key(code) is None
+
+    def test_syntax_errors_are_keyed_by_text(self):
+        assert normalized_code_key("print(").startswith("text:")
+
+
+class TestExecutionCache:
+    def test_hits_and_misses(self):
+        cache = ExecutionCache()
+        assert cache.get("a") is None
+        cache.put("a", "1\n")
+        assert cache.get("a") == "1\n"
+        assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ExecutionCache(max_entries=2)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        cache.get("a")
+        cache.put("c", "3")
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert cache.get("c") == "3"
+
+    @pytest.mark.parametrize("result", [
+        "Error executing code:\nTimeoutError: execution exceeded 10.0s",
+        "Error executing code:\nRuntimeError: sandbox process exited with code -9",
+    ])
+    def test_transient_failures_are_not_cached(self, result):
+        cache = ExecutionCache()
+        cache.put("a", result)
+        assert cache.stats()["entries"] == 0
+
+    def test_errors_of_the_code_itself_are_cached(self):
+        cache = ExecutionCache()
+        cache.put("a", "Error executing code:\nZeroDivisionError: division by zero")
+        assert cache.stats()["entries"] == 1
+
+
+class TestUseCodeCaching:
+    def test_equivalent_snippets_run_once(self, sandbox):
+        cache = ExecutionCache()
+        tool = UseCodeTool(llm=ScriptedChatModel(), sandbox=sandbox, execution_cache=cache)
+        first = tool._run_response_code("```python\nprint(2 ** 10)\n```")
+        second = tool._run_response_code("```python\n# same thing\nprint(2**10)\n```")
+        assert first.endswith("Execution Output:\n1024\n")
+        assert second.endswith("Execution Output:\n1024\n")
+        assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+    @pytest.mark.asyncio
+    async def test_async_path_shares_the_cache(self, sandbox):
+        cache = ExecutionCache()
+        tool = UseCodeTool(llm=ScriptedChatModel(), sandbox=sandbox, execution_cache=cache)
+        assert await tool._aexecute_code_safely("print(7)") == "7\n"
+        assert tool._execute_code_safely("print( 7 )") == "7\n"
+        assert cache.stats()["hits"] == 1
+
+    def test_nondeterministic_snippets_run_every_time(self, sandbox):
+        cache = ExecutionCache()
+        tool = UseCodeTool(llm=ScriptedChatModel(), sandbox=sandbox, execution_cache=cache)
+        code = "import random\nprint(random.random())"
+        assert tool._execute_code_safely(code) != tool._execute_code_safely(code)
+        assert cache.stats() == {"hits": 0, "misses": 0, "entries": 0}
+
+    def test_caching_can_be_disabled(self, sandbox):
+        tool = UseCodeTool(llm=ScriptedChatModel(), sandbox=sandbox, execution_cache=None)
+        assert tool._execute_code_safely("print(1)") == "1\n"
@@ -0,0 +1,103 @@
+"""Tests for the persistent SQLite LLM response cache."""
+
+import itertools
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration
+
+from src.llm_cache import SQLiteLLMCache
+from tests.fake_llm import ScriptedChatModel
+
+
+def generations(text):
+    return [ChatGeneration(message=AIMessage(content=text))]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = SQLiteLLMCache(tmp_path / "llm_cache.sqlite")
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Make every use of the cache happen at a later time than the previous one."""
+    ticks = itertools.count()
+    monkeypatch.setattr("src.llm_cache.time.time", lambda: float(next(ticks)))
+
+
+class TestModelCalls:
+    def test_same_model_temperature_and_messages_hit(self, cache):
+        llm = ScriptedChatModel(script=["first", "second"], temperature=0.0, cache=cache)
+        assert llm.invoke([HumanMessage(content="q")]).content == "first"
+        assert llm.invoke([HumanMessage(content="q")]).content == "first"
+        assert llm.calls == 1
+        assert cache.stats()["hits"] == 1
+
+    def test_different_messages_miss(self, cache):
+        llm = ScriptedChatModel(script=["first", "second"], temperature=0.0, cache=cache)
+        llm.invoke([HumanMessage(content="q")])
+        assert llm.invoke([HumanMessage(content="other")]).content == "second"
+
+    def test_changed_temperature_misses(self, cache):
+        llm = ScriptedChatModel(script=["first", "second"], temperature=0.0, cache=cache)
+        llm.invoke([HumanMessage(content="q")])
+        warmer = llm.model_copy(update={"temperature": 0.7})
+        assert warmer.invoke([HumanMessage(content="q")]).content == "second"
+
+    def test_changed_model_misses(self, cache):
+        cache.update("q", "model-a", generations("a"))
+        assert cache.lookup("q", "model-b") is None
+        assert cache.lookup("q", "model-a")[0].message.content == "a"
+
+    def test_response_metadata_does_not_change_the_key(self, cache):
+        cache.update('[{"content": "q", "usage_metadata": {"input_tokens": 1}}]', "m", generations("a"))
+        assert cache.lookup('[{"content": "q", "usage_metadata": {"input_tokens": 9}}]', "m") is not None
+
+    @pytest.mark.asyncio
+    async def test_async_lookup_and_update(self, cache):
+        llm = ScriptedChatModel(script=["first", "second"], temperature=0.0, cache=cache)
+        assert (await llm.ainvoke([HumanMessage(content="q")])).content == "first"
+        assert (await llm.ainvoke([HumanMessage(content="q")])).content == "first"
+        assert llm.calls == 1
+        assert cache.stats()["entries"] == 1
+
+
+class TestStorage:
+    def test_least_recently_used_entries_are_evicted(self, tmp_path, clock):
+        size = len(SQLiteLLMCache._dumps(generations("a" * 100)))
+        cache = SQLiteLLMCache(tmp_path / "llm_cache.sqlite", max_size_bytes=3 * size + size // 2)
+        try:
+            for prompt in "abc":
+                cache.update(prompt, "m", generations(prompt * 100))
+            cache.lookup("a", "m")
+            cache.update("d", "m", generations("d" * 100))
+            assert cache.lookup("b", "m") is None
+            for prompt in "acd":
+                assert cache.lookup(prompt, "m") is not None
+            assert cache.stats()["evictions"] == 1
+            assert cache.stats()["size_bytes"] == 3 * size
+        finally:
+            cache.close()
+
+    def test_entries_survive_reopening(self, tmp_path):
+        path = tmp_path / "llm_cache.sqlite"
+        cache = SQLiteLLMCache(path)
+        cache.update("q", "m", generations("kept"))
+        size = cache.stats()["size_bytes"]
+        cache.close()
+
+        cache = SQLiteLLMCache(path)
+        try:
+            assert cache.lookup("q", "m")[0].message.content == "kept"
+            assert cache.stats()["size_bytes"] == size
+        finally:
+            cache.close()
+
+    def test_clear(self, cache):
+        cache.update("q", "m", generations("a"))
+        cache.clear()
+        assert cache.lookup("q", "m") is None
+        assert cache.stats()["size_bytes"] == 0
@@ -0,0 +1,87 @@
+"""Tests for the recall index and keeping evaluated problems out of it."""
+
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from src.problem_index import NEAR_DUPLICATE_SIMILARITY, ProblemIndex, SolvedProblem
+
+
+DATASETS = sorted((Path(__file__).parent.parent / "experiments" / "datasets").glob("*.json"))
+
+
+def questions(path):
+    with open(path, "r") as f:
+        return [problem["question"] for problem in json.load(f)["problems"]]
+
+
+@pytest.fixture
+def index():
+    return ProblemIndex.from_datasets(DATASETS)
+
+
+def test_search_finds_analogues(index):
+    results = index.search("What is the remainder when 3^50 is divided by 5?", k=2)
+    assert results
+    assert "remainder" in results[0][0].question
+    assert results[0][1] >= results[-1][1]
+
+
+def test_variants_of_evaluated_problems_leak_without_exclusion(index):
+    results = index.search("What is the remainder when 2^100 is divided by 7?", k=1)
+    assert results[0][0].question == "What is the remainder when 2^10 is divided by 7?"
+    assert results[0][1] >= NEAR_DUPLICATE_SIMILARITY
+
+
+@pytest.mark.parametrize("dataset", DATASETS, ids=lambda path: path.stem)
+def test_excluded_problems_retrieve_no_near_duplicates(index, dataset):
+    evaluated = questions(dataset)
+    assert index.exclude_similar(evaluated) >= len(evaluated)
+    for question in evaluated:
+        for problem, similarity in index.search(question, k=3):
+            assert similarity < NEAR_DUPLICATE_SIMILARITY
+            assert problem.question not in evaluated
+
+
+def test_exclusion_is_replaced_and_survives_additions(index):
+    question = "What is the remainder when 2^100 is divided by 7?"
+    index.exclude_similar([question])
+    assert all("2^10 " not in problem.question for problem, _ in index.search(question))
+    index.add([SolvedProblem(question="What is the remainder when 2^20 is divided by 7?", answer="4")])
+    assert all("divided by 7" not in problem.question for problem, _ in index.search(question))
+    index.exclude_similar([])
+    assert any("divided by 7" in problem.question for problem, _ in index.search(question))
+
+
+def test_searches_during_additions_and_exclusions(index):
+    question = "What is the remainder when 2^100 is divided by 7?"
+    errors = []
+
+    def search():
+        try:
+            for _ in range(50):
+                index.search(question)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=search) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for i in range(50):
+        index.add([SolvedProblem(question=f"What is {i} + {i}?", answer=str(2 * i))])
+        index.exclude_similar([question] if i % 2 else [])
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def test_traces_round_trip(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    index = ProblemIndex()
+    index.load_traces(path)
+    assert len(index) == 0
+    ProblemIndex.save_traces(path, [SolvedProblem(question="What is 2 + 2?", answer="4", solution="2 + 2 = 4")])
+    index.load_traces(path)
+    assert index.problems[0].solution == "2 + 2 = 4"
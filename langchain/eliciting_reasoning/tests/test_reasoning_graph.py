@@ -0,0 +1,140 @@
+"""Tests for how the reasoning graph runs tool calls and is shared between agents."""
+
+import asyncio
+import re
+import threading
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from src.agents import CognitiveAgent
+from src.graphs import reasoning_graph
+from src.graphs.reasoning_graph import CognitiveReasoningGraph, tool_schema
+from tests.fake_llm import ScriptedChatModel
+
+
+QUESTIONS = [f"q{i}" for i in range(6)]
+
+
+class FanOutModel(ScriptedChatModel):
+    """Calls understand_question once per question in one message, then answers.
+
+    Tool calls take longer for earlier questions, so they finish in reverse
+    order, and the model records the most tool calls it ran at once.
+    """
+
+    log: dict = {}
+
+    def _reply(self, messages):
+        with self._lock:
+            self.prompts.append(messages)
+        if "You MUST end your response" not in str(messages[0].content):
+            return AIMessage(content=f"understood {self._question(messages)}")
+        if any(isinstance(message, ToolMessage) for message in messages):
+            return AIMessage(content="ANSWER: 1")
+        return AIMessage(content="Look at every part.", tool_calls=[
+            {"name": "understand_question", "args": {"question": question}, "id": f"call_{question}"}
+            for question in QUESTIONS
+        ])
+
+    @staticmethod
+    def _question(messages):
+        return re.search(r"Problem: (q\d+)", str(messages[0].content)).group(1)
+
+    def _delay(self, messages):
+        if "You MUST end your response" in str(messages[0].content):
+            return 0.0
+        return 0.01 * (len(QUESTIONS) - int(self._question(messages)[1:]))
+
+    def _enter(self):
+        with self._lock:
+            self.log["running"] = self.log.get("running", 0) + 1
+            self.log["most"] = max(self.log.get("most", 0), self.log["running"])
+
+    def _leave(self):
+        with self._lock:
+            self.log["running"] -= 1
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self._enter()
+        try:
+            time.sleep(self._delay(messages))
+            return super()._generate(messages, stop, run_manager, **kwargs)
+        finally:
+            self._leave()
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        self._enter()
+        try:
+            await asyncio.sleep(self._delay(messages))
+            return await super()._agenerate(messages, stop, run_manager, **kwargs)
+        finally:
+            self._leave()
+
+
+def fan_out_agent():
+    llm = FanOutModel(log={})
+    return CognitiveAgent(llm, max_parallel_tools=2, verify_with_llm=False), llm
+
+
+def tool_messages(llm):
+    """ToolMessages sent to the model on the last reasoning step."""
+    return [message for message in llm.prompts[-1] if isinstance(message, ToolMessage)]
+
+
+class TestParallelTools:
+    def test_tool_calls_stay_within_the_limit_and_keep_call_order(self):
+        agent, llm = fan_out_agent()
+        result = agent.solve("p")
+        assert result["final_answer"] == "1"
+        assert llm.log["most"] == 2
+        messages = tool_messages(llm)
+        assert [message.tool_call_id for message in messages] == [f"call_{q}" for q in QUESTIONS]
+        assert [message.content for message in messages] == [f"understood {q}" for q in QUESTIONS]
+
+    @pytest.mark.asyncio
+    async def test_async_tool_calls_stay_within_the_limit_and_keep_call_order(self):
+        agent, llm = fan_out_agent()
+        result = await agent.asolve("p")
+        assert result["final_answer"] == "1"
+        assert llm.log["most"] == 2
+        assert [message.tool_call_id for message in tool_messages(llm)] == [f"call_{q}" for q in QUESTIONS]
+
+
+class TestSharedGraphs:
+    def test_agents_with_the_same_llm_and_settings_share_a_graph(self):
+        llm = ScriptedChatModel()
+        first = CognitiveAgent(llm, max_parallel_tools=3, verify_with_llm=False)
+        second = CognitiveAgent(llm, max_parallel_tools=3, verify_with_llm=False)
+        assert first.graph is second.graph
+
+    @pytest.mark.parametrize("options", [
+        {"max_parallel_tools": 4},
+        {"verify_with_llm": True},
+        {"max_context_tokens": None},
+    ])
+    def test_different_settings_get_their_own_graph(self, options):
+        llm = ScriptedChatModel()
+        agent = CognitiveAgent(llm, max_parallel_tools=3, verify_with_llm=False)
+        other = CognitiveAgent(llm, **{"max_parallel_tools": 3, "verify_with_llm": False, **options})
+        assert agent.graph is not other.graph
+
+    def test_different_llms_get_their_own_graph(self):
+        assert CognitiveAgent(ScriptedChatModel()).graph is not CognitiveAgent(ScriptedChatModel()).graph
+
+    def test_tool_schemas_are_built_once_per_tool_type(self, monkeypatch):
+        converted = []
+
+        def convert(tool):
+            converted.append(tool.name)
+            return convert_to_openai_tool(tool)
+
+        monkeypatch.setattr(reasoning_graph, "_TOOL_SCHEMAS", {})
+        monkeypatch.setattr(reasoning_graph, "convert_to_openai_tool", convert)
+        first = CognitiveReasoningGraph(ScriptedChatModel())
+        second = CognitiveReasoningGraph(ScriptedChatModel(), max_parallel_tools=2)
+        assert sorted(converted) == sorted(tool.name for tool in first.tools)
+        assert [tool_schema(tool) for tool in first.tools] == [tool_schema(tool) for tool in second.tools]
+        assert len(converted) == len(first.tools)
@@ -0,0 +1,115 @@
+"""Tests for self-consistency: majority voting over sampled trajectories."""
+
+import asyncio
+import time
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from src.agents import CognitiveAgent
+from src.agents.cognitive_agent import run_sync
+from tests.fake_llm import ScriptedChatModel
+
+
+class SamplingModel(ScriptedChatModel):
+    """Gives the i-th sampled trajectory ``answers[i]``, after ``delays[i]`` seconds.
+
+    An answer that is an exception is raised instead. Records the temperature
+    of every call and which calls were cancelled.
+    """
+
+    answers: list = []
+    delays: list = []
+    log: dict = {}
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        index = self.log.setdefault("started", 0)
+        self.log["started"] += 1
+        self.log.setdefault("temperatures", []).append(self.temperature)
+        try:
+            await asyncio.sleep(self.delays[index] if index < len(self.delays) else 0.0)
+        except asyncio.CancelledError:
+            self.log["cancelled"] = self.log.get("cancelled", 0) + 1
+            raise
+        answer = self.answers[index]
+        if isinstance(answer, Exception):
+            raise answer
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=f"ANSWER: {answer}"))])
+
+
+class NoTemperatureModel(BaseChatModel):
+    """Chat model without a temperature setting."""
+
+    @property
+    def _llm_type(self) -> str:
+        return "no-temperature"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="ANSWER: 1"))])
+
+
+def sampling_agent(answers, delays=()):
+    llm = SamplingModel(answers=list(answers), delays=list(delays), log={}, temperature=0.0)
+    return CognitiveAgent(llm, verify_with_llm=False), llm.log
+
+
+class TestSelfConsistency:
+    def test_majority_answer_wins_and_equivalent_answers_vote_together(self):
+        agent, log = sampling_agent(["21", "22", "21.0", "22", "ANSWER: 21"], delays=[0.0, 0.01, 0.02, 0.03, 0.04])
+        result = agent.solve_self_consistent("p", samples=5, quorum=5)
+        assert result["final_answer"] == "21"
+        assert result["self_consistency"] == {
+            "votes": {"21": 3, "22": 2},
+            "samples": 5,
+            "errors": 0,
+            "quorum_reached": False
+        }
+
+    def test_quorum_cancels_the_remaining_trajectories(self):
+        agent, log = sampling_agent(["7", "7", "7", "8", "8"], delays=[0.0, 0.01, 0.02, 10.0, 10.0])
+        start = time.perf_counter()
+        result = agent.solve_self_consistent("p", samples=5)
+        assert time.perf_counter() - start < 5.0
+        assert result["final_answer"] == "7"
+        assert result["self_consistency"]["quorum_reached"]
+        assert result["self_consistency"]["samples"] == 3
+        assert log["cancelled"] == 2
+
+    def test_tie_goes_to_the_answer_reached_first(self):
+        agent, _ = sampling_agent(["5", "6", "6", "5"], delays=[0.0, 0.01, 0.02, 0.03])
+        result = agent.solve_self_consistent("p", samples=4, quorum=4)
+        assert result["final_answer"] == "5"
+
+    def test_failed_trajectories_are_counted_but_do_not_vote(self):
+        agent, _ = sampling_agent(["3", RuntimeError("rate limited"), "3"], delays=[0.0, 0.01, 0.02])
+        result = agent.solve_self_consistent("p", samples=3, quorum=3)
+        assert result["final_answer"] == "3"
+        assert result["self_consistency"]["errors"] == 1
+        assert result["self_consistency"]["votes"] == {"3": 2}
+
+    def test_all_trajectories_failing_raises(self):
+        agent, _ = sampling_agent([RuntimeError("first"), RuntimeError("second")], delays=[0.0, 0.01])
+        with pytest.raises(RuntimeError):
+            agent.solve_self_consistent("p", samples=2)
+
+    def test_samples_use_a_copy_of_the_llm_at_the_sampling_temperature(self):
+        agent, log = sampling_agent(["1", "1"])
+        agent.solve_self_consistent("p", samples=2, temperature=0.9)
+        assert log["temperatures"] == [0.9, 0.9]
+        assert agent.llm.temperature == 0.0
+
+    def test_sampling_requires_a_temperature(self):
+        agent = CognitiveAgent(NoTemperatureModel(), verify_with_llm=False)
+        with pytest.raises(TypeError, match="temperature"):
+            agent.solve_self_consistent("p", samples=3)
+
+    def test_batch_with_samples_votes_per_problem(self):
+        agent, _ = sampling_agent(["4"] * 6)
+        results = run_sync(agent.asolve_batch(["a", "b"], samples=3))
+        assert [result["final_answer"] for result in results] == ["4", "4"]
+        assert all(result["self_consistency"]["quorum_reached"] for result in results)
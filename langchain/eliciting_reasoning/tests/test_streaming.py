@@ -0,0 +1,61 @@
+"""Tests for streaming reasoning that stops at the first complete answer line."""
+
+import pytest
+
+from src.agents import CognitiveAgent
+from src.answer_parsing import AnswerLineDetector
+from tests.fake_llm import ScriptedChatModel
+
+
+RESPONSE = "2 times 3 is 6.\nANSWER: 6\nmore text that is never generated"
+
+
+def feed_all(detector, text, size):
+    for i in range(0, len(text), size):
+        answer = detector.feed(text[i:i + size])
+        if answer:
+            return answer
+    return None
+
+
+class TestAnswerLineDetector:
+    @pytest.mark.parametrize("size", [1, 3, 12, 100])
+    def test_answer_end_is_the_end_of_the_answer_line(self, size):
+        detector = AnswerLineDetector()
+        assert feed_all(detector, RESPONSE, size) == "6"
+        assert detector.text[:detector.answer_end].endswith("ANSWER: 6")
+
+    def test_label_on_its_own_line(self):
+        detector = AnswerLineDetector()
+        assert feed_all(detector, "ANSWER:\n42\nextra\n", 100) == "42"
+        assert detector.text[:detector.answer_end] == "ANSWER:\n42"
+
+    def test_answer_on_an_earlier_line_than_the_last_newline(self):
+        detector = AnswerLineDetector()
+        assert detector.feed("ANSWER: 6\nmore\nmo") == "6"
+        assert detector.answer_end == len("ANSWER: 6")
+
+    def test_incomplete_line_is_not_an_answer(self):
+        detector = AnswerLineDetector()
+        assert detector.feed("ANSWER: 1") is None
+        assert detector.feed("2") is None
+        assert detector.feed("\n") == "12"
+        assert detector.answer_end is not None
+
+
+class TestStreamedReasoning:
+    @pytest.mark.parametrize("chunk_size", [4, 12, 30])
+    def test_trace_ends_at_the_answer_line(self, chunk_size):
+        llm = ScriptedChatModel(script=[RESPONSE], chunk_size=chunk_size)
+        agent = CognitiveAgent(llm, verify_with_llm=False)
+        result = list(agent.solve_stream("What is 2 times 3?"))[-1]["result"]
+        assert result["final_answer"] == "6"
+        assert result["reasoning_trace"].endswith("ANSWER: 6")
+        assert llm.streamed_chunks < len(RESPONSE) / chunk_size
+
+    @pytest.mark.asyncio
+    async def test_async_trace_ends_at_the_answer_line(self):
+        llm = ScriptedChatModel(script=[RESPONSE], chunk_size=12)
+        agent = CognitiveAgent(llm, verify_with_llm=False)
+        events = [event async for event in agent.asolve_stream("What is 2 times 3?")]
+        assert events[-1]["result"]["reasoning_trace"].endswith("ANSWER: 6")
@@ -0,0 +1,171 @@
+"""Tests for the local answer checks and how the graph acts on them."""
+
+import pytest
+
+from src.agents import CognitiveAgent
+from src.verification import (
+    asks_for_variable,
+    check_code_outputs,
+    check_substitution,
+    examination_verdict,
+    expressions_equal,
+    final_output_value,
+    find_equations,
+)
+from tests.fake_llm import ScriptedChatModel
+
+
+class TestExpressions:
+    @pytest.mark.parametrize("a, b", [
+        ("2(x+1)", "2x+2"),
+        ("(x+1)(x-1)", "x^2 - 1"),
+        ("√2", "1.4142135623730951"),
+        ("1/2", "0.5"),
+        ("3×4", "12"),
+    ])
+    def test_equal(self, a, b):
+        assert expressions_equal(a, b)
+
+    @pytest.mark.parametrize("a, b", [("2x+1", "2x+2"), ("x^2", "2x"), ("5", "7")])
+    def test_not_equal(self, a, b):
+        assert not expressions_equal(a, b)
+
+    def test_prose_is_not_an_equation(self):
+        assert find_equations("The answer = the number of apples") == []
+        assert find_equations("Solve for x: 2x + 1 = 5") == [("2x + 1", "5")]
+
+
+class TestSubstitution:
+    def test_correct_value_is_confirmed(self):
+        assert check_substitution("Solve for x: 2x + 1 = 5", "2").verified is True
+
+    def test_wrong_value_is_refuted(self):
+        verification = check_substitution("Solve for x: 2x + 1 = 5", "3")
+        assert verification.verified is False
+        assert "does not satisfy" in verification.detail
+
+    def test_ask_for_another_expression_is_not_substituted(self):
+        problem = "Solve for x: 2x + 1 = 5. Then what is x + 3?"
+        assert not asks_for_variable(problem, "x")
+        assert check_substitution(problem, "5").verified is None
+
+    def test_answer_naming_the_variable_is_substituted(self):
+        problem = "Solve for x: 2x + 1 = 5. Then what is x + 3?"
+        assert check_substitution(problem, "x = 2").verified is True
+
+    @pytest.mark.parametrize("problem", [
+        "Solve 2x + 1 = 5",
+        "Find x if 2x + 1 = 5.",
+        "What is the value of x in the equation 2x + 1 = 5?",
+        "Determine all real values of x such that 2x + 1 = 5",
+    ])
+    def test_asks_for_the_bare_variable(self, problem):
+        assert asks_for_variable(problem, "x")
+
+    def test_incomplete_set_of_roots_is_not_confirmed(self):
+        verification = check_substitution("Solve for x: x^2 = 4", "2")
+        assert verification.verified is None
+        assert "-2" in verification.detail
+
+    @pytest.mark.parametrize("answer", ["x = 2 or x = -2", "2, -2", "{-2, 2}"])
+    def test_complete_set_of_roots_is_confirmed(self, answer):
+        assert check_substitution("Solve for x: x^2 = 4", answer).verified is True
+
+    def test_repeated_root(self):
+        assert check_substitution("Solve (x - 2)^2 = 0", "2").verified is True
+
+    def test_number_of_solutions_unknown_is_not_confirmed(self):
+        assert check_substitution("Solve for x: sqrt(x) = 3", "9").verified is None
+
+    def test_definitions_are_not_equations_to_solve(self):
+        problem = "If a_1 = 1 and the common difference is 2, what is a_10?"
+        assert check_substitution(problem, "19").verified is None
+
+    @pytest.mark.parametrize("problem, answer", [
+        ("Solve for x: log x = 2", "100"),
+        ("sqrt x = 3", "9"),
+        ("twice x = 10", "5"),
+        ("3 times x = 12", "4"),
+        ("20% of x = 10", "50"),
+        ("Solve for x in degrees: sin x = 0.5", "30"),
+    ])
+    def test_words_dropped_from_the_equation_leave_it_undecided(self, problem, answer):
+        assert check_substitution(problem, answer).verified is None
+
+    def test_words_around_the_equation_are_dropped(self):
+        problem = "What is the value of x in the equation 3x + 7 = 22?"
+        assert find_equations(problem) == [("3x + 7", "22")]
+        assert check_substitution(problem, "4").verified is False
+
+
+class TestCodeOutputs:
+    def test_only_the_final_printed_value_counts(self):
+        assert final_output_value("5\n7\n") == "7"
+        assert check_code_outputs("7", ["5\n7"]).verified is True
+        assert check_code_outputs("5", ["5\n7"]).verified is None
+
+    def test_named_value(self):
+        assert check_code_outputs("3", ["steps done\nx = 3"]).verified is True
+
+    @pytest.mark.parametrize("output", [
+        "Variables created:\nx = 3\n",
+        "Error executing code:\nNameError: name 'y' is not defined",
+        "Code executed successfully but produced no output.",
+    ])
+    def test_outputs_without_a_printed_value(self, output):
+        assert final_output_value(output) is None
+        assert check_code_outputs("3", [output]).verified is None
+
+    def test_no_code(self):
+        assert check_code_outputs("3", []).detail == "no code was run"
+
+
+class TestExaminationVerdict:
+    @pytest.mark.parametrize("examination", [
+        "The reasoning is correct but the final answer is wrong",
+        "I cannot say it is correct; it is incorrect",
+        "nothing is wrong",
+        "Judgment: CORRECT\nbut on second thought it is not",
+        "Judgment: probably correct",
+        "",
+    ])
+    def test_anything_but_a_final_judgment_line_is_undecided(self, examination):
+        assert examination_verdict(examination) is None
+
+    def test_final_judgment_line(self):
+        assert examination_verdict("The steps check out.\n\nJudgment: CORRECT") is True
+        assert examination_verdict("The sign is wrong.\n**Judgment: INCORRECT**\n") is False
+
+
+def examine_or_answer(answer, judgment):
+    """Answer reasoning prompts with ``answer`` and examine_answer prompts with ``judgment``."""
+    def reply(messages):
+        if "Current Proposed Answer:" in str(messages[0].content):
+            return f"Looks fine.\nJudgment: {judgment}"
+        return f"ANSWER: {answer}"
+    return reply
+
+
+class TestGraphVerification:
+    def test_refuted_answer_goes_back_to_the_model(self):
+        llm = ScriptedChatModel(script=["ANSWER: 3", "ANSWER: 2"])
+        result = CognitiveAgent(llm, verify_with_llm=False).solve("Solve for x: 2x + 1 = 5")
+        assert result["final_answer"] == "2"
+        assert result["verified"] is True
+        assert result["verification"].startswith("substitution:")
+        assert "does not satisfy" in str(llm.prompts[1][-1].content)
+
+    def test_undecided_answer_is_examined_by_the_llm(self):
+        llm = ScriptedChatModel(script=[examine_or_answer("6", "CORRECT")])
+        result = CognitiveAgent(llm).solve("What is 2 times 3?")
+        assert result["final_answer"] == "6"
+        assert result["verified"] is True
+        assert result["verification"] == "examine_answer: judged correct"
+
+    def test_undecided_answer_stays_unverified_without_the_llm(self):
+        llm = ScriptedChatModel(script=["ANSWER: 6"])
+        result = CognitiveAgent(llm, verify_with_llm=False).solve("What is 2 times 3?")
+        assert result["final_answer"] == "6"
+        assert result["verified"] is False
+        assert result["verification"].startswith("code execution:")
+        assert llm.calls == 1
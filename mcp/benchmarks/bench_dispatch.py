@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for tool listing and dispatch overhead in SimpleMCPServer.
+
+Compares the registry-based server against a copy of the previous
+implementation, which rebuilt every Tool on each list_tools call and walked
+an if/elif chain in call_tool. call_tool is timed with and without the
+result cache; without it, every call runs its handler, as the legacy
+server did, and pays for the latency metrics. Only impure tools such as
+get_time also pass through the concurrency gate.
+
+Usage:
+    python benchmarks/bench_dispatch.py [--iterations 20000]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp.types import CallToolResult, TextContent, Tool  # noqa: E402
+
+from server import SimpleMCPServer  # noqa: E402
+
+
+def legacy_list_tools() -> List[Tool]:
+    """Per-call schema construction, as the server did before the registry."""
+    return [
+        Tool(
+            name="calculate",
+            description="Perform basic arithmetic calculations",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "operation": {
+                        "type": "string",
+                        "enum": ["add", "subtract", "multiply", "divide"],
+                        "description": "The arithmetic operation to perform"
+                    },
+                    "a": {"type": "number", "description": "First number"},
+                    "b": {"type": "number", "description": "Second number"}
+                },
+                "required": ["operation", "a", "b"]
+            }
+        ),
+        Tool(
+            name="echo",
+            description="Echo back the provided message",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "message": {"type": "string", "description": "Message to echo back"}
+                },
+                "required": ["message"]
+            }
+        ),
+        Tool(
+            name="get_time",
+            description="Get the current time",
+            inputSchema={"type": "object", "properties": {}}
+        )
+    ]
+
+
+async def legacy_call_tool(name: str, arguments: Dict[str, Any]) -> List[CallToolResult]:
+    """if/elif dispatch, copied from the server before the registry."""
+    if name == "calculate":
+        try:
+            operation = arguments["operation"]
+            a = float(arguments["a"])
+            b = float(arguments["b"])
+            
+            if operation == "add":
+                result = a + b
+            elif operation == "subtract":
+                result = a - b
+            elif operation == "multiply":
+                result = a * b
+            elif operation == "divide":
+                if b == 0:
+                    return [CallToolResult(
+                        content=[TextContent(type="text", text="Error: Division by zero")],
+                        isError=True
+                    )]
+                result = a / b
+            else:
+                return [CallToolResult(
+                    content=[TextContent(type="text", text=f"Unknown operation: {operation}")],
+                    isError=True
+                )]
+            
+            return [CallToolResult(
+                content=[TextContent(type="text", text=f"Result: {result}")]
+            )]
+        except Exception as e:
+            return [CallToolResult(
+                content=[TextContent(type="text", text=f"Error: {str(e)}")],
+                isError=True
+            )]
+    
+    elif name == "echo":
+        message = arguments.get("message", "")
+        return [CallToolResult(
+            content=[TextContent(type="text", text=f"Echo: {message}")]
+        )]
+    
+    elif name == "get_time":
+        from datetime import datetime
+        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        return [CallToolResult(
+            content=[TextContent(type="text", text=f"Current time: {current_time}")]
+        )]
+    
+    else:
+        return [CallToolResult(
+            content=[TextContent(type="text", text=f"Unknown tool: {name}")],
+            isError=True
+        )]
+
+
+async def time_calls(call, name: str, arguments: Dict[str, Any], iterations: int, repeats: int = 5) -> float:
+    """Best per-call time over several rounds, which filters out scheduler noise."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(iterations // repeats):
+            await call(name, arguments)
+        best = min(best, per_call_us(start, iterations // repeats))
+    return best
+
+
+def per_call_us(start: float, iterations: int) -> float:
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def run(iterations: int):
+    server = SimpleMCPServer(plugins_dir=None, plugin_entry_points=False)
+    # Without the result cache, every call runs its handler, as the legacy server did
+    uncached = SimpleMCPServer(cache_size=0, plugins_dir=None, plugin_entry_points=False)
+    calls = [
+        ("echo", {"message": "benchmark"}),
+        ("calculate", {"operation": "divide", "a": 7, "b": 2}),
+        ("get_time", {}),
+    ]
+    
+    start = time.perf_counter()
+    for _ in range(iterations):
+        legacy_list_tools()
+    legacy_list = per_call_us(start, iterations)
+    
+    start = time.perf_counter()
+    for _ in range(iterations):
+        server.list_tools()
+    registry_list = per_call_us(start, iterations)
+    
+    print(f"=== Dispatch micro-benchmark ({iterations} iterations) ===\n")
+    print(f"{'':32}{'legacy (us)':>14}{'registry (us)':>16}{'speedup':>10}")
+    print(f"{'list_tools':32}{legacy_list:>14.2f}{registry_list:>16.2f}{legacy_list / registry_list:>9.1f}x")
+    for name, arguments in calls:
+        legacy = await time_calls(legacy_call_tool, name, arguments, iterations)
+        for label, target in (("", server), (" (no cache)", uncached)):
+            registry = await time_calls(target.call_tool, name, arguments, iterations)
+            row = f"call_tool {name}{label}"
+            print(f"{row:32}{legacy:>14.2f}{registry:>16.2f}{legacy / registry:>9.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Load-generating benchmark for the Simple MCP Server.
+
+Opens N concurrent client sessions against server.py and replays a weighted
+mix of call_tool, list_tools and get_prompt requests. Reports p50/p95/p99
+latency and throughput per request type, samples the server's resident
+memory, and optionally writes the results as JSON for regression tracking.
+
+With the stdio transport every session launches its own server process; with
+the HTTP transport all sessions share one server started by this script (or
+an already running one given by --url).
+
+Usage:
+    python benchmarks/load_test.py --sessions 8 --requests 200
+    python benchmarks/load_test.py --transport http --sessions 32 --output results.json
+    python benchmarks/load_test.py --mix call_tool=8,list_tools=1,get_prompt=1
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+try:
+    import psutil
+except ImportError:  # RSS sampling is skipped without psutil
+    psutil = None
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TOOL_CALLS: List[Tuple[str, Dict[str, Any]]] = [
+    ("calculate", {"operation": "add", "a": 10, "b": 5}),
+    ("calculate", {"operation": "divide", "a": 22, "b": 7}),
+    ("echo", {"message": "Hello from the load test!"}),
+    ("calculate_batch", {"operation": "multiply", "a": list(range(100)), "b": list(range(100))}),
+    ("get_time", {}),
+]
+
+PROMPTS: List[Tuple[str, Dict[str, str]]] = [
+    ("greeting", {"name": "Ken", "language": "Japanese"}),
+    ("math_problem", {"difficulty": "medium"}),
+]
+
+OPERATIONS = ("call_tool", "list_tools", "get_prompt")
+
+
+def parse_mix(spec: str) -> Dict[str, int]:
+    """Parse a weighted mix such as 'call_tool=8,list_tools=1,get_prompt=1'."""
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"Unknown operation in mix: {name}")
+        mix[name] = int(weight or 1)
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("Mix needs at least one positive weight")
+    return mix
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    """Latency percentiles (ms) and throughput for one request type."""
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "errors": errors,
+        "throughput_rps": len(values) / elapsed if elapsed else 0.0,
+        "mean_ms": sum(values) / len(values) * 1000 if values else 0.0,
+        "p50_ms": percentile(values, 50) * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "max_ms": values[-1] * 1000 if values else 0.0,
+    }
+
+
+@contextlib.asynccontextmanager
+async def open_session(url: Optional[str]):
+    """Open an initialized client session over HTTP or stdio."""
+    if url:
+        from mcp.client.streamable_http import streamable_http_client
+        async with streamable_http_client(url) as (read, write, _):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                yield session
+    else:
+        server_params = StdioServerParameters(
+            command=sys.executable,
+            args=["server.py"],
+            cwd=SERVER_DIR
+        )
+        async with stdio_client(server_params) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                yield session
+
+
+class Phases:
+    """Synchronizes sessions so only the steady-state request phase is timed."""
+
+    def __init__(self):
+        self.connected = asyncio.Semaphore(0)
+        self.start = asyncio.Event()
+        self.done = asyncio.Semaphore(0)
+        self.finish = asyncio.Event()
+
+
+async def run_session(
+    url: Optional[str],
+    requests: int,
+    mix: Dict[str, int],
+    seed: int,
+    samples: Dict[str, List[float]],
+    errors: Dict[str, int],
+    phases: Phases,
+):
+    """Replay ``requests`` randomly chosen operations over one session."""
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    async with open_session(url) as session:
+        # Start measuring only once every session is connected
+        phases.connected.release()
+        await phases.start.wait()
+        for _ in range(requests):
+            operation = rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                if operation == "call_tool":
+                    result = await session.call_tool(*rng.choice(TOOL_CALLS))
+                    failed = bool(result.isError)
+                elif operation == "list_tools":
+                    await session.list_tools()
+                    failed = False
+                else:
+                    await session.get_prompt(*rng.choice(PROMPTS))
+                    failed = False
+            except Exception:
+                failed = True
+            samples[operation].append(time.perf_counter() - start)
+            if failed:
+                errors[operation] += 1
+        # Hold the connection until everyone is done so RSS reflects the full load
+        phases.done.release()
+        await phases.finish.wait()
+
+
+def server_processes(server_pid: Optional[int]) -> List[Any]:
+    """Processes whose memory counts as the server's."""
+    if psutil is None:
+        return []
+    try:
+        if server_pid is not None:
+            return [psutil.Process(server_pid)]
+        # stdio sessions run one server per session as our child processes
+        return psutil.Process().children(recursive=True)
+    except psutil.Error:
+        return []
+
+
+def total_rss(server_pid: Optional[int]) -> Optional[int]:
+    """Combined resident set size of the server process(es) in bytes."""
+    if psutil is None:
+        return None
+    total = 0
+    for process in server_processes(server_pid):
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            pass
+    return total
+
+
+async def sample_rss(server_pid: Optional[int], peak: List[int], interval: float = 0.1):
+    """Record the peak server RSS until cancelled."""
+    while True:
+        rss = total_rss(server_pid)
+        if rss is not None and rss > peak[0]:
+            peak[0] = rss
+        await asyncio.sleep(interval)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def http_server(port: int):
+    """Launch server.py with the HTTP transport and wait until it accepts connections."""
+    process = subprocess.Popen(
+        [sys.executable, "server.py", "--transport", "http", "--port", str(port)],
+        cwd=SERVER_DIR,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+                break
+            except OSError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("HTTP server failed to start")
+                time.sleep(0.1)
+        yield process
+    finally:
+        process.terminate()
+        process.wait()
+
+
+async def run_benchmark(args: argparse.Namespace, url: Optional[str], server_pid: Optional[int]) -> Dict[str, Any]:
+    samples: Dict[str, List[float]] = {operation: [] for operation in args.mix}
+    errors: Dict[str, int] = {operation: 0 for operation in args.mix}
+    phases = Phases()
+    peak_rss = [0]
+
+    sessions = [
+        asyncio.create_task(run_session(url, args.requests, args.mix, args.seed + i, samples, errors, phases))
+        for i in range(args.sessions)
+    ]
+    for _ in sessions:
+        await phases.connected.acquire()
+    sampler = asyncio.create_task(sample_rss(server_pid, peak_rss))
+    start = time.perf_counter()
+    phases.start.set()
+    for _ in sessions:
+        await phases.done.acquire()
+    elapsed = time.perf_counter() - start
+    sampler.cancel()
+    phases.finish.set()
+    await asyncio.gather(*sessions)
+
+    all_latencies = [latency for values in samples.values() for latency in values]
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "transport": "http" if url else "stdio",
+            "sessions": args.sessions,
+            "requests_per_session": args.requests,
+            "mix": args.mix,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "elapsed_s": elapsed,
+        "overall": summarize(all_latencies, sum(errors.values()), elapsed),
+        "operations": {
+            operation: summarize(samples[operation], errors[operation], elapsed)
+            for operation in args.mix
+        },
+        "server_peak_rss_bytes": peak_rss[0] if psutil is not None else None,
+    }
+
+
+def print_report(results: Dict[str, Any]):
+    config = results["config"]
+    print(f"=== MCP load test: {config['sessions']} sessions x {config['requests_per_session']} requests "
+          f"over {config['transport']} ===\n")
+    print(f"{'operation':12}{'count':>8}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    rows = list(results["operations"].items()) + [("overall", results["overall"])]
+    for name, stats in rows:
+        print(f"{name:12}{stats['count']:>8}{stats['errors']:>8}{stats['throughput_rps']:>10.1f}"
+              f"{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}")
+    rss = results["server_peak_rss_bytes"]
+    if rss is None:
+        print("\nServer RSS: unavailable (install psutil)")
+    else:
+        print(f"\nServer peak RSS: {rss / 1024 / 1024:.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=8, help="Concurrent client sessions (default: 8)")
+    parser.add_argument("--requests", type=int, default=100, help="Requests per session (default: 100)")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("call_tool=8,list_tools=1,get_prompt=1"),
+                        help="Weighted request mix (default: call_tool=8,list_tools=1,get_prompt=1)")
+    parser.add_argument("--transport", choices=["stdio", "http"], default="stdio",
+                        help="stdio launches one server per session; http shares one server (default: stdio)")
+    parser.add_argument("--url", help="Benchmark an already running HTTP server instead of launching one")
+    parser.add_argument("--server-pid", type=int, help="PID of the server given by --url, for RSS sampling")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the request mix (default: 0)")
+    parser.add_argument("--output", help="Write machine-readable results to this JSON file")
+    args = parser.parse_args()
+
+    if args.url:
+        results = asyncio.run(run_benchmark(args, args.url, args.server_pid))
+    elif args.transport == "http":
+        port = free_port()
+        with http_server(port) as process:
+            results = asyncio.run(run_benchmark(args, f"http://127.0.0.1:{port}/mcp", process.pid))
+    else:
+        results = asyncio.run(run_benchmark(args, None, None))
+
+    print_report(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Cold-start profile for the Simple MCP Server.
+
+Reports where import time goes when server.py starts (via python -X importtime),
+grouped by top-level package, and measures the end-to-end cold start a stdio
+client sees: process launch, imports, initialize handshake and the first
+list_tools response.
+
+Usage:
+    python benchmarks/startup_profile.py [--runs 5] [--top 15] [--output startup.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def import_profile() -> List[Dict[str, Any]]:
+    """Self and cumulative import time (us) of every module imported by server.py."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import server"],
+        cwd=SERVER_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = []
+    for line in completed.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append({
+                "module": name,
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": len(indent) // 2,
+            })
+    return modules
+
+
+def by_package(modules: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Total self import time (us) per top-level package, largest first."""
+    totals: Dict[str, int] = defaultdict(int)
+    for module in modules:
+        totals[module["module"].split(".")[0]] += module["self_us"]
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+async def cold_start() -> Dict[str, float]:
+    """Seconds from launching the server to its initialize and first list_tools replies."""
+    server_params = StdioServerParameters(command=sys.executable, args=["server.py"], cwd=SERVER_DIR)
+    start = time.perf_counter()
+    async with stdio_client(server_params) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            initialized = time.perf_counter() - start
+            await session.list_tools()
+            first_response = time.perf_counter() - start
+    return {"initialize_s": initialized, "first_list_tools_s": first_response}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts to measure (default: 5)")
+    parser.add_argument("--top", type=int, default=15, help="Modules/packages to list (default: 15)")
+    parser.add_argument("--output", help="Write machine-readable results to this JSON file")
+    args = parser.parse_args()
+
+    modules = import_profile()
+    packages = by_package(modules)
+    total_us = sum(module["self_us"] for module in modules)
+
+    print(f"=== Import time of server.py: {total_us / 1000:.1f} ms across {len(modules)} modules ===\n")
+    print("By top-level package (self time):")
+    for package, us in list(packages.items())[:args.top]:
+        print(f"   {package:32}{us / 1000:>9.1f} ms {us / total_us:>6.1%}")
+    print("\nSlowest modules (self time):")
+    for module in sorted(modules, key=lambda m: m["self_us"], reverse=True)[:args.top]:
+        print(f"   {module['module']:48}{module['self_us'] / 1000:>9.1f} ms")
+
+    runs = [asyncio.run(cold_start()) for _ in range(args.runs)]
+    initialize = statistics.median(run["initialize_s"] for run in runs)
+    first_response = statistics.median(run["first_list_tools_s"] for run in runs)
+    print(f"\nCold start over stdio (median of {args.runs}):")
+    print(f"   initialize:        {initialize * 1000:>8.1f} ms")
+    print(f"   first list_tools:  {first_response * 1000:>8.1f} ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "import_total_us": total_us,
+                "packages_us": packages,
+                "modules": modules,
+                "cold_start_runs": runs,
+                "cold_start_median_s": {"initialize": initialize, "first_list_tools": first_response},
+            }, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Tool plugin discovery and isolated worker processes for the Simple MCP Server.
+
+A plugin is a Python module with a module-level ``TOOLS`` list:
+
+    TOOLS = [
+        {
+            "name": "prime_factors",
+            "description": "Factorize an integer",
+            "input_schema": {"type": "object", "properties": {"n": {"type": "integer"}}},
+            "handler": "prime_factors",   # function in this module
+            "blocking": True,             # optional, plain function on the worker pool
+            "pure": True,                 # optional, memoize results
+            "isolated": True,             # optional, run in an isolated worker process
+            "timeout": 5.0,               # optional, seconds before an isolated call is killed (default 60)
+        },
+    ]
+
+Plugins are discovered from ``*.py`` files in a directory and from installed
+packages that declare a ``simple_mcp_server.tools`` entry point. Isolated
+handlers must be plain (non-async) functions; they run in a pool of worker
+processes, and a worker that times out or dies is replaced without affecting
+the server process.
+
+Worker processes import this module, so it keeps its imports light.
+"""
+
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import os
+import sys
+from typing import Any, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "simple_mcp_server.tools"
+# Seconds an isolated call may run when its tool sets no timeout
+DEFAULT_ISOLATED_TIMEOUT = 60.0
+
+
+class ToolTimeoutError(Exception):
+    """An isolated tool call exceeded its timeout and its worker was killed."""
+
+
+class WorkerCrashedError(Exception):
+    """An isolated worker process died while running a tool call."""
+
+
+def resolve_handler(handler: Any) -> Callable:
+    """Import a "module:function" handler reference; callables pass through."""
+    if not isinstance(handler, str):
+        return handler
+    module_name, _, attribute = handler.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def _tool_specs(module: Any) -> List[Dict[str, Any]]:
+    """Read a plugin module's TOOLS, turning handler names into "module:function" references."""
+    specs = []
+    for spec in getattr(module, "TOOLS", []):
+        spec = dict(spec)
+        handler = spec["handler"]
+        if isinstance(handler, str) and ":" not in handler:
+            spec["handler"] = f"{module.__name__}:{handler}"
+        specs.append(spec)
+    return specs
+
+
+def discover_plugins(directory: Optional[str] = None, entry_points: bool = True) -> List[Dict[str, Any]]:
+    """Collect tool specs from plugin modules in ``directory`` and from entry points.
+
+    The directory is added to ``sys.path`` so its modules are importable by
+    name, including from worker processes. A plugin that fails to import is
+    logged and skipped.
+    """
+    modules = []
+    if directory and os.path.isdir(directory):
+        if directory not in sys.path:
+            sys.path.insert(0, directory)
+        for filename in sorted(os.listdir(directory)):
+            if filename.endswith(".py") and not filename.startswith("_"):
+                modules.append(("file", os.path.join(directory, filename), filename[:-3]))
+    if entry_points:
+        from importlib.metadata import entry_points as installed_entry_points
+        for entry_point in installed_entry_points(group=ENTRY_POINT_GROUP):
+            modules.append(("entry point", entry_point.name, entry_point))
+
+    specs = []
+    for kind, source, target in modules:
+        try:
+            module = importlib.import_module(target) if isinstance(target, str) else target.load()
+            specs.extend(_tool_specs(module))
+        except Exception:
+            logger.exception("Failed to load tool plugin from %s %s", kind, source)
+    return specs
+
+
+def _worker_main(conn) -> None:
+    """Worker process loop: run (handler, arguments) requests until the pipe closes."""
+    handlers: Dict[str, Callable] = {}
+    while True:
+        try:
+            handler_ref, arguments = conn.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            handler = handlers.get(handler_ref)
+            if handler is None:
+                handler = handlers[handler_ref] = resolve_handler(handler_ref)
+            conn.send(("ok", handler(arguments)))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+class _Worker:
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def kill(self) -> None:
+        # The pipe is left to be closed on garbage collection: a thread may
+        # still be blocked in recv() on it and will see EOF once the process exits
+        self.process.kill()
+        self.process.join()
+
+
+class IsolatedToolPool:
+    """A pool of warm worker processes that can be killed per call.
+
+    Unlike a ProcessPoolExecutor, a call that overruns its timeout kills
+    only the worker running it, and a worker that crashes is replaced,
+    so a runaway tool can neither hang nor break the pool.
+    """
+
+    def __init__(self, size: int = 2, start_method: str = "spawn", default_timeout: float = DEFAULT_ISOLATED_TIMEOUT):
+        self.size = size
+        self.default_timeout = default_timeout
+        self._context = multiprocessing.get_context(start_method)
+        self._idle: List[_Worker] = []
+        # Every live worker, idle or running a call, so close() can kill them all
+        self._workers: Set[_Worker] = set()
+        self._count = 0
+        self._available: Optional[asyncio.Condition] = None
+
+    async def _acquire(self) -> _Worker:
+        if self._available is None:
+            self._available = asyncio.Condition()
+        async with self._available:
+            while not self._idle and self._count >= self.size:
+                await self._available.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._count += 1
+        try:
+            worker = await asyncio.get_running_loop().run_in_executor(None, _Worker, self._context)
+        except BaseException:
+            await self._release(None)
+            raise
+        self._workers.add(worker)
+        return worker
+
+    def _kill(self, worker: _Worker) -> None:
+        worker.kill()
+        self._workers.discard(worker)
+
+    async def _release(self, worker: Optional[_Worker]) -> None:
+        """Return a healthy worker to the pool, or free the slot of a dead one."""
+        async with self._available:
+            if worker is None:
+                self._count -= 1
+            else:
+                self._idle.append(worker)
+            self._available.notify()
+
+    async def call(self, handler_ref: str, arguments: Dict[str, Any], timeout: Optional[float] = None) -> Any:
+        """Run ``handler_ref(arguments)`` in a worker and return its result.
+
+        ``timeout`` defaults to the pool's ``default_timeout``.
+
+        Raises:
+            ToolTimeoutError: The call exceeded ``timeout`` seconds
+            WorkerCrashedError: The worker process died during the call
+            RuntimeError: The handler raised an exception
+        """
+        if timeout is None:
+            timeout = self.default_timeout
+        worker = await self._acquire()
+        loop = asyncio.get_running_loop()
+        try:
+            worker.conn.send((handler_ref, arguments))
+            status, payload = await asyncio.wait_for(loop.run_in_executor(None, worker.conn.recv), timeout)
+        except asyncio.TimeoutError:
+            self._kill(worker)
+            worker = None
+            raise ToolTimeoutError(f"timed out after {timeout}s")
+        except (EOFError, OSError):
+            self._kill(worker)
+            worker = None
+            raise WorkerCrashedError("worker process exited unexpectedly")
+        except BaseException:
+            # Cancelled mid-call: the worker's state is unknown, so discard it
+            self._kill(worker)
+            worker = None
+            raise
+        finally:
+            await self._release(worker)
+
+        if status == "error":
+            raise RuntimeError(payload)
+        return payload
+
+    def close(self) -> None:
+        """Kill all workers, failing the calls still running as crashed."""
+        for worker in list(self._workers):
+            self._kill(worker)
+        # Running calls free their own slots when they see their worker die
+        self._count -= len(self._idle)
+        self._idle.clear()
+
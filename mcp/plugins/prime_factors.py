@@ -0,0 +1,53 @@
+"""
+Example tool plugin: integer factorization.
+
+Trial division is CPU-bound and can take a long time for large inputs, so the
+tool runs isolated in a worker process with a timeout.
+"""
+
+from mcp.types import CallToolResult, TextContent
+
+
+def prime_factors(arguments):
+    n = int(arguments["n"])
+    if n < 2:
+        return CallToolResult(
+            content=[TextContent(type="text", text="Error: n must be at least 2")],
+            isError=True
+        )
+    
+    factors = []
+    divisor = 2
+    while divisor * divisor <= n:
+        while n % divisor == 0:
+            factors.append(divisor)
+            n //= divisor
+        divisor += 1
+    if n > 1:
+        factors.append(n)
+    
+    return CallToolResult(
+        content=[TextContent(type="text", text=f"Prime factors: {' x '.join(map(str, factors))}")]
+    )
+
+
+TOOLS = [
+    {
+        "name": "prime_factors",
+        "description": "Factorize an integer into primes",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "n": {
+                    "type": "integer",
+                    "description": "Integer to factorize (at least 2)"
+                }
+            },
+            "required": ["n"]
+        },
+        "handler": "prime_factors",
+        "pure": True,
+        "isolated": True,
+        "timeout": 5.0,
+    }
+]
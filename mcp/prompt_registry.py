@@ -0,0 +1,189 @@
+"""
+Prompt template registry for the Simple MCP Server.
+
+Prompts are defined in JSON files, one per prompt:
+
+    {
+      "name": "greeting",
+      "description": "Generate a greeting message",
+      "arguments": [
+        {"name": "name", "description": "Name of the person to greet", "required": true},
+        {"name": "language", "description": "Language for the greeting", "required": false}
+      ],
+      "select": "language",
+      "default": "English",
+      "templates": {
+        "English": "Hello, {name}! Welcome to the MCP server.",
+        "Japanese": "こんにちは、{name}さん！MCPサーバーへようこそ。"
+      }
+    }
+
+A prompt has either a single "template" or a "templates" mapping chosen by
+the value of the "select" argument (falling back to "default"). Templates use
+str.format-style {argument} placeholders, are validated against the declared
+arguments and compiled once at load time.
+"""
+
+import json
+import logging
+import os
+import string
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from mcp.types import (
+    GetPromptResult,
+    ListPromptsResult,
+    Prompt,
+    PromptArgument,
+    PromptMessage,
+    TextContent,
+)
+
+logger = logging.getLogger(__name__)
+
+# A compiled template: (literal text, argument name or None) pairs
+CompiledTemplate = Tuple[Tuple[str, Optional[str]], ...]
+
+
+def compile_template(template: str, allowed: List[str]) -> CompiledTemplate:
+    """Split a template into literal/argument pieces, checking every field is declared."""
+    pieces = []
+    for literal, field, format_spec, conversion in string.Formatter().parse(template):
+        if field is not None:
+            if format_spec or conversion or field not in allowed:
+                raise ValueError(f"Invalid placeholder {{{field}}}: only declared arguments are allowed")
+        pieces.append((literal, field))
+    return tuple(pieces)
+
+
+def render_template(template: CompiledTemplate, values: Dict[str, str]) -> str:
+    return "".join(literal + (values[field] if field is not None else "") for literal, field in template)
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """A prompt definition with its templates compiled."""
+    prompt: Prompt
+    templates: Dict[str, CompiledTemplate]
+    select: Optional[str] = None
+    default: str = ""
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "PromptTemplate":
+        arguments = [PromptArgument(**argument) for argument in data.get("arguments", [])]
+        names = [argument.name for argument in arguments]
+        prompt = Prompt(name=data["name"], description=data.get("description"), arguments=arguments)
+
+        select = data.get("select")
+        if select is None:
+            return cls(prompt, {"": compile_template(data["template"], names)})
+
+        if select not in names:
+            raise ValueError(f"select argument {select!r} is not declared")
+        templates = {key: compile_template(text, names) for key, text in data["templates"].items()}
+        default = data["default"]
+        if default not in templates:
+            raise ValueError(f"default template {default!r} is not defined")
+        return cls(prompt, templates, select, default)
+
+    def render(self, arguments: Optional[Dict[str, str]]) -> GetPromptResult:
+        """Validate the arguments and render the prompt."""
+        values = dict(arguments or {})
+        declared = self.prompt.arguments or []
+        missing = [argument.name for argument in declared if argument.required and argument.name not in values]
+        if missing:
+            raise ValueError(f"Missing required arguments for {self.prompt.name}: {', '.join(missing)}")
+        unknown = sorted(set(values) - {argument.name for argument in declared})
+        if unknown:
+            raise ValueError(f"Unknown arguments for {self.prompt.name}: {', '.join(unknown)}")
+        for argument in declared:
+            values.setdefault(argument.name, "")
+
+        if self.select is None:
+            template = self.templates[""]
+        else:
+            template = self.templates.get(values[self.select], self.templates[self.default])
+
+        return GetPromptResult(
+            description=self.prompt.description,
+            messages=[
+                PromptMessage(
+                    role="user",
+                    content=TextContent(type="text", text=render_template(template, values))
+                )
+            ]
+        )
+
+
+class PromptRegistry:
+    """Loads prompt templates from a directory and hot-reloads them on change.
+
+    Every ``reload_interval`` seconds (on the next request) the directory is
+    checked for added, removed or modified files. A file that fails to load
+    is logged and the previous version of the registry stays in use.
+    """
+
+    def __init__(self, directory: str, reload_interval: Optional[float] = 2.0):
+        self.directory = directory
+        self.reload_interval = reload_interval
+        # Bumped on every successful reload so cached renders can be keyed on it
+        self.generation = 0
+        self._prompts: Dict[str, PromptTemplate] = {}
+        self._list_result = ListPromptsResult(prompts=[])
+        self._mtimes: Dict[str, float] = {}
+        self._next_check = 0.0
+        self.reload()
+
+    def _scan(self) -> Dict[str, float]:
+        try:
+            entries = os.scandir(self.directory)
+        except FileNotFoundError:
+            return {}
+        with entries:
+            return {
+                entry.path: entry.stat().st_mtime
+                for entry in entries
+                if entry.is_file() and entry.name.endswith(".json")
+            }
+
+    def reload(self) -> bool:
+        """Reload all templates if any file changed; return True if reloaded."""
+        mtimes = self._scan()
+        self._next_check = time.monotonic() + (self.reload_interval or 0)
+        if mtimes == self._mtimes:
+            return False
+
+        prompts = {}
+        try:
+            for path in sorted(mtimes):
+                with open(path, encoding="utf-8") as f:
+                    template = PromptTemplate.from_dict(json.load(f))
+                prompts[template.prompt.name] = template
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            if self.generation == 0:
+                raise
+            logger.error("Failed to reload prompt templates from %s: %s", path, e)
+            # Remember the broken state so the error is not retried until files change again
+            self._mtimes = mtimes
+            return False
+
+        self._prompts = prompts
+        self._list_result = ListPromptsResult(prompts=[template.prompt for template in prompts.values()])
+        self._mtimes = mtimes
+        self.generation += 1
+        return True
+
+    def maybe_reload(self) -> None:
+        """Reload if hot reload is enabled and the check interval has passed."""
+        if self.reload_interval is not None and time.monotonic() >= self._next_check:
+            self.reload()
+
+    def list_prompts(self) -> ListPromptsResult:
+        self.maybe_reload()
+        return self._list_result
+
+    def get(self, name: str) -> Optional[PromptTemplate]:
+        self.maybe_reload()
+        return self._prompts.get(name)
@@ -3,9 +3,19 @@
 Simple MCP (Model Context Protocol) Server Implementation
 """
 
+import argparse
 import asyncio
+import bisect
+import contextlib
 import json
-from typing import Any, Dict, List, Optional
+import logging
+import operator
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor
+from dataclasses import dataclass, field, replace
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple, Union
 
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
@@ -13,229 +23,913 @@ from mcp.types import (
     Tool,
     TextContent,
     CallToolResult,
+    ListToolsResult,
+    ListPromptsResult,
     GetPromptResult,
-    Prompt,
     PromptMessage,
-    PromptArgument,
 )
 
+from plugin_loader import (
+    DEFAULT_ISOLATED_TIMEOUT,
+    IsolatedToolPool,
+    ToolTimeoutError,
+    WorkerCrashedError,
+    discover_plugins,
+    resolve_handler,
+)
+from prompt_registry import PromptRegistry, PromptTemplate
+
+logger = logging.getLogger(__name__)
+
+
+AsyncToolHandler = Callable[[Dict[str, Any]], Awaitable[CallToolResult]]
+BlockingToolHandler = Callable[[Dict[str, Any]], CallToolResult]
+ToolHandler = Union[AsyncToolHandler, BlockingToolHandler]
+# Handlers may also be given as "module:function" and are imported on first call
+LazyToolHandler = Union[ToolHandler, str]
+
+PROMPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prompts")
+PLUGINS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "plugins")
+
+EXECUTORS = ("thread", "process")
+
+OPERATIONS: Dict[str, Callable[[float, float], float]] = {
+    "add": operator.add,
+    "subtract": operator.sub,
+    "multiply": operator.mul,
+    "divide": operator.truediv,
+}
+
+
+@dataclass(frozen=True)
+class RegisteredTool:
+    """A tool definition paired with the callable that implements it.
+    
+    Blocking handlers are plain functions that run on the server's worker
+    pool and isolated handlers are plain functions that run in a killable
+    worker process; all others are coroutines awaited on the event loop.
+    
+    ``ungated`` marks loaded inline handlers of pure tools: they only
+    compute a result from their arguments, so calls skip the concurrency gate.
+    """
+    definition: Tool
+    handler: LazyToolHandler
+    blocking: bool = False
+    pure: bool = False
+    isolated: bool = False
+    timeout: Optional[float] = None
+    ungated: bool = field(init=False, default=False)
+    
+    def __post_init__(self):
+        ungated = self.pure and not (self.blocking or self.isolated or isinstance(self.handler, str))
+        object.__setattr__(self, "ungated", ungated)
+
+
+# Argument value types that can be part of a tuple cache key as they are
+SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+class ResultCache:
+    """LRU cache with an optional TTL for results of pure tools and prompts.
+    
+    Keys are canonical (kind, name, arguments), so argument order does not
+    matter: sorted tuples for flat arguments, JSON for nested ones.
+    Arguments that cannot be serialized are never cached.
+    """
+    
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[Optional[float], Any]]" = OrderedDict()
+    
+    @staticmethod
+    def make_key(kind: str, name: str, arguments: Optional[Dict[str, Any]]) -> Optional[Hashable]:
+        """Canonicalize a request into a cache key, or None if not cacheable."""
+        # Flat arguments (the common case) get a tuple key, which is much
+        # cheaper to build than JSON; the value's type keeps 1, 1.0 and True apart
+        if arguments is None or all(type(value) in SCALAR_TYPES for value in arguments.values()):
+            return (kind, name, tuple(sorted((key, type(value), value) for key, value in (arguments or {}).items())))
+        try:
+            return json.dumps([kind, name, arguments or {}], sort_keys=True, separators=(",", ":"))
+        except (TypeError, ValueError):
+            return None
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for ``key``, counting the hit or miss."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at is None or time.monotonic() < expires_at:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+        self.misses += 1
+        return None
+    
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and occupancy."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+        }
+
+
+# Latency histogram bucket upper bounds in seconds (Prometheus defaults)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class LatencyHistogram:
+    """Cumulative-friendly latency histogram with an error counter."""
+    
+    def __init__(self):
+        # One slot per bucket plus a final +Inf slot
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.errors = 0
+    
+    def observe(self, seconds: float, is_error: bool = False) -> None:
+        self.bucket_counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if is_error:
+            self.errors += 1
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (None if unbounded or empty)."""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for bound, bucket_count in zip(LATENCY_BUCKETS, self.bucket_counts):
+            seen += bucket_count
+            if seen >= target:
+                return bound
+        return None
+    
+    def summary(self) -> Dict[str, Any]:
+        def ms(seconds):
+            return seconds * 1000 if seconds is not None else None
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": ms(self.total / self.count) if self.count else None,
+            "p50_ms": ms(self.quantile(0.5)),
+            "p95_ms": ms(self.quantile(0.95)),
+            "p99_ms": ms(self.quantile(0.99)),
+        }
+
+
+class ServerMetrics:
+    """Per-tool and per-prompt latency/error histograms plus in-flight requests."""
+    
+    def __init__(self):
+        self.in_flight = 0
+        self.tools: Dict[str, LatencyHistogram] = {}
+        self.prompts: Dict[str, LatencyHistogram] = {}
+    
+    def observe_tool(self, name: str, seconds: float, is_error: bool) -> None:
+        histogram = self.tools.get(name)
+        if histogram is None:
+            histogram = self.tools[name] = LatencyHistogram()
+        histogram.observe(seconds, is_error)
+    
+    def observe_prompt(self, name: str, seconds: float, is_error: bool = False) -> None:
+        histogram = self.prompts.get(name)
+        if histogram is None:
+            histogram = self.prompts[name] = LatencyHistogram()
+        histogram.observe(seconds, is_error)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serializable summary of all metrics."""
+        return {
+            "in_flight": self.in_flight,
+            "tools": {name: h.summary() for name, h in sorted(self.tools.items())},
+            "prompts": {name: h.summary() for name, h in sorted(self.prompts.items())},
+        }
+    
+    def to_prometheus(self, cache: Optional[ResultCache] = None) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP mcp_requests_in_flight Tool calls and prompt renders currently executing.",
+            "# TYPE mcp_requests_in_flight gauge",
+            f"mcp_requests_in_flight {self.in_flight}",
+        ]
+        for kind, histograms in (("tool", self.tools), ("prompt", self.prompts)):
+            metric = f"mcp_{kind}_duration_seconds"
+            lines.append(f"# HELP {metric} Latency of {kind} requests.")
+            lines.append(f"# TYPE {metric} histogram")
+            for name, histogram in sorted(histograms.items()):
+                label = f'{kind}="{_escape_label(name)}"'
+                cumulative = 0
+                for bound, bucket_count in zip(LATENCY_BUCKETS, histogram.bucket_counts):
+                    cumulative += bucket_count
+                    lines.append(f'{metric}_bucket{{{label},le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{{label},le="+Inf"}} {histogram.count}')
+                lines.append(f"{metric}_sum{{{label}}} {histogram.total}")
+                lines.append(f"{metric}_count{{{label}}} {histogram.count}")
+            lines.append(f"# HELP mcp_{kind}_errors_total {kind.capitalize()} requests that returned an error.")
+            lines.append(f"# TYPE mcp_{kind}_errors_total counter")
+            for name, histogram in sorted(histograms.items()):
+                lines.append(f'mcp_{kind}_errors_total{{{kind}="{_escape_label(name)}"}} {histogram.errors}')
+        if cache is not None:
+            stats = cache.stats()
+            lines += [
+                "# HELP mcp_cache_hits_total Result cache hits.",
+                "# TYPE mcp_cache_hits_total counter",
+                f"mcp_cache_hits_total {stats['hits']}",
+                "# HELP mcp_cache_misses_total Result cache misses.",
+                "# TYPE mcp_cache_misses_total counter",
+                f"mcp_cache_misses_total {stats['misses']}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _make_executor(kind: str, max_workers: Optional[int]) -> Executor:
+    """Create the worker pool, importing the process pool machinery only if used."""
+    if kind == "process":
+        from concurrent.futures import ProcessPoolExecutor
+        return ProcessPoolExecutor(max_workers=max_workers)
+    from concurrent.futures import ThreadPoolExecutor
+    return ThreadPoolExecutor(max_workers=max_workers)
+
+
+def _text_result(text: str, is_error: bool = False) -> CallToolResult:
+    """Build a single-text-block tool result."""
+    return CallToolResult(
+        content=[TextContent(type="text", text=text)],
+        isError=is_error
+    )
+
+
+def calculate_batch(arguments: Dict[str, Any]) -> CallToolResult:
+    """Evaluate many arithmetic operations in a single vectorized pass.
+    
+    ``a`` and ``b`` are equal-length arrays; ``operation`` is either one
+    operation applied to every pair or an array of operations, one per pair.
+    Element failures (division by zero, unknown operation, non-finite
+    result) are reported per index and do not fail the whole call.
+    
+    Module-level so it can be pickled for the process worker pool.
+    """
+    import numpy as np
+    
+    try:
+        a = np.asarray(arguments["a"], dtype=float)
+        b = np.asarray(arguments["b"], dtype=float)
+        operation = arguments["operation"]
+        if a.ndim != 1 or a.shape != b.shape:
+            return _text_result("Error: a and b must be arrays of the same length", is_error=True)
+        if isinstance(operation, str):
+            operations = np.full(a.shape, operation, dtype=object)
+        else:
+            operations = np.asarray(operation, dtype=object)
+            if operations.shape != a.shape:
+                return _text_result("Error: operation must be a string or an array as long as a and b", is_error=True)
+    except Exception as e:
+        return _text_result(f"Error: {str(e)}", is_error=True)
+    
+    ufuncs = {
+        "add": np.add,
+        "subtract": np.subtract,
+        "multiply": np.multiply,
+        "divide": np.divide,
+    }
+    results = np.full(a.shape, np.nan)
+    with np.errstate(all="ignore"):
+        for name, ufunc in ufuncs.items():
+            mask = operations == name
+            if mask.any():
+                results[mask] = ufunc(a[mask], b[mask])
+    
+    unknown = ~np.isin(operations, list(ufuncs))
+    division_by_zero = (operations == "divide") & (b == 0)
+    not_finite = ~np.isfinite(results) & ~unknown & ~division_by_zero
+    
+    values: List[Optional[float]] = results.tolist()
+    errors = []
+    for mask, message in (
+        (unknown, "Unknown operation"),
+        (division_by_zero, "Division by zero"),
+        (not_finite, "Result is not finite"),
+    ):
+        for index in np.flatnonzero(mask).tolist():
+            values[index] = None
+            errors.append({"index": index, "error": message})
+    errors.sort(key=lambda error: error["index"])
+    
+    return _text_result(json.dumps({"results": values, "errors": errors}))
+
 
 class SimpleMCPServer:
     """A simple MCP server with basic tools and prompts."""
     
-    def __init__(self):
+    def __init__(
+        self,
+        max_concurrent_calls: int = 32,
+        executor: str = "thread",
+        max_workers: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+        cache_size: int = 1024,
+        cache_ttl: Optional[float] = None,
+        metrics_file: Optional[str] = None,
+        metrics_interval: float = 15.0,
+        prompts_dir: str = PROMPTS_DIR,
+        prompts_reload_interval: Optional[float] = 2.0,
+        plugins_dir: Optional[str] = PLUGINS_DIR,
+        plugin_entry_points: bool = True,
+        isolated_workers: int = 2,
+        isolated_timeout: float = DEFAULT_ISOLATED_TIMEOUT,
+    ):
+        """Initialize the server.
+        
+        Args:
+            max_concurrent_calls: Maximum number of call_tool requests executing
+                at once. Further calls wait for a free slot; list_tools,
+                get_prompt and inline pure tools are never gated.
+            executor: Worker pool for blocking tools, "thread" or "process".
+                Handlers for a process pool must be picklable module-level
+                functions.
+            max_workers: Size of the worker pool (executor default if None)
+            queue_timeout: Seconds a call may wait for a free slot before it
+                is rejected as busy (wait indefinitely if None)
+            cache_size: Maximum number of memoized results of pure tools and
+                prompts (0 disables caching)
+            cache_ttl: Seconds a memoized result stays valid (forever if None)
+            metrics_file: Path to periodically write Prometheus-format metrics
+                to while the server runs (disabled if None)
+            metrics_interval: Seconds between metrics file writes
+            prompts_dir: Directory of JSON prompt templates
+            prompts_reload_interval: Seconds between checks of prompts_dir for
+                changed templates (hot reload disabled if None)
+            plugins_dir: Directory of tool plugin modules (none loaded if None)
+            plugin_entry_points: Also load plugins from installed packages'
+                ``simple_mcp_server.tools`` entry points
+            isolated_workers: Number of worker processes for isolated tools
+            isolated_timeout: Seconds before a call to an isolated tool
+                without its own timeout is killed
+        """
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unknown executor: {executor} (expected one of {', '.join(EXECUTORS)})")
         self.server = Server("simple-mcp-server")
+        self._tools: Dict[str, RegisteredTool] = {}
+        self._list_tools_result: Optional[ListToolsResult] = None
+        self._call_slots = asyncio.Semaphore(max_concurrent_calls)
+        self._queue_timeout = queue_timeout
+        # Created on the first blocking call so sessions that never need it start faster
+        self._executor_kind = executor
+        self._max_workers = max_workers
+        self._executor: Optional[Executor] = None
+        self._isolated_pool = IsolatedToolPool(isolated_workers, default_timeout=isolated_timeout)
+        self.cache: Optional[ResultCache] = ResultCache(cache_size, cache_ttl) if cache_size > 0 else None
+        self.prompts = PromptRegistry(prompts_dir, prompts_reload_interval)
+        self.metrics = ServerMetrics()
+        self._metrics_file = metrics_file
+        self._metrics_interval = metrics_interval
+        self._register_builtin_tools()
+        self.load_plugins(plugins_dir, plugin_entry_points)
         self._setup_tools()
         self._setup_prompts()
     
-    def _setup_tools(self):
-        """Register available tools."""
+    def register_tool(
+        self,
+        name: str,
+        description: str,
+        input_schema: Dict[str, Any],
+        handler: LazyToolHandler,
+        blocking: bool = False,
+        pure: bool = False,
+        isolated: bool = False,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """Register a tool once; dispatch and listing read from the registry.
         
-        @self.server.list_tools()
-        async def list_tools() -> List[Tool]:
-            return [
-                Tool(
-                    name="calculate",
-                    description="Perform basic arithmetic calculations",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "operation": {
-                                "type": "string",
-                                "enum": ["add", "subtract", "multiply", "divide"],
-                                "description": "The arithmetic operation to perform"
-                            },
-                            "a": {
-                                "type": "number",
-                                "description": "First number"
-                            },
-                            "b": {
-                                "type": "number",
-                                "description": "Second number"
-                            }
-                        },
-                        "required": ["operation", "a", "b"]
+        Set ``blocking`` for synchronous, CPU-bound handlers so they run on
+        the worker pool instead of stalling the event loop. Set ``pure`` only
+        when the result depends solely on the arguments; pure results are
+        memoized, everything else (e.g. get_time) is always executed.
+        
+        ``handler`` may be a "module:function" string; the module is then
+        imported on the tool's first call rather than at server startup.
+        
+        Set ``isolated`` for heavy or untrusted synchronous handlers: each
+        call runs in a pooled worker process that is killed if it exceeds
+        ``timeout`` seconds, and a crash only takes down that worker.
+        """
+        self._tools[name] = RegisteredTool(
+            definition=Tool(name=name, description=description, inputSchema=input_schema),
+            handler=handler,
+            blocking=blocking,
+            pure=pure,
+            isolated=isolated,
+            timeout=timeout,
+        )
+        # Invalidate the precomputed listing so it is rebuilt on next request
+        self._list_tools_result = None
+    
+    def _register_builtin_tools(self):
+        """Register the built-in tools."""
+        self.register_tool(
+            "calculate",
+            "Perform basic arithmetic calculations",
+            {
+                "type": "object",
+                "properties": {
+                    "operation": {
+                        "type": "string",
+                        "enum": list(OPERATIONS),
+                        "description": "The arithmetic operation to perform"
+                    },
+                    "a": {
+                        "type": "number",
+                        "description": "First number"
+                    },
+                    "b": {
+                        "type": "number",
+                        "description": "Second number"
                     }
-                ),
-                Tool(
-                    name="echo",
-                    description="Echo back the provided message",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "message": {
-                                "type": "string",
-                                "description": "Message to echo back"
-                            }
-                        },
-                        "required": ["message"]
+                },
+                "required": ["operation", "a", "b"]
+            },
+            self._calculate,
+            pure=True,
+        )
+        self.register_tool(
+            "calculate_batch",
+            "Perform many arithmetic calculations in one call",
+            {
+                "type": "object",
+                "properties": {
+                    "operation": {
+                        "oneOf": [
+                            {"type": "string", "enum": list(OPERATIONS)},
+                            {"type": "array", "items": {"type": "string", "enum": list(OPERATIONS)}}
+                        ],
+                        "description": "One operation for every pair, or one operation per pair"
+                    },
+                    "a": {
+                        "type": "array",
+                        "items": {"type": "number"},
+                        "description": "First operands"
+                    },
+                    "b": {
+                        "type": "array",
+                        "items": {"type": "number"},
+                        "description": "Second operands, same length as a"
                     }
-                ),
-                Tool(
-                    name="get_time",
-                    description="Get the current time",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {}
+                },
+                "required": ["operation", "a", "b"]
+            },
+            calculate_batch,
+            blocking=True,
+            pure=True,
+        )
+        self.register_tool(
+            "echo",
+            "Echo back the provided message",
+            {
+                "type": "object",
+                "properties": {
+                    "message": {
+                        "type": "string",
+                        "description": "Message to echo back"
                     }
-                )
-            ]
+                },
+                "required": ["message"]
+            },
+            self._echo,
+            pure=True,
+        )
+        self.register_tool(
+            "get_time",
+            "Get the current time",
+            {
+                "type": "object",
+                "properties": {}
+            },
+            self._get_time,
+        )
+        self.register_tool(
+            "server_stats",
+            "Get per-tool and per-prompt latency, error counts and in-flight requests",
+            {
+                "type": "object",
+                "properties": {}
+            },
+            self._server_stats,
+        )
+    
+    def load_plugins(self, directory: Optional[str], entry_points: bool = True) -> None:
+        """Register the tools declared by plugin modules (see plugin_loader)."""
+        for spec in discover_plugins(directory, entry_points):
+            if spec["name"] in self._tools:
+                logger.warning("Plugin tool %s is already registered; skipping", spec["name"])
+                continue
+            self.register_tool(
+                spec["name"],
+                spec.get("description", ""),
+                spec.get("input_schema", {"type": "object", "properties": {}}),
+                spec["handler"],
+                blocking=spec.get("blocking", False),
+                pure=spec.get("pure", False),
+                isolated=spec.get("isolated", False),
+                timeout=spec.get("timeout"),
+            )
+    
+    def list_tools(self) -> ListToolsResult:
+        """Return the precomputed tool listing, building it on first use."""
+        if self._list_tools_result is None:
+            self._list_tools_result = ListToolsResult(
+                tools=[tool.definition for tool in self._tools.values()]
+            )
+        return self._list_tools_result
+    
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> CallToolResult:
+        """Dispatch a tool call, recording its latency and outcome."""
+        tool = self._tools.get(name)
+        if tool is None:
+            return _text_result(f"Unknown tool: {name}", is_error=True)
+        
+        start = time.perf_counter()
+        self.metrics.in_flight += 1
+        is_error = True
+        try:
+            if tool.ungated and self.cache is None:
+                result = await tool.handler(arguments)
+            else:
+                result = await self._dispatch_tool(tool, arguments)
+            is_error = bool(result.isError)
+            return result
+        finally:
+            self.metrics.in_flight -= 1
+            self.metrics.observe_tool(name, time.perf_counter() - start, is_error)
+    
+    async def _dispatch_tool(self, tool: RegisteredTool, arguments: Dict[str, Any]) -> CallToolResult:
+        """Dispatch a tool call through the registry.
+        
+        Results of pure tools are served from the cache when possible. At
+        most ``max_concurrent_calls`` gated calls execute at once; the rest
+        wait for a slot, which applies backpressure without blocking other
+        request types.
+        """
+        name = tool.definition.name
+        key = None
+        if tool.pure and self.cache is not None:
+            key = ResultCache.make_key("tool", name, arguments)
+            if key is not None:
+                cached = self.cache.get(key)
+                if cached is not None:
+                    return cached
+        
+        if tool.ungated:
+            result = await tool.handler(arguments)
+            if key is not None:
+                self.cache.put(key, result)
+            return result
+        
+        # A free slot is taken without suspending, so only a full server pays for wait_for
+        if self._queue_timeout is None or not self._call_slots.locked():
+            await self._call_slots.acquire()
+        else:
+            try:
+                await asyncio.wait_for(self._call_slots.acquire(), self._queue_timeout)
+            except asyncio.TimeoutError:
+                return _text_result(f"Server busy: {name} was not started", is_error=True)
+        try:
+            result = await self._execute_tool(tool, arguments)
+        finally:
+            self._call_slots.release()
+        
+        if key is not None:
+            self.cache.put(key, result)
+        return result
+    
+    def _execute_tool(self, tool: RegisteredTool, arguments: Dict[str, Any]) -> Awaitable[CallToolResult]:
+        """Start a tool handler in an isolated worker, on the worker pool, or inline.
+        
+        Returns the handler's awaitable rather than awaiting it, which saves
+        a coroutine frame on every call.
+        """
+        if tool.isolated:
+            return self._execute_isolated(tool, arguments)
+        if isinstance(tool.handler, str):
+            tool = replace(tool, handler=resolve_handler(tool.handler))
+            self._tools[tool.definition.name] = tool
+        if tool.blocking:
+            if self._executor is None:
+                self._executor = _make_executor(self._executor_kind, self._max_workers)
+            loop = asyncio.get_running_loop()
+            return loop.run_in_executor(self._executor, tool.handler, arguments)
+        return tool.handler(arguments)
+    
+    async def _execute_isolated(self, tool: RegisteredTool, arguments: Dict[str, Any]) -> CallToolResult:
+        """Run a tool in the isolated worker pool, converting failures into error results."""
+        name = tool.definition.name
+        try:
+            return await self._isolated_pool.call(tool.handler, arguments, tool.timeout)
+        except ToolTimeoutError as e:
+            return _text_result(f"Error: {name} {e}", is_error=True)
+        except WorkerCrashedError:
+            return _text_result(f"Error: {name} crashed its worker process", is_error=True)
+        except RuntimeError as e:
+            return _text_result(f"Error: {str(e)}", is_error=True)
+    
+    def _setup_tools(self):
+        """Wire the tool registry into the MCP server."""
+        
+        @self.server.list_tools()
+        async def list_tools() -> ListToolsResult:
+            return self.list_tools()
         
         @self.server.call_tool()
-        async def call_tool(name: str, arguments: Dict[str, Any]) -> List[CallToolResult]:
-            if name == "calculate":
-                try:
-                    operation = arguments["operation"]
-                    a = float(arguments["a"])
-                    b = float(arguments["b"])
-                    
-                    if operation == "add":
-                        result = a + b
-                    elif operation == "subtract":
-                        result = a - b
-                    elif operation == "multiply":
-                        result = a * b
-                    elif operation == "divide":
-                        if b == 0:
-                            return [CallToolResult(
-                                content=[TextContent(type="text", text="Error: Division by zero")],
-                                isError=True
-                            )]
-                        result = a / b
-                    else:
-                        return [CallToolResult(
-                            content=[TextContent(type="text", text=f"Unknown operation: {operation}")],
-                            isError=True
-                        )]
-                    
-                    return [CallToolResult(
-                        content=[TextContent(type="text", text=f"Result: {result}")]
-                    )]
-                except Exception as e:
-                    return [CallToolResult(
-                        content=[TextContent(type="text", text=f"Error: {str(e)}")],
-                        isError=True
-                    )]
-            
-            elif name == "echo":
-                message = arguments.get("message", "")
-                return [CallToolResult(
-                    content=[TextContent(type="text", text=f"Echo: {message}")]
-                )]
+        async def call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResult:
+            return await self.call_tool(name, arguments)
+    
+    async def _calculate(self, arguments: Dict[str, Any]) -> CallToolResult:
+        try:
+            operation = arguments["operation"]
+            a = float(arguments["a"])
+            b = float(arguments["b"])
             
-            elif name == "get_time":
-                from datetime import datetime
-                current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                return [CallToolResult(
-                    content=[TextContent(type="text", text=f"Current time: {current_time}")]
-                )]
+            func = OPERATIONS.get(operation)
+            if func is None:
+                return _text_result(f"Unknown operation: {operation}", is_error=True)
+            if operation == "divide" and b == 0:
+                return _text_result("Error: Division by zero", is_error=True)
             
-            else:
-                return [CallToolResult(
-                    content=[TextContent(type="text", text=f"Unknown tool: {name}")],
-                    isError=True
-                )]
+            return _text_result(f"Result: {func(a, b)}")
+        except Exception as e:
+            return _text_result(f"Error: {str(e)}", is_error=True)
+    
+    async def _echo(self, arguments: Dict[str, Any]) -> CallToolResult:
+        message = arguments.get("message", "")
+        return _text_result(f"Echo: {message}")
+    
+    async def _get_time(self, arguments: Dict[str, Any]) -> CallToolResult:
+        from datetime import datetime
+        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        return _text_result(f"Current time: {current_time}")
+    
+    async def _server_stats(self, arguments: Dict[str, Any]) -> CallToolResult:
+        stats = self.metrics.snapshot()
+        stats["cache"] = self.cache.stats() if self.cache else None
+        return _text_result(json.dumps(stats))
     
     def _setup_prompts(self):
-        """Register available prompts."""
+        """Wire the prompt registry into the MCP server."""
         
         @self.server.list_prompts()
-        async def list_prompts() -> List[Prompt]:
-            return [
-                Prompt(
-                    name="greeting",
-                    description="Generate a greeting message",
-                    arguments=[
-                        PromptArgument(
-                            name="name",
-                            description="Name of the person to greet",
-                            required=True
-                        ),
-                        PromptArgument(
-                            name="language",
-                            description="Language for the greeting (default: English)",
-                            required=False
-                        )
-                    ]
-                ),
-                Prompt(
-                    name="math_problem",
-                    description="Generate a math problem explanation",
-                    arguments=[
-                        PromptArgument(
-                            name="difficulty",
-                            description="Difficulty level: easy, medium, hard",
-                            required=True
-                        )
-                    ]
-                )
-            ]
+        async def list_prompts() -> ListPromptsResult:
+            return self.prompts.list_prompts()
         
         @self.server.get_prompt()
         async def get_prompt(name: str, arguments: Optional[Dict[str, str]] = None) -> GetPromptResult:
-            if name == "greeting":
-                name_arg = arguments.get("name", "World") if arguments else "World"
-                language = arguments.get("language", "English") if arguments else "English"
-                
-                greetings = {
-                    "English": f"Hello, {name_arg}! Welcome to the MCP server.",
-                    "Japanese": f"こんにちは、{name_arg}さん！MCPサーバーへようこそ。",
-                    "Spanish": f"¡Hola, {name_arg}! Bienvenido al servidor MCP.",
-                    "French": f"Bonjour, {name_arg}! Bienvenue sur le serveur MCP."
-                }
-                
-                message = greetings.get(language, greetings["English"])
-                
-                return GetPromptResult(
-                    messages=[
-                        PromptMessage(
-                            role="user",
-                            content=TextContent(type="text", text=message)
-                        )
-                    ]
-                )
-            
-            elif name == "math_problem":
-                difficulty = arguments.get("difficulty", "easy") if arguments else "easy"
-                
-                problems = {
-                    "easy": "What is 2 + 2?",
-                    "medium": "Solve for x: 3x + 7 = 22",
-                    "hard": "Find the derivative of f(x) = x³ - 4x² + 2x - 8"
-                }
-                
-                problem = problems.get(difficulty, problems["easy"])
-                
-                return GetPromptResult(
-                    messages=[
-                        PromptMessage(
-                            role="user",
-                            content=TextContent(type="text", text=f"Please solve this math problem: {problem}")
-                        )
-                    ]
-                )
-            
-            else:
-                return GetPromptResult(
-                    messages=[
-                        PromptMessage(
-                            role="user",
-                            content=TextContent(type="text", text=f"Unknown prompt: {name}")
-                        )
-                    ]
-                )
+            return self.get_prompt(name, arguments)
+    
+    def get_prompt(self, name: str, arguments: Optional[Dict[str, str]] = None) -> GetPromptResult:
+        """Render a prompt, recording its latency.
+        
+        Raises:
+            ValueError: If the arguments do not match the prompt's declared arguments
+        """
+        template = self.prompts.get(name)
+        if template is None:
+            return GetPromptResult(
+                messages=[
+                    PromptMessage(
+                        role="user",
+                        content=TextContent(type="text", text=f"Unknown prompt: {name}")
+                    )
+                ]
+            )
+        
+        start = time.perf_counter()
+        self.metrics.in_flight += 1
+        is_error = True
+        try:
+            result = self._render_prompt(template, arguments)
+            is_error = False
+            return result
+        finally:
+            self.metrics.in_flight -= 1
+            self.metrics.observe_prompt(name, time.perf_counter() - start, is_error)
+    
+    def _render_prompt(self, template: PromptTemplate, arguments: Optional[Dict[str, str]]) -> GetPromptResult:
+        """Render a template prompt, serving it from the cache when possible."""
+        # Templates are pure; keying on the registry generation drops stale renders after a reload
+        kind = f"prompt:{self.prompts.generation}"
+        key = ResultCache.make_key(kind, template.prompt.name, arguments) if self.cache else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        result = template.render(arguments)
+        if key is not None:
+            self.cache.put(key, result)
+        return result
+    
+    def write_metrics(self, path: str) -> None:
+        """Atomically write the Prometheus-format metrics to ``path``."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.metrics.to_prometheus(self.cache))
+        os.replace(tmp_path, path)
+    
+    @contextlib.asynccontextmanager
+    async def _metrics_writer(self):
+        """Write the metrics file every ``metrics_interval`` seconds while serving."""
+        if self._metrics_file is None:
+            yield
+            return
+        
+        async def write_periodically():
+            while True:
+                await asyncio.sleep(self._metrics_interval)
+                self.write_metrics(self._metrics_file)
+        
+        task = asyncio.create_task(write_periodically())
+        try:
+            yield
+        finally:
+            task.cancel()
+            self.write_metrics(self._metrics_file)
+    
+    def close(self):
+        """Shut down the worker pools."""
+        self._isolated_pool.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
     
     async def run(self):
-        """Run the MCP server."""
-        async with stdio_server() as (read_stream, write_stream):
-            await self.server.run(read_stream, write_stream, self.server.create_initialization_options())
+        """Run the MCP server over stdio."""
+        try:
+            async with self._metrics_writer(), stdio_server() as (read_stream, write_stream):
+                await self.server.run(read_stream, write_stream, self.server.create_initialization_options())
+        finally:
+            self.close()
+    
+    def http_app(self, path: str = "/mcp", json_response: bool = False):
+        """Build an ASGI app serving the Streamable HTTP transport at ``path``.
+        
+        Responses stream over SSE unless ``json_response`` is set.
+        """
+        from starlette.applications import Starlette
+        from starlette.routing import Route
+        from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+        
+        session_manager = StreamableHTTPSessionManager(app=self.server, json_response=json_response)
+        
+        class StreamableHTTPEndpoint:
+            """ASGI endpoint forwarding requests to the session manager."""
+            
+            async def __call__(self, scope, receive, send):
+                await session_manager.handle_request(scope, receive, send)
+        
+        @contextlib.asynccontextmanager
+        async def lifespan(app):
+            async with session_manager.run():
+                yield
+        
+        return Starlette(routes=[Route(path, endpoint=StreamableHTTPEndpoint())], lifespan=lifespan)
+    
+    async def run_http(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        path: str = "/mcp",
+        json_response: bool = False,
+        keep_alive: int = 75,
+    ):
+        """Run the MCP server over Streamable HTTP.
+        
+        One long-lived process serves every client, so clients skip the
+        interpreter startup and imports that a stdio launch costs.
+        
+        Args:
+            host: Interface to bind (localhost by default)
+            port: TCP port to listen on
+            path: URL path of the MCP endpoint
+            json_response: Return plain JSON responses instead of SSE streams
+            keep_alive: Seconds idle HTTP connections are kept open for reuse
+        """
+        import uvicorn
+        
+        config = uvicorn.Config(
+            self.http_app(path, json_response),
+            host=host,
+            port=port,
+            timeout_keep_alive=keep_alive,
+            log_level="warning",
+        )
+        try:
+            async with self._metrics_writer():
+                await uvicorn.Server(config).serve()
+        finally:
+            self.close()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Simple MCP server")
+    parser.add_argument("--transport", choices=["stdio", "http"], default="stdio",
+                        help="Transport to serve (default: stdio)")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="HTTP bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000,
+                        help="HTTP port (default: 8000)")
+    parser.add_argument("--path", default="/mcp",
+                        help="HTTP endpoint path (default: /mcp)")
+    parser.add_argument("--json-response", action="store_true",
+                        help="Return JSON responses instead of SSE streams over HTTP")
+    parser.add_argument("--keep-alive", type=int, default=75,
+                        help="HTTP keep-alive timeout in seconds (default: 75)")
+    parser.add_argument("--max-concurrent-calls", type=int, default=32,
+                        help="Maximum tool calls executing at once (default: 32)")
+    parser.add_argument("--executor", choices=EXECUTORS, default="thread",
+                        help="Worker pool for blocking tools (default: thread)")
+    parser.add_argument("--max-workers", type=int, default=None,
+                        help="Worker pool size (default: executor default)")
+    parser.add_argument("--queue-timeout", type=float, default=None,
+                        help="Seconds a tool call may wait for a slot before being rejected")
+    parser.add_argument("--cache-size", type=int, default=1024,
+                        help="Memoized results of pure tools and prompts, 0 to disable (default: 1024)")
+    parser.add_argument("--cache-ttl", type=float, default=None,
+                        help="Seconds a memoized result stays valid (default: no expiry)")
+    parser.add_argument("--plugins-dir", default=PLUGINS_DIR,
+                        help="Directory of tool plugin modules (default: plugins/ next to server.py)")
+    parser.add_argument("--no-plugin-entry-points", action="store_true",
+                        help="Do not load tool plugins from installed packages' entry points")
+    parser.add_argument("--isolated-workers", type=int, default=2,
+                        help="Worker processes for isolated plugin tools (default: 2)")
+    parser.add_argument("--isolated-timeout", type=float, default=DEFAULT_ISOLATED_TIMEOUT,
+                        help="Seconds before an isolated tool call without its own timeout is killed (default: 60)")
+    parser.add_argument("--prompts-dir", default=PROMPTS_DIR,
+                        help="Directory of JSON prompt templates (default: prompts/ next to server.py)")
+    parser.add_argument("--no-prompt-reload", action="store_true",
+                        help="Disable hot reload of prompt templates")
+    parser.add_argument("--metrics-file", default=None,
+                        help="Periodically write Prometheus-format metrics to this file")
+    parser.add_argument("--metrics-interval", type=float, default=15.0,
+                        help="Seconds between metrics file writes (default: 15)")
+    return parser.parse_args(argv)
 
 
-async def main():
+def main(argv: Optional[List[str]] = None):
     """Main entry point."""
-    server = SimpleMCPServer()
-    await server.run()
+    args = parse_args(argv)
+    server = SimpleMCPServer(
+        max_concurrent_calls=args.max_concurrent_calls,
+        executor=args.executor,
+        max_workers=args.max_workers,
+        queue_timeout=args.queue_timeout,
+        cache_size=args.cache_size,
+        cache_ttl=args.cache_ttl,
+        metrics_file=args.metrics_file,
+        metrics_interval=args.metrics_interval,
+        prompts_dir=args.prompts_dir,
+        prompts_reload_interval=None if args.no_prompt_reload else 2.0,
+        plugins_dir=args.plugins_dir,
+        plugin_entry_points=not args.no_plugin_entry_points,
+        isolated_workers=args.isolated_workers,
+        isolated_timeout=args.isolated_timeout,
+    )
+    if args.transport == "http":
+        asyncio.run(server.run_http(
+            host=args.host,
+            port=args.port,
+            path=args.path,
+            json_response=args.json_response,
+            keep_alive=args.keep_alive,
+        ))
+    else:
+        asyncio.run(server.run())
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -3,84 +3,104 @@
 Test client for the Simple MCP Server
 """
 
+import argparse
 import asyncio
-import json
+import contextlib
+import os
+import sys
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
+SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
 
-async def test_server():
+
+@contextlib.asynccontextmanager
+async def connect(url=None):
+    """Open a client session over HTTP if a URL is given, otherwise over stdio."""
+    if url:
+        from mcp.client.streamable_http import streamable_http_client
+        async with streamable_http_client(url) as (read, write, _):
+            async with ClientSession(read, write) as session:
+                yield session
+    else:
+        server_params = StdioServerParameters(
+            command=sys.executable,
+            args=["server.py"],
+            cwd=SERVER_DIR
+        )
+        async with stdio_client(server_params) as (read, write):
+            async with ClientSession(read, write) as session:
+                yield session
+
+
+async def test_server(url=None):
     """Test the MCP server functionality."""
     
     # Connect to the server
-    server_params = StdioServerParameters(
-        command="python",
-        args=["server.py"],
-        cwd="/Users/ken/Developer/private/machine-learning-workshop/mcp"
-    )
-    
-    async with stdio_client(server_params) as (read, write):
-        async with ClientSession(read, write) as session:
-            # Initialize the session
-            await session.initialize()
-            
-            print("=== Connected to MCP Server ===\n")
-            
-            # Test listing tools
-            print("1. Available Tools:")
-            tools = await session.list_tools()
-            for tool in tools.tools:
-                print(f"   - {tool.name}: {tool.description}")
-            
-            print("\n2. Testing Tools:")
-            
-            # Test calculate tool
-            print("\n   a) Testing 'calculate' tool (10 + 5):")
-            result = await session.call_tool(
-                "calculate",
-                {"operation": "add", "a": 10, "b": 5}
-            )
-            print(f"      Result: {result.content[0].text}")
-            
-            # Test echo tool
-            print("\n   b) Testing 'echo' tool:")
-            result = await session.call_tool(
-                "echo",
-                {"message": "Hello from MCP client!"}
-            )
-            print(f"      Result: {result.content[0].text}")
-            
-            # Test get_time tool
-            print("\n   c) Testing 'get_time' tool:")
-            result = await session.call_tool("get_time", {})
-            print(f"      Result: {result.content[0].text}")
-            
-            # Test listing prompts
-            print("\n3. Available Prompts:")
-            prompts = await session.list_prompts()
-            for prompt in prompts.prompts:
-                print(f"   - {prompt.name}: {prompt.description}")
-            
-            print("\n4. Testing Prompts:")
-            
-            # Test greeting prompt
-            print("\n   a) Testing 'greeting' prompt (Japanese):")
-            result = await session.get_prompt(
-                "greeting",
-                {"name": "Ken", "language": "Japanese"}
-            )
-            print(f"      Result: {result.messages[0].content.text}")
-            
-            # Test math_problem prompt
-            print("\n   b) Testing 'math_problem' prompt (medium difficulty):")
-            result = await session.get_prompt(
-                "math_problem",
-                {"difficulty": "medium"}
-            )
-            print(f"      Result: {result.messages[0].content.text}")
-            
-            print("\n=== All tests completed successfully! ===")
+    async with connect(url) as session:
+        # Initialize the session
+        await session.initialize()
+        
+        print("=== Connected to MCP Server ===\n")
+        
+        # Test listing tools
+        print("1. Available Tools:")
+        tools = await session.list_tools()
+        for tool in tools.tools:
+            print(f"   - {tool.name}: {tool.description}")
+        
+        print("\n2. Testing Tools:")
+        
+        # Test calculate tool
+        print("\n   a) Testing 'calculate' tool (10 + 5):")
+        result = await session.call_tool(
+            "calculate",
+            {"operation": "add", "a": 10, "b": 5}
+        )
+        print(f"      Result: {result.content[0].text}")
+        
+        # Test echo tool
+        print("\n   b) Testing 'echo' tool:")
+        result = await session.call_tool(
+            "echo",
+            {"message": "Hello from MCP client!"}
+        )
+        print(f"      Result: {result.content[0].text}")
+        
+        # Test get_time tool
+        print("\n   c) Testing 'get_time' tool:")
+        result = await session.call_tool("get_time", {})
+        print(f"      Result: {result.content[0].text}")
+        
+        # Test listing prompts
+        print("\n3. Available Prompts:")
+        prompts = await session.list_prompts()
+        for prompt in prompts.prompts:
+            print(f"   - {prompt.name}: {prompt.description}")
+        
+        print("\n4. Testing Prompts:")
+        
+        # Test greeting prompt
+        print("\n   a) Testing 'greeting' prompt (Japanese):")
+        result = await session.get_prompt(
+            "greeting",
+            {"name": "Ken", "language": "Japanese"}
+        )
+        print(f"      Result: {result.messages[0].content.text}")
+        
+        # Test math_problem prompt
+        print("\n   b) Testing 'math_problem' prompt (medium difficulty):")
+        result = await session.get_prompt(
+            "math_problem",
+            {"difficulty": "medium"}
+        )
+        print(f"      Result: {result.messages[0].content.text}")
+        
+        print("\n=== All tests completed successfully! ===")
 
 
 if __name__ == "__main__":
-    asyncio.run(test_server())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Test client for the Simple MCP Server")
+    parser.add_argument("--url", help="Connect over HTTP (e.g. http://127.0.0.1:8000/mcp) instead of stdio")
+    args = parser.parse_args()
+    asyncio.run(test_server(args.url))
\ No newline at end of file
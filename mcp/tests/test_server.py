@@ -0,0 +1,492 @@
+"""Tests for the Simple MCP Server."""
+
+import asyncio
+import json
+import os
+import threading
+import time
+
+import pytest
+from mcp.types import (
+    CallToolRequest,
+    CallToolRequestParams,
+    ListToolsRequest,
+)
+
+from prompt_registry import PromptRegistry
+from server import ResultCache, SimpleMCPServer, _text_result, calculate_batch
+
+
+async def call(server: SimpleMCPServer, name: str, arguments: dict):
+    """Send a call_tool request through the MCP request handler."""
+    handler = server.server.request_handlers[CallToolRequest]
+    request = CallToolRequest(
+        method="tools/call",
+        params=CallToolRequestParams(name=name, arguments=arguments),
+    )
+    return (await handler(request)).root
+
+
+def text(result) -> str:
+    return result.content[0].text
+
+
+def prompt_text(result) -> str:
+    return result.messages[0].content.text
+
+
+def write_prompt(directory, name: str, template: str):
+    path = directory / f"{name}.json"
+    path.write_text(json.dumps({
+        "name": name,
+        "arguments": [{"name": "name", "required": True}],
+        "template": template,
+    }))
+    return path
+
+
+class TestToolRegistry:
+    @pytest.mark.asyncio
+    async def test_list_tools_is_precomputed(self):
+        server = SimpleMCPServer()
+        handler = server.server.request_handlers[ListToolsRequest]
+        first = (await handler(ListToolsRequest(method="tools/list"))).root
+        second = (await handler(ListToolsRequest(method="tools/list"))).root
+        assert [t.name for t in first.tools] == ["calculate", "calculate_batch", "echo", "get_time", "server_stats", "prime_factors"]
+        assert first is second
+
+    @pytest.mark.asyncio
+    async def test_register_tool_invalidates_listing(self):
+        server = SimpleMCPServer()
+        before = server.list_tools()
+
+        async def noop(arguments):
+            return None
+
+        server.register_tool("noop", "Do nothing", {"type": "object", "properties": {}}, noop)
+        after = server.list_tools()
+        assert after is not before
+        assert "noop" in [t.name for t in after.tools]
+
+    @pytest.mark.asyncio
+    async def test_calculate(self):
+        server = SimpleMCPServer()
+        result = await call(server, "calculate", {"operation": "add", "a": 10, "b": 5})
+        assert text(result) == "Result: 15.0"
+        assert not result.isError
+
+    @pytest.mark.asyncio
+    async def test_divide_by_zero(self):
+        server = SimpleMCPServer()
+        result = await call(server, "calculate", {"operation": "divide", "a": 1, "b": 0})
+        assert text(result) == "Error: Division by zero"
+        assert result.isError
+
+    @pytest.mark.asyncio
+    async def test_echo(self):
+        server = SimpleMCPServer()
+        result = await call(server, "echo", {"message": "hi"})
+        assert text(result) == "Echo: hi"
+
+    @pytest.mark.asyncio
+    async def test_unknown_tool(self):
+        server = SimpleMCPServer()
+        result = await call(server, "missing", {})
+        assert text(result) == "Unknown tool: missing"
+        assert result.isError
+
+
+def slow_square(arguments):
+    time.sleep(0.2)
+    return _text_result(f"{arguments['x'] ** 2}")
+
+
+class TestCalculateBatch:
+    @pytest.mark.asyncio
+    async def test_single_operation_broadcast(self):
+        server = SimpleMCPServer()
+        result = await call(server, "calculate_batch", {"operation": "multiply", "a": [1, 2, 3], "b": [4, 5, 6]})
+        assert json.loads(text(result)) == {"results": [4.0, 10.0, 18.0], "errors": []}
+        server.close()
+
+    @pytest.mark.asyncio
+    async def test_per_element_operations_and_errors(self):
+        server = SimpleMCPServer()
+        result = await call(server, "calculate_batch", {
+            "operation": ["add", "divide", "subtract", "divide"],
+            "a": [1, 1, 5, 9],
+            "b": [2, 0, 3, 3],
+        })
+        assert not result.isError
+        assert json.loads(text(result)) == {
+            "results": [3.0, None, 2.0, 3.0],
+            "errors": [{"index": 1, "error": "Division by zero"}],
+        }
+        server.close()
+
+    def test_unknown_operation_and_overflow(self):
+        result = calculate_batch({
+            "operation": ["power", "multiply"],
+            "a": [2, 1e308],
+            "b": [3, 10],
+        })
+        assert json.loads(text(result))["errors"] == [
+            {"index": 0, "error": "Unknown operation"},
+            {"index": 1, "error": "Result is not finite"},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_length_mismatch(self):
+        server = SimpleMCPServer()
+        result = await call(server, "calculate_batch", {"operation": "add", "a": [1, 2], "b": [1]})
+        assert result.isError
+        server.close()
+
+
+class TestResultCache:
+    @pytest.mark.asyncio
+    async def test_pure_tool_is_memoized(self):
+        server = SimpleMCPServer()
+        first = await server.call_tool("calculate", {"operation": "add", "a": 1, "b": 2})
+        second = await server.call_tool("calculate", {"b": 2, "a": 1, "operation": "add"})
+        assert second is first
+        assert server.cache.stats()["hits"] == 1
+        assert server.cache.stats()["misses"] == 1
+
+    def test_keys_distinguish_argument_types(self):
+        assert ResultCache.make_key("tool", "echo", {"a": 1, "b": "x"}) == ResultCache.make_key("tool", "echo", {"b": "x", "a": 1})
+        assert ResultCache.make_key("tool", "echo", {"message": 1}) != ResultCache.make_key("tool", "echo", {"message": True})
+        assert ResultCache.make_key("tool", "echo", {"message": 1}) != ResultCache.make_key("tool", "echo", {"message": 1.0})
+        assert ResultCache.make_key("tool", "echo", {"values": [1, 2]}) == ResultCache.make_key("tool", "echo", {"values": [1, 2]})
+        assert ResultCache.make_key("tool", "echo", {"message": object()}) is None
+
+    @pytest.mark.asyncio
+    async def test_impure_tool_is_not_cached(self):
+        server = SimpleMCPServer()
+        await server.call_tool("get_time", {})
+        await server.call_tool("get_time", {})
+        assert server.cache.stats() == {"hits": 0, "misses": 0, "size": 0, "maxsize": 1024, "ttl": None}
+
+    def test_prompt_is_memoized(self):
+        server = SimpleMCPServer()
+        first = server.get_prompt("greeting", {"name": "Ken", "language": "Japanese"})
+        assert server.get_prompt("greeting", {"language": "Japanese", "name": "Ken"}) is first
+        assert server.get_prompt("greeting", {"name": "Ada"}) is not first
+
+    def test_lru_eviction_and_ttl(self, monkeypatch):
+        cache = ResultCache(maxsize=2, ttl=10)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+
+        now = time.monotonic()
+        monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+        assert cache.get("a") is None
+        assert cache.stats()["size"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cache_can_be_disabled(self):
+        server = SimpleMCPServer(cache_size=0)
+        first = await server.call_tool("echo", {"message": "hi"})
+        assert await server.call_tool("echo", {"message": "hi"}) is not first
+        assert server.cache is None
+
+
+class TestMetrics:
+    @pytest.mark.asyncio
+    async def test_server_stats_tool(self):
+        server = SimpleMCPServer()
+        await call(server, "calculate", {"operation": "add", "a": 1, "b": 2})
+        await call(server, "calculate", {"operation": "divide", "a": 1, "b": 0})
+        server.get_prompt("greeting", {"name": "Ken"})
+
+        stats = json.loads(text(await call(server, "server_stats", {})))
+        assert stats["tools"]["calculate"]["count"] == 2
+        assert stats["tools"]["calculate"]["errors"] == 1
+        assert stats["prompts"]["greeting"]["count"] == 1
+        # server_stats itself is in flight while it reports
+        assert stats["in_flight"] == 1
+        assert stats["cache"]["misses"] == 3
+
+    @pytest.mark.asyncio
+    async def test_in_flight_tracks_running_calls(self):
+        server = SimpleMCPServer()
+        server.register_tool("square", "Square x", {"type": "object"}, slow_square, blocking=True)
+        pending = asyncio.ensure_future(server.call_tool("square", {"x": 2}))
+        await asyncio.sleep(0.05)
+        assert server.metrics.in_flight == 1
+        await pending
+        assert server.metrics.in_flight == 0
+        server.close()
+
+    def test_prometheus_dump(self, tmp_path):
+        server = SimpleMCPServer()
+        server.metrics.observe_tool("echo", 0.003, is_error=False)
+        server.metrics.observe_tool("echo", 0.2, is_error=True)
+        path = tmp_path / "metrics.prom"
+        server.write_metrics(str(path))
+
+        dump = path.read_text()
+        assert 'mcp_tool_duration_seconds_bucket{tool="echo",le="0.005"} 1' in dump
+        assert 'mcp_tool_duration_seconds_bucket{tool="echo",le="0.25"} 2' in dump
+        assert 'mcp_tool_duration_seconds_count{tool="echo"} 2' in dump
+        assert 'mcp_tool_errors_total{tool="echo"} 1' in dump
+        assert "mcp_requests_in_flight 0" in dump
+
+
+class TestPromptRegistry:
+    def test_builtin_prompts(self):
+        server = SimpleMCPServer()
+        listing = server.prompts.list_prompts()
+        assert [p.name for p in listing.prompts] == ["greeting", "math_problem"]
+        assert prompt_text(server.get_prompt("greeting", {"name": "Ken", "language": "Japanese"})) == \
+            "こんにちは、Kenさん！MCPサーバーへようこそ。"
+        assert prompt_text(server.get_prompt("greeting", {"name": "Ken", "language": "Klingon"})) == \
+            "Hello, Ken! Welcome to the MCP server."
+        assert prompt_text(server.get_prompt("math_problem", {"difficulty": "medium"})) == \
+            "Please solve this math problem: Solve for x: 3x + 7 = 22"
+
+    def test_arguments_are_validated(self):
+        server = SimpleMCPServer()
+        with pytest.raises(ValueError, match="Missing required arguments"):
+            server.get_prompt("greeting", {"language": "French"})
+        with pytest.raises(ValueError, match="Unknown arguments"):
+            server.get_prompt("math_problem", {"difficulty": "easy", "topic": "algebra"})
+        assert server.metrics.prompts["greeting"].errors == 1
+
+    def test_unknown_prompt(self):
+        server = SimpleMCPServer()
+        assert prompt_text(server.get_prompt("missing")) == "Unknown prompt: missing"
+
+    def test_undeclared_placeholder_is_rejected(self, tmp_path):
+        write_prompt(tmp_path, "bad", "Hi {nickname}")
+        with pytest.raises(ValueError, match="nickname"):
+            PromptRegistry(str(tmp_path))
+
+    def test_hot_reload(self, tmp_path):
+        path = write_prompt(tmp_path, "hello", "Hello, {name}!")
+        server = SimpleMCPServer(prompts_dir=str(tmp_path), prompts_reload_interval=0)
+        assert prompt_text(server.get_prompt("hello", {"name": "Ken"})) == "Hello, Ken!"
+
+        write_prompt(tmp_path, "hello", "Hi there, {name}!")
+        os.utime(path, (time.time() + 5, time.time() + 5))
+        assert prompt_text(server.get_prompt("hello", {"name": "Ken"})) == "Hi there, Ken!"
+
+        # A broken edit keeps the last good version
+        path.write_text("{not json")
+        os.utime(path, (time.time() + 10, time.time() + 10))
+        assert prompt_text(server.get_prompt("hello", {"name": "Ken"})) == "Hi there, Ken!"
+
+
+PLUGIN_SOURCE = '''
+import os
+import time
+
+from mcp.types import CallToolResult, TextContent
+
+
+def double(arguments):
+    return CallToolResult(content=[TextContent(type="text", text=str(arguments["x"] * 2))])
+
+
+def spin(arguments):
+    while True:
+        time.sleep(0.01)
+
+
+def crash(arguments):
+    os._exit(1)
+
+
+TOOLS = [
+    {"name": "double", "description": "Double x", "handler": "double", "isolated": True, "timeout": 30},
+    {"name": "spin", "description": "Never return", "handler": "spin", "isolated": True, "timeout": 0.5},
+    {"name": "crash", "description": "Kill the worker", "handler": "crash", "isolated": True, "timeout": 30},
+    {"name": "hang", "description": "Never return, no timeout", "handler": "spin", "isolated": True},
+]
+'''
+
+
+@pytest.fixture
+def plugin_server(tmp_path):
+    (tmp_path / "sample_plugin.py").write_text(PLUGIN_SOURCE)
+    (tmp_path / "broken_plugin.py").write_text("raise ImportError('missing dependency')")
+    server = SimpleMCPServer(plugins_dir=str(tmp_path), plugin_entry_points=False, isolated_workers=1)
+    yield server
+    server.close()
+
+
+class TestPlugins:
+    def test_plugins_are_discovered(self, plugin_server):
+        names = [t.name for t in plugin_server.list_tools().tools]
+        assert {"double", "spin", "crash"} <= set(names)
+        assert "prime_factors" not in names
+
+    @pytest.mark.asyncio
+    async def test_isolated_call(self, plugin_server):
+        assert text(await plugin_server.call_tool("double", {"x": 21})) == "42"
+
+    @pytest.mark.asyncio
+    async def test_runaway_tool_times_out_without_blocking_the_loop(self, plugin_server):
+        pending = asyncio.ensure_future(plugin_server.call_tool("spin", {}))
+        await asyncio.sleep(0.1)
+        # The event loop keeps serving other requests meanwhile
+        assert prompt_text(plugin_server.get_prompt("math_problem", {"difficulty": "easy"}))
+        result = await pending
+        assert result.isError
+        assert "timed out" in text(result)
+        # The killed worker is replaced
+        assert text(await plugin_server.call_tool("double", {"x": 1})) == "2"
+
+    @pytest.mark.asyncio
+    async def test_crashing_tool_does_not_break_the_server(self, plugin_server):
+        result = await plugin_server.call_tool("crash", {})
+        assert result.isError
+        assert "crashed" in text(result)
+        assert text(await plugin_server.call_tool("double", {"x": 5})) == "10"
+
+    @pytest.mark.asyncio
+    async def test_isolated_tools_get_a_default_timeout(self, tmp_path):
+        (tmp_path / "sample_plugin.py").write_text(PLUGIN_SOURCE)
+        server = SimpleMCPServer(plugins_dir=str(tmp_path), plugin_entry_points=False, isolated_workers=1,
+                                 isolated_timeout=0.3)
+        try:
+            result = await asyncio.wait_for(server.call_tool("hang", {}), 10)
+            assert "timed out after 0.3s" in text(result)
+        finally:
+            server.close()
+
+    @pytest.mark.asyncio
+    async def test_close_kills_busy_workers(self, plugin_server):
+        pool = plugin_server._isolated_pool
+        assert text(await plugin_server.call_tool("double", {"x": 1})) == "2"
+        pending = asyncio.ensure_future(plugin_server.call_tool("hang", {}))
+        await asyncio.sleep(0.2)
+        (busy,) = pool._workers
+        plugin_server.close()
+        result = await asyncio.wait_for(pending, 5)
+        assert "crashed" in text(result)
+        assert not busy.process.is_alive()
+        assert pool._count == 0
+        assert not pool._workers
+
+    @pytest.mark.asyncio
+    async def test_bundled_prime_factors_plugin(self):
+        server = SimpleMCPServer(plugin_entry_points=False)
+        assert text(await server.call_tool("prime_factors", {"n": 360})) == "Prime factors: 2 x 2 x 2 x 3 x 3 x 5"
+        server.close()
+
+
+class TestConcurrency:
+    @pytest.mark.asyncio
+    async def test_blocking_tool_runs_off_the_event_loop(self):
+        server = SimpleMCPServer(max_workers=4)
+        callers = []
+
+        def record_thread(arguments):
+            callers.append(threading.get_ident())
+            return slow_square(arguments)
+
+        server.register_tool("square", "Square x", {"type": "object"}, record_thread, blocking=True)
+        start = time.perf_counter()
+        results = await asyncio.gather(*(server.call_tool("square", {"x": i}) for i in range(4)))
+        elapsed = time.perf_counter() - start
+        server.close()
+
+        assert [text(r) for r in results] == ["0", "1", "4", "9"]
+        assert threading.get_ident() not in callers
+        assert elapsed < 0.6
+
+    @pytest.mark.asyncio
+    async def test_slow_tool_does_not_stall_list_tools(self):
+        server = SimpleMCPServer(max_concurrent_calls=1)
+        server.register_tool("square", "Square x", {"type": "object"}, slow_square, blocking=True)
+        pending = asyncio.ensure_future(server.call_tool("square", {"x": 3}))
+        await asyncio.sleep(0.01)
+
+        handler = server.server.request_handlers[ListToolsRequest]
+        listing = await asyncio.wait_for(handler(ListToolsRequest(method="tools/list")), 0.1)
+        assert "square" in [t.name for t in listing.root.tools]
+        assert text(await pending) == "9"
+        server.close()
+
+    @pytest.mark.asyncio
+    async def test_queue_timeout_rejects_when_saturated(self):
+        server = SimpleMCPServer(max_concurrent_calls=1, queue_timeout=0.05)
+        server.register_tool("square", "Square x", {"type": "object"}, slow_square, blocking=True)
+        first = asyncio.ensure_future(server.call_tool("square", {"x": 2}))
+        await asyncio.sleep(0.01)
+        rejected = await server.call_tool("square", {"x": 5})
+        assert rejected.isError
+        assert text(rejected).startswith("Server busy")
+        assert text(await first) == "4"
+        server.close()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("cache_size", [0, 16])
+    async def test_inline_pure_tools_are_not_gated(self, cache_size):
+        server = SimpleMCPServer(max_concurrent_calls=1, queue_timeout=0.05, cache_size=cache_size)
+        server.register_tool("square", "Square x", {"type": "object"}, slow_square, blocking=True)
+        first = asyncio.ensure_future(server.call_tool("square", {"x": 2}))
+        await asyncio.sleep(0.01)
+        assert text(await server.call_tool("echo", {"message": "hi"})) == "Echo: hi"
+        assert text(await first) == "4"
+        assert server.metrics.tools["echo"].count == 1
+        server.close()
+
+    def test_unknown_executor(self):
+        with pytest.raises(ValueError):
+            SimpleMCPServer(executor="fiber")
+
+
+class TestHTTPTransport:
+    @pytest.mark.asyncio
+    async def test_clients_share_one_server(self):
+        import socket
+
+        import uvicorn
+        from mcp import ClientSession
+        from mcp.client.streamable_http import streamable_http_client
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+
+        server = SimpleMCPServer()
+        http_server = uvicorn.Server(
+            uvicorn.Config(server.http_app(), host="127.0.0.1", port=port, log_level="warning")
+        )
+        serving = asyncio.ensure_future(http_server.serve())
+        while not http_server.started:
+            await asyncio.sleep(0.01)
+
+        async def session_echo(message):
+            async with streamable_http_client(f"http://127.0.0.1:{port}/mcp") as (read, write, _):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    return text(await session.call_tool("echo", {"message": message}))
+
+        try:
+            results = await asyncio.gather(*(session_echo(f"client {i}") for i in range(3)))
+        finally:
+            http_server.should_exit = True
+            await serving
+            server.close()
+
+        assert results == ["Echo: client 0", "Echo: client 1", "Echo: client 2"]
+
+
+class TestLazyHandlers:
+    @pytest.mark.asyncio
+    async def test_handler_is_imported_on_first_call(self):
+        server = SimpleMCPServer()
+        server.register_tool("batch", "Batch", {"type": "object"}, "server:calculate_batch", blocking=True)
+        assert server._tools["batch"].handler == "server:calculate_batch"
+
+        result = await server.call_tool("batch", {"operation": "add", "a": [1], "b": [2]})
+        assert json.loads(text(result))["results"] == [3.0]
+        assert server._tools["batch"].handler is calculate_batch
+        server.close()
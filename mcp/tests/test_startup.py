@@ -0,0 +1,47 @@
+"""Cold-start tests for the Simple MCP Server."""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds from launching server.py to its first list_tools response.
+# Override on slow machines with MCP_COLD_START_BUDGET.
+COLD_START_BUDGET = float(os.environ.get("MCP_COLD_START_BUDGET", "3.0"))
+
+# Modules only needed by specific tools or worker pools. (The HTTP transport's
+# starlette/uvicorn are imported by the mcp package itself, so are not listed.)
+DEFERRED_MODULES = [
+    "numpy",
+    "concurrent.futures.process",
+]
+
+
+def test_optional_modules_are_not_imported_at_startup():
+    completed = subprocess.run(
+        [sys.executable, "-c", f"import json, sys, server; print(json.dumps([m for m in {DEFERRED_MODULES!r} if m in sys.modules]))"],
+        cwd=SERVER_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert json.loads(completed.stdout) == []
+
+
+@pytest.mark.asyncio
+async def test_cold_start_budget():
+    server_params = StdioServerParameters(command=sys.executable, args=["server.py"], cwd=SERVER_DIR)
+    start = time.perf_counter()
+    async with stdio_client(server_params) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            await session.list_tools()
+            elapsed = time.perf_counter() - start
+    assert elapsed < COLD_START_BUDGET, f"cold start took {elapsed:.2f}s (budget {COLD_START_BUDGET}s)"